@@ -9,6 +9,12 @@ __version__ = "0.1.0"
 __author__ = "Rony Licha"
 __email__ = "ronylicha@gmail.com"
 
-from .cli import main
+__all__ = ["main"]
 
-__all__ = ["main"]
\ No newline at end of file
+
+def __getattr__(name):
+    # Import différé : `import mistral_cli` (et donc chaque outil) ne charge pas l'interface
+    if name == "main":
+        from .cli import main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,63 @@
-from .cli import main
+import sys
+
+from mistral_cli import __version__
+
+USAGE = """
+🤖 Mistral CLI v{version} - Assistant IA avec modèles et agents personnalisés
+
+Usage: mistral-cli [options]
+
+Options:
+  -h, --help            Affiche cette aide
+  --version             Affiche la version
+  --no-cache            Désactive le cache des réponses de l'API
+  --cache-ttl SECONDES  Durée de validité du cache (défaut: 7 jours)
+  --resume RUN_ID       Reprend un traitement sur dossier interrompu
+  --rate-limit N        Requêtes par seconde vers l'API (défaut: 5)
+  --tokens-per-minute N Tokens par minute autorisés (défaut: 2000000)
+
+Fonctionnalités:
+  📚 Modèles Mistral - Chat direct avec les modèles
+  🤖 Agents personnalisés - Agents avec outils intégrés
+  🔧 Outils de développement multi-langages
+  💾 Sessions persistantes
+  🔒 Chiffrement des clés API
+
+Pour commencer:
+  1. Lancez 'mistral-cli' 
+  2. Entrez votre clé API Mistral (https://mistral.ai)
+  3. Sélectionnez un agent ou créez-en un nouveau
+
+Commandes disponibles dans l'interface:
+  /create_agent  - Créer un agent avec outils
+  /list_agents   - Voir tous les agents disponibles
+  /help         - Aide complète
+            """
+
+
+def handle_info_options(argv) -> bool:
+    """Traite --help et --version ; retourne True si le programme doit s'arrêter.
+
+    Ces options n'importent ni l'interface ni ses dépendances (rich, pydantic,
+    requests) : elles répondent en quelques millisecondes.
+    """
+    if len(argv) > 1:
+        arg = argv[1]
+        if arg in ['--help', '-h']:
+            print(USAGE.format(version=__version__))
+            return True
+        elif arg in ['--version', '-v']:
+            print(f"mistral-cli {__version__}")
+            return True
+    return False
+
+
+def main():
+    if handle_info_options(sys.argv):
+        return
+    from mistral_cli.cli import main as run_cli
+    run_cli()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,115 @@
+"""
+Registre des agents et modèles Mistral.
+
+Les agents sont indexés par identifiant, par type ("model" / "agent") et par
+modèle : retrouver l'agent courant à chaque message ne parcourt plus la liste.
+Les ajouts et mises à jour marquent le registre comme modifié et
+`config/agents.json` n'est réécrit que si quelque chose a réellement changé.
+"""
+
+import json
+import os
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from mistral_cli.models import MistralAgent
+
+AGENTS_FILE = "config/agents.json"
+
+
+class AgentRegistry:
+    """Agents indexés, dans l'ordre d'ajout, avec suivi des modifications."""
+
+    def __init__(self, agents: Iterable[MistralAgent] = (), path: str = AGENTS_FILE):
+        self.path = path
+        self._by_id: Dict[str, MistralAgent] = {}  # Conserve l'ordre d'insertion
+        self._by_type: Dict[str, Dict[str, MistralAgent]] = {}
+        self._by_model: Dict[str, Dict[str, MistralAgent]] = {}
+        self._dirty = False
+        for agent in agents:
+            self._index(agent)
+
+    def __iter__(self) -> Iterator[MistralAgent]:
+        return iter(list(self._by_id.values()))
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self._by_id
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def get(self, agent_id: Optional[str]) -> Optional[MistralAgent]:
+        return self._by_id.get(agent_id) if agent_id else None
+
+    def by_type(self, agent_type: str) -> List[MistralAgent]:
+        """Agents d'un type ("model" ou "agent"), dans l'ordre d'ajout."""
+        return list(self._by_type.get(agent_type, {}).values())
+
+    def by_model(self, model: str) -> List[MistralAgent]:
+        return list(self._by_model.get(model, {}).values())
+
+    def api_key(self) -> Optional[str]:
+        """Première clé API disponible parmi les agents."""
+        return next((a.api_key for a in self._by_id.values() if a.api_key), None)
+
+    def _index(self, agent: MistralAgent):
+        self._by_id[agent.id] = agent
+        self._by_type.setdefault(agent.agent_type, {})[agent.id] = agent
+        self._by_model.setdefault(agent.model, {})[agent.id] = agent
+
+    def _unindex(self, agent: MistralAgent):
+        self._by_type.get(agent.agent_type, {}).pop(agent.id, None)
+        self._by_model.get(agent.model, {}).pop(agent.id, None)
+
+    def upsert(self, agent: MistralAgent) -> bool:
+        """Ajoute ou remplace un agent ; retourne True si le registre a changé.
+
+        Un agent identique à celui déjà enregistré ne change rien. Repasser le
+        même objet après l'avoir modifié compte comme une modification.
+        """
+        existing = self._by_id.get(agent.id)
+        if existing is not None and existing is not agent and existing == agent:
+            return False
+        if existing is not None:
+            self._unindex(existing)
+        self._index(agent)  # Un agent remplacé garde sa position
+        self._dirty = True
+        return True
+
+    def merge(self, agents: Iterable[MistralAgent], replace: bool = False) -> int:
+        """Ajoute des agents en une passe ; retourne le nombre d'agents ajoutés ou modifiés.
+
+        Par défaut les agents déjà connus sont conservés tels quels ; avec
+        replace=True ils sont mis à jour.
+        """
+        changed = 0
+        for agent in agents:
+            if agent.id in self._by_id and not replace:
+                continue
+            changed += self.upsert(agent)
+        return changed
+
+    def remove(self, agent_id: str) -> bool:
+        agent = self._by_id.pop(agent_id, None)
+        if agent is None:
+            return False
+        self._unindex(agent)
+        self._dirty = True
+        return True
+
+    def save(self, force: bool = False) -> bool:
+        """Écrit le fichier des agents (de façon atomique) s'il y a des modifications."""
+        if not (self._dirty or force):
+            return False
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump([a.model_dump() for a in self._by_id.values()], f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        return True
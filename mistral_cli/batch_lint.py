@@ -0,0 +1,379 @@
+"""
+Lint par lots de nombreux fichiers, avec des diagnostics structurés.
+
+Les fichiers sont regroupés par langage et chaque linter est lancé une seule fois
+sur tout son groupe (au-delà de MAX_COMMAND_CHARS caractères d'arguments, en
+quelques lancements), avec une sortie JSON quand il en propose une. Chaque sortie
+est convertie en `Diagnostic` (fichier, ligne, colonne, règle, gravité, message) :
+les résultats de flake8, ESLint, phpcs, golangci-lint, RuboCop et ktlint
+s'agrègent et se comparent.
+
+Python et JavaScript profitent des linters maintenus à chaud (`linter_workers`) :
+aucun processus n'est lancé quand pyflakes/pycodestyle ou le worker ESLint sont
+disponibles.
+
+Avec un cache (`result_cache`), les diagnostics sont mémorisés fichier par fichier
+sous le hash de son contenu, de la version et de la configuration du linter : une
+nouvelle analyse du dépôt ne relance le linter que sur les fichiers modifiés.
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from mistral_cli.disk_cache import DiskCache
+from mistral_cli import linter_workers
+from mistral_cli.linter_workers import (eslint_files, has_flake8_config, lint_python_in_process,
+                                        python_checks_version)
+from mistral_cli.result_cache import binary_fingerprint, get_result_cache, hash_file
+from mistral_cli.tool_runner import run_tool_command
+
+MAX_COMMAND_CHARS = 100000  # Longueur d'arguments sûre pour une seule ligne de commande
+SEVERITIES = ("error", "warning", "info")
+
+# Linter et extensions par langage
+LANGUAGE_EXTENSIONS = {
+    "python": (".py",),
+    "javascript": (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx"),
+    "php": (".php",),
+    "go": (".go",),
+    "ruby": (".rb",),
+    "kotlin": (".kt", ".kts"),
+}
+
+FLAKE8_LINE = re.compile(r"^(?P<file>.+?):(?P<line>\d+):(?P<col>\d+): (?P<rule>\S+) (?P<message>.*)$")
+
+
+class Diagnostic(NamedTuple):
+    """Un problème signalé par un linter ; `severity` vaut "error", "warning" ou "info"."""
+    file: str
+    line: int
+    col: int
+    rule: str
+    severity: str
+    message: str
+    tool: str
+
+
+class BatchLintResult(NamedTuple):
+    diagnostics: List[Diagnostic]
+    errors: Dict[str, str]  # Langage -> erreur du linter (absent, sortie illisible...)
+    launches: int  # Processus de linter lancés
+    files_checked: int
+    cached_files: int = 0  # Fichiers dont les diagnostics viennent du cache
+
+
+def language_of(path: str) -> Optional[str]:
+    extension = os.path.splitext(path)[1].lower()
+    return next((language for language, extensions in LANGUAGE_EXTENSIONS.items()
+                 if extension in extensions), None)
+
+
+def _chunks(paths: List[str], budget: int = MAX_COMMAND_CHARS) -> Iterable[List[str]]:
+    chunk: List[str] = []
+    size = 0
+    for path in paths:
+        if chunk and size + len(path) + 1 > budget:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(path)
+        size += len(path) + 1
+    if chunk:
+        yield chunk
+
+
+# --- Conversion des sorties ---
+def _flake8_severity(rule: str) -> str:
+    # F (pyflakes) et E9 (erreurs de syntaxe) empêchent souvent l'exécution
+    return "error" if rule.startswith(("F", "E9")) else "warning"
+
+
+def parse_flake8(output: str) -> List[Diagnostic]:
+    """Format par défaut de flake8 : `fichier:ligne:colonne: CODE message`."""
+    diagnostics = []
+    for line in output.splitlines():
+        match = FLAKE8_LINE.match(line)
+        if match:
+            rule = match["rule"]
+            diagnostics.append(Diagnostic(match["file"], int(match["line"]), int(match["col"]), rule,
+                                          _flake8_severity(rule), match["message"], "flake8"))
+    return diagnostics
+
+
+def parse_eslint(results: List[Dict[str, Any]]) -> List[Diagnostic]:
+    """Résultats d'ESLint (`-f json` ou API) : severity 2 = erreur, 1 = avertissement."""
+    return [
+        Diagnostic(result["filePath"], message.get("line", 0), message.get("column", 0),
+                   message.get("ruleId") or "syntax", "error" if message.get("severity") == 2 else "warning",
+                   message.get("message", ""), "eslint")
+        for result in results for message in result.get("messages", [])
+    ]
+
+
+def parse_phpcs(report: Dict[str, Any]) -> List[Diagnostic]:
+    """Rapport `--report=json` de PHP_CodeSniffer."""
+    return [
+        Diagnostic(path, message.get("line", 0), message.get("column", 0), message.get("source", ""),
+                   "error" if message.get("type") == "ERROR" else "warning", message.get("message", ""), "phpcs")
+        for path, details in (report.get("files") or {}).items() for message in details.get("messages", [])
+    ]
+
+
+def parse_golangci(report: Dict[str, Any]) -> List[Diagnostic]:
+    """Rapport `--out-format=json` de golangci-lint ; une gravité absente compte comme avertissement."""
+    diagnostics = []
+    for issue in report.get("Issues") or []:
+        position = issue.get("Pos", {})
+        severity = (issue.get("Severity") or "warning").lower()
+        diagnostics.append(Diagnostic(position.get("Filename", ""), position.get("Line", 0), position.get("Column", 0),
+                                      issue.get("FromLinter", ""), severity if severity in SEVERITIES else "warning",
+                                      issue.get("Text", ""), "golangci-lint"))
+    return diagnostics
+
+
+def _rubocop_severity(severity: str) -> str:
+    if severity in ("error", "fatal"):
+        return "error"
+    return "info" if severity == "info" else "warning"  # convention, refactor, warning
+
+
+def parse_rubocop(report: Dict[str, Any]) -> List[Diagnostic]:
+    """Rapport `--format json` de RuboCop."""
+    return [
+        Diagnostic(entry["path"], offense.get("location", {}).get("line", 0),
+                   offense.get("location", {}).get("column", 0), offense.get("cop_name", ""),
+                   _rubocop_severity(offense.get("severity", "")), offense.get("message", ""), "rubocop")
+        for entry in report.get("files", []) for offense in entry.get("offenses", [])
+    ]
+
+
+def parse_ktlint(report: List[Dict[str, Any]]) -> List[Diagnostic]:
+    """Rapport `--reporter=json` de ktlint : toutes les violations sont des erreurs."""
+    return [
+        Diagnostic(entry["file"], error.get("line", 0), error.get("column", 0), error.get("rule", ""),
+                   "error", error.get("message", ""), "ktlint")
+        for entry in report for error in entry.get("errors", [])
+    ]
+
+
+def _json_output(stdout: str) -> Any:
+    """Sortie JSON d'un linter (certains ajoutent du texte avant ou après)."""
+    start = min((i for i in (stdout.find("{"), stdout.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("sortie JSON absente")
+    return json.JSONDecoder().raw_decode(stdout[start:])[0]
+
+
+# --- Lancements par langage ---
+class _Batch:
+    """Diagnostics et nombre de lancements d'un langage."""
+
+    def __init__(self):
+        self.diagnostics: List[Diagnostic] = []
+        self.launches = 0
+
+    def run(self, command: List[str], parse: Callable[[Any], List[Diagnostic]], timeout: Optional[float],
+            as_json: bool = True):
+        result = run_tool_command(command, timeout=timeout)
+        self.launches += 1
+        if not result.stdout.strip():
+            if result.returncode not in (0, 1):
+                raise RuntimeError(result.stderr.strip() or f"code de sortie {result.returncode}")
+            return
+        self.diagnostics.extend(parse(_json_output(result.stdout) if as_json else result.stdout))
+
+
+def _lint_python(paths: List[str], batch: _Batch, timeout: Optional[float]):
+    if not has_flake8_config():
+        reports = []
+        for path in paths:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                report = lint_python_in_process(f.read(), path)
+            if report is None:
+                break  # pyflakes/pycodestyle absents : flake8 sur tout le lot
+            reports.append(report.stdout)
+        else:
+            batch.diagnostics.extend(parse_flake8("".join(reports)))
+            return
+    for chunk in _chunks(paths):
+        batch.run(["flake8", *chunk], parse_flake8, timeout, as_json=False)
+
+
+def _lint_javascript(paths: List[str], batch: _Batch, timeout: Optional[float]):
+    results = eslint_files(paths)
+    if results is not None:
+        batch.diagnostics.extend(parse_eslint(results))
+        return
+    # Pas de worker ESLint (node ou eslint absent) : un seul processus eslint
+    for chunk in _chunks(paths):
+        batch.run(["eslint", "-f", "json", *chunk], parse_eslint, timeout)
+
+
+def _lint_php(paths: List[str], batch: _Batch, timeout: Optional[float]):
+    for chunk in _chunks(paths):
+        batch.run(["phpcs", "--standard=PSR12", "--report=json", *chunk], parse_phpcs, timeout)
+
+
+def _lint_go(paths: List[str], batch: _Batch, timeout: Optional[float]):
+    # golangci-lint analyse des paquets : un paquet par répertoire
+    packages = sorted({os.path.dirname(path) or "." for path in paths})
+    for chunk in _chunks(packages):
+        batch.run(["golangci-lint", "run", "--out-format=json", *chunk], parse_golangci, timeout)
+
+
+def _lint_ruby(paths: List[str], batch: _Batch, timeout: Optional[float]):
+    for chunk in _chunks(paths):
+        batch.run(["rubocop", "--format", "json", *chunk], parse_rubocop, timeout)
+
+
+def _lint_kotlin(paths: List[str], batch: _Batch, timeout: Optional[float]):
+    for chunk in _chunks(paths):
+        batch.run(["ktlint", "--reporter=json", *chunk], parse_ktlint, timeout)
+
+
+BATCH_LINTERS: Dict[str, Callable[[List[str], _Batch, Optional[float]], None]] = {
+    "python": _lint_python,
+    "javascript": _lint_javascript,
+    "php": _lint_php,
+    "go": _lint_go,
+    "ruby": _lint_ruby,
+    "kotlin": _lint_kotlin,
+}
+# Binaire dont la version et la configuration entrent dans la clé de cache
+BATCH_BINARIES = {
+    "python": "flake8",
+    "javascript": "eslint",
+    "php": "phpcs",
+    "go": "golangci-lint",
+    "ruby": "rubocop",
+    "kotlin": "ktlint",
+}
+
+_source_version: Optional[str] = None
+
+
+def source_version() -> str:
+    """Hash du code qui produit les diagnostics (ce module, les workers et le script ESLint)."""
+    global _source_version
+    if _source_version is None:
+        _source_version = DiskCache.make_key(*(hash_file(path) for path in (
+            __file__, linter_workers.__file__, linter_workers.ESLINT_WORKER_SCRIPT)))
+    return _source_version
+
+
+def _normalized(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _lint_group(language: str, paths: List[str], timeout: Optional[float],
+                cache: Optional[DiskCache]) -> Tuple[_Batch, int, Optional[str]]:
+    """Lint d'un langage : diagnostics, fichiers servis par le cache et erreur éventuelle."""
+    batch = _Batch()
+    keys: Dict[str, str] = {}
+    pending = paths
+    if cache is not None:
+        extra = python_checks_version() if language == "python" else None
+        fingerprint = DiskCache.make_key("batch-lint", language, binary_fingerprint(BATCH_BINARIES[language]), extra,
+                                         source_version())
+        pending = []
+        for path in paths:
+            content_hash = hash_file(path)
+            cached = None
+            if content_hash is not None:
+                keys[path] = DiskCache.make_key(fingerprint, path, content_hash)
+                cached = cache.get(keys[path])
+            if cached is None:
+                pending.append(path)
+            else:
+                batch.diagnostics.extend(Diagnostic(**diagnostic) for diagnostic in cached)
+        if not pending:
+            return batch, len(paths), None
+
+    fresh = _Batch()
+    try:
+        BATCH_LINTERS[language](pending, fresh, timeout)
+        error = None
+    except FileNotFoundError as e:
+        error = f"linter introuvable ({e.filename})"
+    except Exception as e:
+        error = str(e)
+    batch.launches = fresh.launches
+
+    requested = {_normalized(path) for path in pending}
+    by_file: Dict[str, List[Diagnostic]] = {}
+    for diagnostic in fresh.diagnostics:
+        # golangci-lint analyse tout un paquet : seuls les fichiers demandés (hors cache) sont gardés
+        if _normalized(diagnostic.file) in requested:
+            batch.diagnostics.append(diagnostic)
+            by_file.setdefault(_normalized(diagnostic.file), []).append(diagnostic)
+    if cache is not None and error is None:
+        for path in pending:
+            if path in keys:
+                cache.set(keys[path], [d._asdict() for d in by_file.get(_normalized(path), [])])
+    return batch, len(paths) - len(pending), error
+
+
+def lint_files(paths: Iterable[str], language: Optional[str] = None, timeout: Optional[float] = None,
+               cache: Optional[DiskCache] = None) -> BatchLintResult:
+    """Lint d'un ensemble de fichiers : un lancement de linter par langage, langages en parallèle.
+
+    Sans `language`, le langage de chaque fichier est déduit de son extension ;
+    les fichiers sans linter sont ignorés. Avec `cache`, seuls les fichiers
+    modifiés (ou dont le linter a changé) sont analysés.
+    """
+    groups: Dict[str, List[str]] = {}
+    for path in paths:
+        path_language = language or language_of(path)
+        if path_language in BATCH_LINTERS:
+            groups.setdefault(path_language, []).append(path)
+
+    diagnostics: List[Diagnostic] = []
+    errors: Dict[str, str] = {}
+    launches = cached_files = 0
+    with ThreadPoolExecutor(max_workers=max(1, len(groups))) as executor:
+        futures = {group_language: executor.submit(_lint_group, group_language, group_paths, timeout, cache)
+                   for group_language, group_paths in groups.items()}
+        for group_language, future in futures.items():
+            batch, cached, error = future.result()
+            diagnostics.extend(batch.diagnostics)
+            launches += batch.launches
+            cached_files += cached
+            if error:
+                errors[group_language] = error
+    diagnostics.sort(key=lambda d: (d.file, d.line, d.col))
+    return BatchLintResult(diagnostics, errors, launches, sum(len(p) for p in groups.values()), cached_files)
+
+
+def summarize(result: BatchLintResult) -> Dict[str, Any]:
+    """Résultat sérialisable en JSON : compteurs par gravité, erreurs et diagnostics."""
+    by_severity = {severity: 0 for severity in SEVERITIES}
+    for diagnostic in result.diagnostics:
+        by_severity[diagnostic.severity] = by_severity.get(diagnostic.severity, 0) + 1
+    return {
+        "files_checked": result.files_checked,
+        "launches": result.launches,
+        "cached_files": result.cached_files,
+        "diagnostics_count": len(result.diagnostics),
+        "by_severity": by_severity,
+        "errors": result.errors,
+        "diagnostics": [diagnostic._asdict() for diagnostic in result.diagnostics],
+    }
+
+
+def batch_report(paths: Iterable[str], language: Optional[str] = None, timeout: Optional[float] = None,
+                 use_cache: bool = True) -> str:
+    """Lint par lots rendu en JSON (sortie des outils en mode lot)."""
+    result = lint_files(paths, language, timeout, get_result_cache() if use_cache else None)
+    return json.dumps(summarize(result), indent=2, ensure_ascii=False)
+
+
+def execute_batch(context, language: str):
+    """Mode lot des linters : tous les fichiers de `files` en un seul lancement, diagnostics structurés (JSON)."""
+    try:
+        context.data["output"] = batch_report(context.data["files"], language, context.data.get("timeout"),
+                                              context.data.get("use_cache", True))
+    except Exception as e:
+        context.data["output"] = f"Erreur: {str(e)}"
+    return context
@@ -0,0 +1,116 @@
+"""
+Catalogue des modèles et agents Mistral, mis en cache sur disque.
+
+Les listes renvoyées par `/models` et `/agents` sont conservées dans
+`config/cache/catalog` avec leur date de récupération et leurs validateurs HTTP
+(ETag, Last-Modified). Tant que le TTL n'est pas écoulé, aucune requête n'est
+faite ; au-delà, la liste est revalidée (If-None-Match / If-Modified-Since,
+une réponse 304 suffit) et les deux points d'accès sont interrogés en parallèle.
+`refresh_in_background()` rafraîchit le catalogue sans jamais bloquer l'appelant.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from mistral_cli.disk_cache import DiskCache
+from mistral_cli.http_client import MISTRAL_API_URL
+from mistral_cli.scheduler import get_scheduler
+
+CATALOG_CACHE_DIR = "config/cache/catalog"
+DEFAULT_CATALOG_TTL = 6 * 3600  # Six heures
+CATALOG_ENDPOINTS = ("models", "agents")
+
+
+def catalog_items(payload: Any) -> List[Dict[str, Any]]:
+    """Liste des éléments d'une réponse (`{"data": [...]}` ou liste directe)."""
+    if isinstance(payload, dict):
+        payload = payload.get("data", [])
+    return payload if isinstance(payload, list) else []
+
+
+class ModelCatalog:
+    """Listes des modèles et agents d'une clé API, servies depuis le cache tant qu'elles sont fraîches."""
+
+    def __init__(self, api_key: str, ttl: float = DEFAULT_CATALOG_TTL,
+                 cache: Optional[DiskCache] = None, base_url: str = MISTRAL_API_URL):
+        self.api_key = api_key
+        self.ttl = ttl
+        self.base_url = base_url
+        # Pas de TTL côté cache : une entrée périmée sert encore à la revalidation
+        self.cache = cache if cache is not None else DiskCache(CATALOG_CACHE_DIR)
+        self.errors: Dict[str, str] = {}  # Dernière erreur par point d'accès
+
+    def _key(self, endpoint: str) -> str:
+        return DiskCache.make_key("catalog", endpoint, self.api_key)  # Clé API hachée, jamais stockée
+
+    def _entry(self, endpoint: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get(self._key(endpoint))
+
+    def is_fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        return entry is not None and time.time() - entry.get("fetched_at", 0) <= self.ttl
+
+    def cached(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Contenu en cache, même périmé, sans aucune requête."""
+        result = {}
+        for endpoint in CATALOG_ENDPOINTS:
+            entry = self._entry(endpoint)
+            result[endpoint] = entry["items"] if entry else []
+        return result
+
+    def get(self, force: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """Retourne {"models": [...], "agents": [...]}, en ne revalidant que les listes périmées.
+
+        En cas d'erreur réseau la dernière liste connue est conservée et l'erreur
+        est notée dans `self.errors`.
+        """
+        entries = {endpoint: self._entry(endpoint) for endpoint in CATALOG_ENDPOINTS}
+        stale = [e for e in CATALOG_ENDPOINTS if force or not self.is_fresh(entries[e])]
+        self.errors = {}
+        if stale:
+            with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+                fetched = dict(zip(stale, executor.map(lambda e: self._fetch(e, entries[e]), stale)))
+            entries.update({e: entry for e, entry in fetched.items() if entry is not None})
+        return {e: entries[e]["items"] if entries[e] else [] for e in CATALOG_ENDPOINTS}
+
+    def _fetch(self, endpoint: str, entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Interroge un point d'accès ; une réponse 304 prolonge l'entrée existante."""
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            response = get_scheduler().get(f"{self.base_url}/{endpoint}", headers=headers, timeout=10)
+            if response.status_code == 304 and entry:
+                entry = dict(entry, fetched_at=time.time())
+            else:
+                response.raise_for_status()
+                entry = {
+                    "fetched_at": time.time(),
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "items": catalog_items(response.json())
+                }
+        except Exception as e:
+            self.errors[endpoint] = str(e)
+            return None
+        self.cache.set(self._key(endpoint), entry)
+        return entry
+
+    def refresh_in_background(self, force: bool = False) -> "Future[Dict[str, List[Dict[str, Any]]]]":
+        """Lance `get()` dans un thread démon et retourne immédiatement un Future.
+
+        Le thread démon ne retarde jamais la fermeture du programme.
+        """
+        future: Future = Future()
+
+        def run():
+            try:
+                future.set_result(self.get(force=force))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="catalog-refresh", daemon=True).start()
+        return future
@@ -1,148 +1,40 @@
 import json
 import os
 import subprocess
-import fnmatch
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 from rich.text import Text
-from rich.live import Live
-from rich.spinner import Spinner
-from rich.markdown import Markdown
-from pydantic import BaseModel, field_validator
 import requests
-from cryptography.fernet import Fernet
-import base64
-import hashlib
+from mistral_cli import __version__
+from mistral_cli.context import Context
+from mistral_cli.models import (
+    MistralAgent, MCPServer, PipelineStep, Pipeline, ChatSession, NPXCache
+)
+from mistral_cli.agent_registry import AgentRegistry, AGENTS_FILE
+from mistral_cli.catalog import ModelCatalog
+from mistral_cli.session_store import SessionStore
+from mistral_cli.credentials import get_credentials
+# Réexportés : ces helpers étaient définis ici, `from mistral_cli.cli import ...` reste valable
+from mistral_cli.credentials import (  # noqa: F401
+    SECRET_KEY_FILE, generate_or_load_key, encrypt_data, decrypt_data
+)
+from mistral_cli.http_client import iter_chat_deltas, MISTRAL_API_URL
+from mistral_cli.scheduler import get_scheduler
 import getpass
-import readline
 import sys
+import threading
+import time
 
-# --- Configuration de la sécurité ---
-SECRET_KEY_FILE = "config/secret.key"
-AGENTS_FILE = "config/agents.json"
-console = Console()
+# rich.live, rich.markdown (et son analyseur), cryptography et readline sont
+# importés à la première utilisation pour garder un démarrage rapide.
 
-# --- Génération et gestion de la clé de chiffrement ---
-def generate_or_load_key() -> bytes:
-    """Génère ou charge une clé de chiffrement."""
-    os.makedirs("config", exist_ok=True)
-    if not os.path.exists(SECRET_KEY_FILE):
-        key = Fernet.generate_key()
-        with open(SECRET_KEY_FILE, "wb") as key_file:
-            key_file.write(key)
-    else:
-        with open(SECRET_KEY_FILE, "rb") as key_file:
-            key = key_file.read()
-    return key
-
-def encrypt_data(data: str, key: bytes) -> str:
-    """Chiffre les données sensibles."""
-    cipher = Fernet(key)
-    return cipher.encrypt(data.encode()).decode()
-
-def decrypt_data(encrypted_data: str, key: bytes) -> str:
-    """Déchiffre les données."""
-    cipher = Fernet(key)
-    return cipher.decrypt(encrypted_data.encode()).decode()
-
-# --- Modèles de données ---
-class Context(BaseModel):
-    data: Dict[str, Any] = {}
-    allowed_dirs: List[str] = []
-    unsafe_mode: bool = False
-    session_id: str = datetime.now().strftime("%Y%m%d_%H%M%S")
-    default_pipeline: Optional[str] = None
-    current_agent: Optional[str] = None
-
-class MistralAgent(BaseModel):
-    id: str
-    name: str
-    model: str
-    agent_type: str = "model"  # "model" ou "agent"
-    description: Optional[str] = None
-    instructions: Optional[str] = None
-    tools: List[str] = []
-    active: bool = True
-    encrypted_api_key: Optional[str] = None  # Clé API chiffrée
-    created_at: Optional[str] = None
-    version: Optional[str] = None
-
-    @field_validator('created_at', mode='before')
-    @classmethod
-    def validate_created_at(cls, v):
-        """Convertit les timestamps Unix en chaînes."""
-        if v is None:
-            return None
-        if isinstance(v, int):
-            # Convertir le timestamp Unix en string ISO
-            return datetime.fromtimestamp(v).isoformat()
-        if isinstance(v, (str, float)):
-            # Si c'est déjà une chaîne ou un float, le convertir en string
-            if isinstance(v, float):
-                return datetime.fromtimestamp(v).isoformat()
-            return str(v)
-        return v
-
-    @property
-    def api_key(self) -> Optional[str]:
-        """Déchiffre la clé API à la volée."""
-        if not self.encrypted_api_key:
-            return None
-        key = generate_or_load_key()
-        return decrypt_data(self.encrypted_api_key, key)
-
-    @api_key.setter
-    def api_key(self, value: str):
-        """Chiffre la clé API avant stockage."""
-        if value:
-            key = generate_or_load_key()
-            self.encrypted_api_key = encrypt_data(value, key)
-
-class MCPServer(BaseModel):
-    name: str
-    type: str  # 'api' ou 'npx'
-    url: Optional[str] = None
-    package: Optional[str] = None
-    encrypted_api_key: Optional[str] = None
-    active: bool = True
-    install_args: str = "--global"
-
-    @property
-    def api_key(self) -> Optional[str]:
-        if not self.encrypted_api_key:
-            return None
-        key = generate_or_load_key()
-        return decrypt_data(self.encrypted_api_key, key)
-
-    @api_key.setter
-    def api_key(self, value: str):
-        if value:
-            key = generate_or_load_key()
-            self.encrypted_api_key = encrypt_data(value, key)
-
-class PipelineStep(BaseModel):
-    step_type: str  # 'api', 'npx', 'python'
-    server: str
-    action: str
-    params: Dict[str, Any]
-
-class Pipeline(BaseModel):
-    name: str
-    steps: List[PipelineStep]
-
-class ChatSession(BaseModel):
-    session_id: str
-    context: Context
-    history: List[Dict[str, Any]] = []
-
-class NPXCache(BaseModel):
-    package: str
-    installed: bool = False
-    version: Optional[str] = None
+# --- Configuration ---
+SESSION_LIST_LIMIT = 20  # Sessions affichées avant « + » (plus anciennes)
+console = Console()
 
 # --- Gestion des outils npm ---
 def install_npm_tools():
@@ -209,13 +101,20 @@ def save_config(file_path: str, data: List):
 
 # --- Classe principale ---
 class MistralChatBot:
-    def __init__(self):
+    def __init__(self, use_cache: bool = True, cache_ttl: Optional[float] = None):
         self.current_session = None
+        # Cache des réponses de l'API pour les analyses de fichiers
+        self.use_cache = use_cache
+        self.cache_ttl = cache_ttl
         self.servers = load_config("config/servers.json", MCPServer)
         self.pipelines = load_config("config/pipelines.json", Pipeline)
         self.npx_cache = load_config("config/npx_cache.json", NPXCache)
-        self.agents = load_config(AGENTS_FILE, MistralAgent)
+        self.agents = AgentRegistry(load_config(AGENTS_FILE, MistralAgent), AGENTS_FILE)
+        self._catalog_refresh = None
+        self._npx_lock = threading.Lock()
+        self.sessions = SessionStore()
         self._initialize_session()
+        self._start_catalog_refresh()
 
     def _initialize_session(self):
         """Initialise une session ou charge une existante."""
@@ -225,6 +124,17 @@ class MistralChatBot:
 
     def _authenticate(self):
         """Interface d'authentification pour ajouter une clé API Mistral."""
+        # Clé fournie par MISTRAL_API_KEY ou le trousseau : pas de saisie ni de stockage
+        external_key = get_credentials().external_api_key()
+        if external_key:
+            console.print("🔑 Clé API fournie par l'environnement (MISTRAL_API_KEY ou trousseau)")
+            agents_data = self._fetch_mistral_agents(external_key)
+            if agents_data:
+                self._save_agents(agents_data, external_key, store_key=False)
+                self._auto_select_first_model()
+                return
+            console.print("[yellow]⚠️ Cette clé n'a pas permis de récupérer les modèles.[/yellow]")
+        
         auth_text = Text()
         auth_text.append("🔐 Authentification requise\n\n", style="bold yellow")
         auth_text.append("Pour utiliser Mistral CLI, vous devez ajouter une clé API Mistral.\n\n", style="white")
@@ -283,107 +193,81 @@ class MistralChatBot:
         if Confirm.ask("Souhaitez-vous installer les outils npm nécessaires ?", default=True):
             install_npm_tools()
 
-    def _fetch_mistral_agents(self, api_key: str) -> List[Dict[str, Any]]:
-        """Récupère les modèles et agents depuis l'API Mistral."""
+    def _fetch_mistral_agents(self, api_key: str, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """Récupère les modèles et agents (catalogue en cache, revalidé s'il est périmé)."""
+        catalog = ModelCatalog(api_key)
+        data = catalog.get(force=force_refresh)
+        if "models" in catalog.errors:
+            console.print(f"[red]❌ Erreur lors de la récupération des modèles:[/red] {catalog.errors['models']}")
+        if "agents" in catalog.errors:
+            console.print(f"[yellow]⚠️ Agents API non disponible (Beta):[/yellow] {catalog.errors['agents']}")
+        return self._catalog_to_agents(data)
+
+    def _catalog_to_agents(self, data: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Convertit les listes du catalogue en descriptions d'agents."""
         agents_list = []
-        headers = {"Authorization": f"Bearer {api_key}"}
-        
-        try:
-            # Récupérer les modèles disponibles
-            response = requests.get(
-                "https://api.mistral.ai/v1/models",
-                headers=headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            try:
-                models_response = response.json()
-            except ValueError as json_err:
-                console.print(f"[red]❌ Erreur de parsing JSON pour les modèles:[/red] {json_err}")
-                models_response = []
-            
-            # Gérer les différents formats de réponse API
-            if isinstance(models_response, dict):
-                models = models_response.get("data", [])
-            elif isinstance(models_response, list):
-                models = models_response
-            else:
-                models = []
-            
-            for model in models:
-                # Vérifier que le modèle a les clés requises
-                if not isinstance(model, dict) or "id" not in model:
-                    console.print(f"[dim red]Modèle ignoré (format invalide): {model}[/dim red]")
-                    continue
-                    
-                agents_list.append({
-                    "id": f"model-{model['id']}",
-                    "name": model["id"].replace("-", " ").title(),
-                    "model": model["id"],
-                    "agent_type": "model",
-                    "description": f"Modèle {model['id']}",
-                    "tools": [],
-                    "created_at": model.get("created"),
-                })
+        for model in data.get("models", []):
+            # Vérifier que le modèle a les clés requises
+            if not isinstance(model, dict) or "id" not in model:
+                console.print(f"[dim red]Modèle ignoré (format invalide): {model}[/dim red]")
+                continue
                 
-        except requests.RequestException as e:
-            console.print(f"[red]❌ Erreur lors de la récupération des modèles:[/red] {e}")
-            if hasattr(e, 'response') and e.response:
-                try:
-                    console.print(f"[dim red]Réponse API: {e.response.text}[/dim red]")
-                except:
-                    pass
+            agents_list.append({
+                "id": f"model-{model['id']}",
+                "name": model["id"].replace("-", " ").title(),
+                "model": model["id"],
+                "agent_type": "model",
+                "description": f"Modèle {model['id']}",
+                "tools": [],
+                "created_at": model.get("created"),
+            })
         
-        try:
-            # Récupérer les agents personnalisés (API Beta)
-            response = requests.get(
-                "https://api.mistral.ai/v1/agents",
-                headers=headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            agents_response = response.json()
-            
-            # Gérer les différents formats de réponse API pour les agents
-            if isinstance(agents_response, dict):
-                agents = agents_response.get("data", [])
-            elif isinstance(agents_response, list):
-                agents = agents_response
-            else:
-                agents = []
-            
-            for agent in agents:
-                # Vérifier que l'agent a les clés requises
-                if not isinstance(agent, dict) or "id" not in agent:
-                    console.print(f"[dim yellow]Agent ignoré (format invalide): {agent}[/dim yellow]")
-                    continue
-                    
-                tools_list = [tool.get("type", "") for tool in agent.get("tools", [])]
-                agents_list.append({
-                    "id": agent["id"],
-                    "name": agent.get("name", f"Agent {agent['id'][:8]}"),
-                    "model": agent.get("model", ""),
-                    "agent_type": "agent",
-                    "description": agent.get("description", ""),
-                    "instructions": agent.get("instructions", ""),
-                    "tools": tools_list,
-                    "created_at": agent.get("created_at"),
-                    "version": agent.get("version")
-                })
+        for agent in data.get("agents", []):
+            # Vérifier que l'agent a les clés requises
+            if not isinstance(agent, dict) or "id" not in agent:
+                console.print(f"[dim yellow]Agent ignoré (format invalide): {agent}[/dim yellow]")
+                continue
                 
-        except requests.RequestException as e:
-            console.print(f"[yellow]⚠️ Agents API non disponible (Beta):[/yellow] {e}")
-            if hasattr(e, 'response') and e.response:
-                try:
-                    console.print(f"[dim yellow]Réponse API: {e.response.text}[/dim yellow]")
-                except:
-                    pass
-            
+            tools_list = [tool.get("type", "") for tool in agent.get("tools", [])]
+            agents_list.append({
+                "id": agent["id"],
+                "name": agent.get("name", f"Agent {agent['id'][:8]}"),
+                "model": agent.get("model", ""),
+                "agent_type": "agent",
+                "description": agent.get("description", ""),
+                "instructions": agent.get("instructions", ""),
+                "tools": tools_list,
+                "created_at": agent.get("created_at"),
+                "version": agent.get("version")
+            })
         return agents_list
 
-    def _save_agents(self, agents_data: List[Dict[str, Any]], api_key: str):
-        """Sauvegarde les agents avec leur clé API chiffrée."""
+    def _start_catalog_refresh(self):
+        """Revalide le catalogue en arrière-plan si les agents sont déjà configurés."""
+        api_key = self.agents.api_key()
+        if api_key:
+            self._catalog_refresh = ModelCatalog(api_key).refresh_in_background()
+
+    def _apply_catalog_refresh(self):
+        """Ajoute les nouveautés du catalogue une fois le rafraîchissement terminé, sans attendre."""
+        refresh = self._catalog_refresh
+        if refresh is None or not refresh.done():
+            return
+        self._catalog_refresh = None
+        if refresh.exception() is not None:
+            return
+        agents_data = self._catalog_to_agents(refresh.result())
+        store_key = any(a.encrypted_api_key for a in self.agents)
+        added = self._save_agents(agents_data, self.agents.api_key(), store_key=store_key)
+        if added:
+            console.print(f"[dim]🔄 Catalogue mis à jour: {added} nouveaux modèles/agents[/dim]")
+
+    def _save_agents(self, agents_data: List[Dict[str, Any]], api_key: str, store_key: bool = True) -> int:
+        """Sauvegarde les agents avec leur clé API chiffrée ; retourne le nombre d'agents ajoutés.
+        
+        Avec store_key=False (clé venant de l'environnement), aucune clé n'est
+        écrite : les agents la retrouvent via MISTRAL_API_KEY ou le trousseau.
+        """
         new_agents = []
         for agent_data in agents_data:
             try:
@@ -398,20 +282,18 @@ class MistralChatBot:
                     created_at=agent_data.get("created_at"),
                     version=agent_data.get("version")
                 )
-                agent.api_key = api_key  # La propriété setter chiffre automatiquement
+                if store_key:
+                    agent.api_key = api_key  # La propriété setter chiffre automatiquement
                 new_agents.append(agent)
             except Exception as e:
                 console.print(f"[dim red]Erreur lors de la création de l'agent {agent_data.get('id', 'inconnu')}: {e}[/dim red]")
                 console.print(f"[dim red]Données: {agent_data}[/dim red]")
                 continue
 
-        existing_agents = load_config(AGENTS_FILE, MistralAgent)
-        updated_agents = existing_agents + [
-            a for a in new_agents if a.id not in {e.id for e in existing_agents}
-        ]
-
-        save_config(AGENTS_FILE, updated_agents)
-        self.agents = updated_agents
+        # Les agents déjà connus sont conservés ; le fichier n'est réécrit que s'il y a des ajouts
+        added = self.agents.merge(new_agents)
+        self.agents.save()
+        return added
 
     def _auto_select_first_model(self):
         """Sélectionne automatiquement le premier modèle disponible."""
@@ -419,7 +301,7 @@ class MistralChatBot:
             return
             
         # Chercher le premier modèle dans la liste
-        models = [a for a in self.agents if a.agent_type == "model"]
+        models = self.agents.by_type("model")
         if models:
             first_model = models[0]
             self.current_session.context.current_agent = first_model.id
@@ -429,12 +311,14 @@ class MistralChatBot:
 
     def create_custom_agent(self):
         """Crée un agent personnalisé via l'API Mistral."""
+        from rich.live import Live
+        from rich.spinner import Spinner
         if not self.agents:
             console.print("⚠️ Vous devez d'abord ajouter une clé API avec /add_agent")
             return
             
         # Prendre la clé API du premier agent disponible
-        api_key = next((a.api_key for a in self.agents if a.api_key), None)
+        api_key = self.agents.api_key()
         if not api_key:
             console.print("⚠️ Aucune clé API disponible")
             return
@@ -442,7 +326,7 @@ class MistralChatBot:
         console.print("\n🤖 [bold]Création d'un agent personnalisé[/bold]")
         
         # Récupérer les modèles disponibles pour la sélection
-        available_models = [a.model for a in self.agents if a.agent_type == "model"]
+        available_models = [a.model for a in self.agents.by_type("model")]
         if not available_models:
             console.print("⚠️ Aucun modèle disponible")
             return
@@ -481,11 +365,12 @@ class MistralChatBot:
             agent_data = {k: v for k, v in agent_data.items() if v is not None}
 
             with Live(Spinner("dots", text="Création de l'agent..."), console=console):
-                response = requests.post(
-                    "https://api.mistral.ai/v1/agents",
+                response = get_scheduler().post(
+                    f"{MISTRAL_API_URL}/agents",
                     headers=headers,
                     json=agent_data,
-                    timeout=30
+                    timeout=30,
+                    retry_server_errors=False  # Une création ne doit pas être rejouée
                 )
                 response.raise_for_status()
 
@@ -505,8 +390,8 @@ class MistralChatBot:
             )
             new_agent.api_key = api_key
             
-            self.agents.append(new_agent)
-            save_config(AGENTS_FILE, self.agents)
+            self.agents.upsert(new_agent)
+            self.agents.save()
             
             # Affichage de succès avec style
             success_text = Text()
@@ -555,8 +440,8 @@ class MistralChatBot:
         console.print("\n🤖 [bold]Agents Mistral disponibles:[/bold]")
         
         # Séparer les modèles et les agents
-        models = [a for a in self.agents if a.agent_type == "model"]
-        agents = [a for a in self.agents if a.agent_type == "agent"]
+        models = self.agents.by_type("model")
+        agents = self.agents.by_type("agent")
         
         # Liste numérotée pour la cohérence avec select_agent
         current_number = 1
@@ -592,8 +477,8 @@ class MistralChatBot:
             return
 
         # Séparer les modèles et les agents
-        models = [a for a in self.agents if a.agent_type == "model"]
-        agents = [a for a in self.agents if a.agent_type == "agent"]
+        models = self.agents.by_type("model")
+        agents = self.agents.by_type("agent")
         
         # Créer une liste numérotée
         console.print("\n[bold cyan]🎯 Sélection d'agent/modèle[/bold cyan]")
@@ -774,6 +659,43 @@ class MistralChatBot:
             save_config("config/servers.json", self.servers)
             console.print(f"✅ Serveur {server_name} supprimé.")
 
+    # --- Outils ---
+    def list_tools(self, filter_text: Optional[str] = None):
+        """Liste les outils des pipelines depuis le manifeste, sans importer leurs modules.
+
+        `filter_text` restreint la liste à un langage ou un type (linter, test, doc, security...).
+        """
+        import shutil
+        from mistral_cli.tool_registry import get_tool_registry
+        specs = get_tool_registry().specs()
+        if filter_text:
+            specs = [s for s in specs if filter_text in (s.kind, s.language, s.language.split("/")[0])]
+        if not specs:
+            console.print("Aucun outil trouvé.")
+            return
+
+        console.print("\n🧰 [bold]Outils disponibles pour les pipelines:[/bold]")
+        available: Dict[str, bool] = {}
+        language = None
+        for spec in specs:
+            if spec.language != language:
+                language = spec.language
+                console.print(f"\n[bold cyan]{language}[/bold cyan]")
+            if spec.binary and spec.binary not in available:
+                available[spec.binary] = shutil.which(spec.binary) is not None
+            status = "❌" if spec.binary and not available[spec.binary] else "✅"
+            binary = f" [dim]({spec.binary})[/dim]" if spec.binary else ""
+            origin = " [dim yellow]🔌 externe[/dim yellow]" if spec.source == "entry_point" else ""
+            console.print(f" {status} [green]{spec.name}[/green] [dim]{spec.kind}, entrée: {spec.input_mode}[/dim]"
+                          f"{binary}{origin}")
+            if spec.description:
+                console.print(f"     [dim italic]{spec.description}[/dim italic]")
+
+        missing = sum(1 for ok in available.values() if not ok)
+        console.print(f"\n[dim]📊 Total: {len(specs)} outils"
+                      f"{f', {missing} binaires introuvables (❌)' if missing else ''}[/dim]")
+        console.print("[dim]💡 Utilisez le nom d'un outil comme \"server\" d'une étape python de pipeline[/dim]")
+
     # --- Gestion des pipelines ---
     def display_pipelines(self):
         console.print("\n🔧 [bold]Gestion des pipelines[/bold]")
@@ -790,46 +712,30 @@ class MistralChatBot:
         self.current_session.context.default_pipeline = choice
         console.print(f"✅ Pipeline par défaut: [bold]{choice}[/bold]")
 
+    def _pipeline_engine(self):
+        from mistral_cli.pipeline_engine import PipelineEngine, open_step_cache
+        return PipelineEngine(
+            runners={"api": self._run_api_step, "npx": self._run_npx_step},
+            context=self.current_session.context,
+            base_data={"api_key": self.agents.api_key(), "use_cache": self.use_cache,
+                       "cache_ttl": self.cache_ttl},
+            cache=open_step_cache(self.use_cache),
+            versions={"npx": self._npx_version}
+        )
+
     def execute_pipeline(self, pipeline_name: str, user_input: str):
+        """Exécute un pipeline : les étapes indépendantes tournent en parallèle."""
         pipeline = next(p for p in self.pipelines if p.name == pipeline_name)
         console.print(f"\n🚀 Exécution du pipeline [bold]{pipeline.name}[/bold]:")
 
-        reasoning = []
-        current_data = user_input
-
-        for step in pipeline.steps:
-            server = next((s for s in self.servers if s.name == step.server and s.active), None)
-            if not server:
-                reasoning.append(f"❌ Serveur {step.server} non disponible.")
-                continue
-
-            reasoning.append(f"🔹 Étape [bold]{step.step_type}[/bold]: {step.server} ({step.action})")
-
-            if step.step_type == "api":
-                reasoning.append(f"   Appel API à {server.url}...")
-                current_data = f"Réponse simulée pour '{current_data[:30]}...'"
-
-            elif step.step_type == "npx":
-                if not server.package:
-                    reasoning.append(f"   ❌ Package npx non configuré pour {step.server}.")
-                    continue
-
-                if not self.install_npx_package(server.package, server.install_args):
-                    continue
-
-                output = self.run_npx_command(server.package, step.action, step.params)
-                if output:
-                    current_data = output
-
-            elif step.step_type == "python":
-                try:
-                    module_path = f"tools.{step.server.replace('/', '.')}"
-                    module = __import__(module_path, fromlist=[''])
-                    self.current_session.context.data["input"] = current_data
-                    self.current_session.context = module.execute(self.current_session.context)
-                    current_data = self.current_session.context.data.get("output", current_data)
-                except Exception as e:
-                    reasoning.append(f"   ❌ Erreur avec {step.server}: {e}")
+        engine = self._pipeline_engine()
+        try:
+            run = engine.run(pipeline, user_input)
+        except ValueError as e:
+            console.print(f"❌ Pipeline invalide: {e}")
+            return
+        reasoning = run["reasoning"]
+        current_data = run["output"]
 
         self.current_session.history.append({
             "input": user_input,
@@ -837,10 +743,83 @@ class MistralChatBot:
             "reasoning": reasoning,
             "timestamp": datetime.now().isoformat()
         })
+        self.save_session()
 
         console.print(Panel.fit("\n".join(reasoning)), style="blue", title="Raisonnement")
         console.print(f"\n[bold]Sortie>[/bold] {current_data}")
 
+    def map_pipeline(self):
+        """Exécute un pipeline sur chaque fichier d'un dossier et produit un rapport JSONL."""
+        if not self.pipelines:
+            console.print("⚠️ Aucun pipeline disponible.")
+            return
+
+        console.print("\n🗂️ [bold]Pipeline appliqué à un dossier[/bold]")
+        default = self.current_session.context.default_pipeline
+        choices = [p.name for p in self.pipelines]
+        pipeline_name = Prompt.ask("Pipeline", choices=choices,
+                                   default=default if default in choices else choices[0])
+        pipeline = next(p for p in self.pipelines if p.name == pipeline_name)
+
+        folder_path = Prompt.ask("Dossier à traiter", default=".")
+        if not os.path.isdir(folder_path):
+            console.print("❌ Dossier inexistant.")
+            return
+        console.print("\n[dim]Patterns de fichiers (séparés par des virgules):[/dim]")
+        patterns_input = Prompt.ask("Patterns", default="*.py,*.js,*.ts,*.php")
+        patterns = [p.strip() for p in patterns_input.split(",") if p.strip()]
+        recursive = Confirm.ask("Analyse récursive des sous-répertoires ?", default=True)
+        max_concurrency = int(Prompt.ask("Fichiers traités en parallèle", default="4"))
+
+        # Pas de spinner : une étape npx peut demander confirmation avant installation
+        console.print(f"\n🚀 Pipeline [bold]{pipeline.name}[/bold] sur {folder_path}...")
+        engine = self._pipeline_engine()
+        try:
+            summary = engine.map(pipeline, folder_path, patterns, recursive, max_concurrency)
+        except ValueError as e:
+            console.print(f"❌ Pipeline invalide: {e}")
+            return
+
+        if summary["interrupted"]:
+            console.print("⏸️ Traitement interrompu : le rapport contient les fichiers déjà traités.")
+        console.print(f"\n📊 Fichiers traités: {summary['processed_files']} "
+                      f"(erreurs: {summary['errors_count']}, ignorés: {summary['skipped_files']}) "
+                      f"en {summary['elapsed']:.2f} s")
+        for record in summary["detailed_results"]:
+            if "note" in record:
+                console.print(f"   [dim]{record['note']}[/dim]")
+            else:
+                status = "❌" if "error" in record or not all(s["ok"] for s in record["steps"].values()) else "✅"
+                console.print(f"   {status} {record['file_path']}")
+        console.print(f"📄 Rapport: [bold]{summary['report_file']}[/bold]")
+
+    def _active_server(self, step: PipelineStep) -> MCPServer:
+        server = next((s for s in self.servers if s.name == step.server and s.active), None)
+        if not server:
+            raise ValueError(f"Serveur {step.server} non disponible.")
+        return server
+
+    def _npx_version(self, step: PipelineStep) -> str:
+        """Version connue du paquet npx d'une étape (clé du cache des étapes)."""
+        server = next((s for s in self.servers if s.name == step.server), None)
+        package = server.package if server else None
+        cached = next((c for c in self.npx_cache if c.package == package), None)
+        return f"{package}@{cached.version if cached else ''}"
+
+    def _run_api_step(self, step: PipelineStep, input_text: str) -> str:
+        self._active_server(step)
+        return f"Réponse simulée pour '{input_text[:30]}...'"
+
+    def _run_npx_step(self, step: PipelineStep, input_text: str) -> str:
+        server = self._active_server(step)
+        if not server.package:
+            raise ValueError(f"Package npx non configuré pour {step.server}.")
+        # Une seule installation à la fois (cache npx partagé entre les étapes parallèles)
+        with self._npx_lock:
+            if not self.install_npx_package(server.package, server.install_args):
+                raise RuntimeError(f"installation de {server.package} impossible")
+        return self.run_npx_command(server.package, step.action, step.params) or input_text
+
     # --- Gestion des outils npx ---
     def install_npx_package(self, package: str, install_args: str = "--global") -> bool:
         cached = next((c for c in self.npx_cache if c.package == package), None)
@@ -876,22 +855,23 @@ class MistralChatBot:
             return ""
 
     # --- Gestion des sessions ---
+    def _new_session(self):
+        """Démarre une nouvelle session et sélectionne le premier modèle."""
+        self.current_session = ChatSession(
+            session_id=datetime.now().strftime("%Y%m%d_%H%M%S"),
+            context=Context(allowed_dirs=[os.getcwd()])
+        )
+        self._auto_select_first_model()
+
     def load_session(self):
-        """Charge une session existante ou en crée une nouvelle avec interface numérotée."""
+        """Charge une session existante ou en crée une nouvelle avec interface numérotée.
+        
+        La liste provient de l'index des sessions : seul l'historique de la
+        session choisie est lu.
+        """
         try:
-            os.makedirs("config/sessions", exist_ok=True)
-            sessions = []
-            session_files = [f for f in os.listdir("config/sessions") if f.endswith(".json")]
-            
-            for file in session_files:
-                try:
-                    with open(f"config/sessions/{file}", "r", encoding="utf-8") as f:
-                        sessions.extend([ChatSession(**s) for s in json.load(f)])
-                except Exception as e:
-                    console.print(f"[dim red]Erreur lors du chargement de {file}: {e}[/dim red]")
-                    continue
-
-            if not sessions:
+            total = self.sessions.count()
+            if not total:
                 self.current_session = ChatSession(
                     session_id=datetime.now().strftime("%Y%m%d_%H%M%S"),
                     context=Context(allowed_dirs=[os.getcwd()])
@@ -901,50 +881,61 @@ class MistralChatBot:
                 self._auto_select_first_model()
                 return
 
-            # Trier les sessions par date (plus récente en premier)
-            sessions.sort(key=lambda s: s.session_id, reverse=True)
-
-            # Interface de sélection avec numérotation
-            console.print("\n[bold cyan]💾 Sélection de session[/bold cyan]")
-            console.print("\n[bold cyan]📝 Sessions disponibles:[/bold cyan]")
-            
-            for i, session in enumerate(sessions, 1):
-                # Formatter la date pour l'affichage
-                try:
-                    session_date = datetime.strptime(session.session_id, "%Y%m%d_%H%M%S")
-                    formatted_date = session_date.strftime("%d/%m/%Y à %H:%M")
-                except:
-                    formatted_date = session.session_id
+            # Sessions les plus récentes d'abord ; les plus anciennes sur demande
+            limit = SESSION_LIST_LIMIT
+            while True:
+                sessions = self.sessions.list(limit)
                 
-                # Informations sur la session
-                agent_info = ""
-                if session.context.current_agent:
-                    try:
-                        agent = next(a for a in self.agents if a.id == session.context.current_agent)
-                        agent_icon = "📚" if agent.agent_type == "model" else "🤖"
-                        agent_info = f" [dim yellow]{agent_icon} {agent.name}[/dim yellow]"
-                    except:
-                        agent_info = " [dim red]Agent non trouvé[/dim red]"
+                # Interface de sélection avec numérotation
+                console.print("\n[bold cyan]💾 Sélection de session[/bold cyan]")
+                console.print("\n[bold cyan]📝 Sessions disponibles:[/bold cyan]")
                 
-                pipeline_info = ""
-                if session.context.default_pipeline:
-                    pipeline_info = f" [dim green]🔧 {session.context.default_pipeline}[/dim green]"
+                for i, session in enumerate(sessions, 1):
+                    # Formatter la date pour l'affichage
+                    try:
+                        session_date = datetime.strptime(session["session_id"], "%Y%m%d_%H%M%S")
+                        formatted_date = session_date.strftime("%d/%m/%Y à %H:%M")
+                    except ValueError:
+                        formatted_date = session["session_id"]
+                    
+                    # Informations sur la session
+                    agent_info = ""
+                    if session.get("agent"):
+                        agent = self.agents.get(session["agent"])
+                        if agent:
+                            agent_icon = "📚" if agent.agent_type == "model" else "🤖"
+                            agent_info = f" [dim yellow]{agent_icon} {agent.name}[/dim yellow]"
+                        else:
+                            agent_info = " [dim red]Agent non trouvé[/dim red]"
+                    
+                    pipeline_info = ""
+                    if session.get("pipeline"):
+                        pipeline_info = f" [dim green]🔧 {session['pipeline']}[/dim green]"
+                    
+                    # Nombre de messages dans l'historique
+                    msg_count = session.get("messages", 0)
+                    history_info = f" [dim]({msg_count} messages)[/dim]" if msg_count > 0 else " [dim](nouvelle)[/dim]"
+                    
+                    console.print(f"  {i:2d}. [cyan]{formatted_date}[/cyan]{agent_info}{pipeline_info}{history_info}")
                 
-                # Nombre de messages dans l'historique
-                msg_count = len(session.history)
-                history_info = f" [dim]({msg_count} messages)[/dim]" if msg_count > 0 else " [dim](nouvelle)[/dim]"
+                choices = [str(i) for i in range(len(sessions) + 1)]
+                if len(sessions) < total:
+                    console.print(f"\n   +. [dim]Afficher les {total - len(sessions)} sessions plus anciennes[/dim]")
+                    choices.append("+")
+                console.print(f"\n   0. [green]✨ Nouvelle session[/green]")
                 
-                console.print(f"  {i:2d}. [cyan]{formatted_date}[/cyan]{agent_info}{pipeline_info}{history_info}")
-            
-            console.print(f"\n   0. [green]✨ Nouvelle session[/green]")
-            
-            # Demander le choix
-            try:
+                # Demander le choix
                 choice = Prompt.ask(
                     f"\n[bold]Entrez le numéro de votre choix (0-{len(sessions)})[/bold]",
-                    choices=[str(i) for i in range(len(sessions) + 1)]
+                    choices=choices,
+                    show_choices=len(choices) <= SESSION_LIST_LIMIT + 2
                 )
-                
+                if choice == "+":
+                    limit = None
+                    continue
+                break
+            
+            try:
                 choice_num = int(choice)
                 
                 if choice_num == 0:
@@ -957,21 +948,27 @@ class MistralChatBot:
                     # Sélectionner automatiquement le premier modèle
                     self._auto_select_first_model()
                 else:
-                    # Charger session existante
-                    self.current_session = sessions[choice_num - 1]
+                    # Charger la session choisie, historique compris
+                    loaded = self.sessions.load(sessions[choice_num - 1]["session_id"])
+                    if loaded is None:
+                        raise ValueError("session illisible")
+                    self.current_session = loaded
                     
                     # Afficher les informations de la session chargée
-                    session_date = datetime.strptime(self.current_session.session_id, "%Y%m%d_%H%M%S")
-                    formatted_date = session_date.strftime("%d/%m/%Y à %H:%M")
+                    try:
+                        session_date = datetime.strptime(self.current_session.session_id, "%Y%m%d_%H%M%S")
+                        formatted_date = session_date.strftime("%d/%m/%Y à %H:%M")
+                    except ValueError:
+                        formatted_date = self.current_session.session_id
                     
                     console.print(f"📂 [bold cyan]Session chargée:[/bold cyan] {formatted_date}")
                     
                     if self.current_session.context.current_agent:
-                        try:
-                            agent = next(a for a in self.agents if a.id == self.current_session.context.current_agent)
+                        agent = self.agents.get(self.current_session.context.current_agent)
+                        if agent:
                             agent_icon = "📚" if agent.agent_type == "model" else "🤖"
                             console.print(f"   {agent_icon} Agent actif: [bold]{agent.name}[/bold]")
-                        except:
+                        else:
                             console.print(f"   [dim red]⚠️ Agent précédent non trouvé, sélection du premier modèle...[/dim red]")
                             self._auto_select_first_model()
                     else:
@@ -987,23 +984,15 @@ class MistralChatBot:
                         
             except (ValueError, IndexError):
                 console.print("[red]❌ Choix invalide, nouvelle session créée.[/red]")
-                self.current_session = ChatSession(
-                    session_id=datetime.now().strftime("%Y%m%d_%H%M%S"),
-                    context=Context(allowed_dirs=[os.getcwd()])
-                )
-                self._auto_select_first_model()
+                self._new_session()
                 
         except Exception as e:
             console.print(f"[red]❌ Erreur lors du chargement des sessions: {e}[/red]")
-            self.current_session = ChatSession(
-                session_id=datetime.now().strftime("%Y%m%d_%H%M%S"),
-                context=Context(allowed_dirs=[os.getcwd()])
-            )
-            self._auto_select_first_model()
+            self._new_session()
 
     def save_session(self):
-        """Sauvegarde la session courante."""
-        save_config(f"config/sessions/{self.current_session.session_id}.json", [self.current_session])
+        """Enregistre les nouveaux messages de la session courante (ajout au journal)."""
+        self.sessions.record(self.current_session)
 
     # --- Interface principale ---
     def show_help(self):
@@ -1019,9 +1008,12 @@ class MistralChatBot:
             ("/analyze_file", "Analyser un fichier avec Mistral AI", "🔍"),
             ("/analyze_batch", "Analyser plusieurs fichiers par lots", "📁"),
             ("/execute_command", "Exécuter un ordre sur un dossier entier", "⚡"),
+            ("/resume", "Reprendre un traitement interrompu", "⏯️"),
             ("/set_pipeline", "Définir un pipeline par défaut", "🔧"),
             ("/servers", "Gérer les serveurs MCP", "🌐"),
             ("/pipelines", "Gérer les pipelines", "⚙️"),
+            ("/tools", "Lister les outils des pipelines", "🧰"),
+            ("/map_pipeline", "Appliquer un pipeline à chaque fichier d'un dossier", "🗂️"),
             ("/sessions", "Changer de session", "📝"),
             ("/install-npm", "Installer les outils npm", "📦"),
             ("/help", "Affiche cette aide", "❓"),
@@ -1048,12 +1040,19 @@ class MistralChatBot:
         ))
 
     def call_mistral_agent(self, prompt: str) -> str:
-        """Appelle l'API Mistral avec l'agent/modèle sélectionné."""
+        """Appelle l'API Mistral avec l'agent/modèle sélectionné.
+        
+        La réponse est affichée au fil de l'eau puis ajoutée à l'historique de la
+        session, y compris lorsqu'elle est interrompue (Ctrl+C) en cours de route.
+        """
         if not self.current_session.context.current_agent:
             console.print("⚠️ Aucun agent sélectionné. Utilisez `/select_agent`.")
             return ""
 
-        agent = next(a for a in self.agents if a.id == self.current_session.context.current_agent)
+        agent = self.agents.get(self.current_session.context.current_agent)
+        if not agent:
+            console.print("⚠️ Agent introuvable. Utilisez `/select_agent`.")
+            return ""
         if not agent.api_key:
             console.print("⚠️ Clé API manquante pour cet agent.")
             return ""
@@ -1066,16 +1065,26 @@ class MistralChatBot:
             
             if agent.agent_type == "agent":
                 # Utiliser l'API Conversations pour les agents personnalisés
-                return self._call_agent_conversation(agent, prompt, headers)
+                response, interrupted = self._call_agent_conversation(agent, prompt, headers)
             else:
                 # Utiliser l'API Chat Completions pour les modèles
-                return self._call_model_completion(agent, prompt, headers)
+                response, interrupted = self._call_model_completion(agent, prompt, headers)
 
         except requests.RequestException as e:
             console.print(f"❌ Erreur API Mistral: {e}")
             return f"Erreur: {str(e)}"
+        
+        self.current_session.history.append({
+            "input": prompt,
+            "output": response,
+            "agent": agent.id,
+            "interrupted": interrupted,
+            "timestamp": datetime.now().isoformat()
+        })
+        self.save_session()  # Une ligne ajoutée au journal de la session
+        return response
     
-    def _call_model_completion(self, agent: MistralAgent, prompt: str, headers: dict) -> str:
+    def _call_model_completion(self, agent: MistralAgent, prompt: str, headers: dict) -> Tuple[str, bool]:
         """Appelle l'API Chat Completions pour un modèle."""
         data = {
             "model": agent.model,
@@ -1083,51 +1092,78 @@ class MistralChatBot:
             "max_tokens": 1000,
             "temperature": 0.7
         }
-
-        with Live(Spinner("dots", text="Interrogation du modèle Mistral..."), console=console):
-            response = requests.post(
-                "https://api.mistral.ai/v1/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=30
-            )
-            response.raise_for_status()
-
-        result = response.json()
-        return result.get("choices", [{}])[0].get("message", {}).get("content", "Réponse vide.")
+        
+        return self._stream_response(
+            f"{MISTRAL_API_URL}/chat/completions", data, headers,
+            header=f"[bold cyan]📚 {agent.name}>[/bold cyan]",
+            spinner_text="Interrogation du modèle Mistral...",
+            border_style="cyan"
+        )
     
-    def _call_agent_conversation(self, agent: MistralAgent, prompt: str, headers: dict) -> str:
+    def _call_agent_conversation(self, agent: MistralAgent, prompt: str, headers: dict) -> Tuple[str, bool]:
         """Appelle l'API Conversations pour un agent personnalisé."""
         # Créer une nouvelle conversation avec l'agent
         conversation_data = {
             "agent_id": agent.id,
             "inputs": [{"role": "user", "content": prompt}]
         }
-
-        with Live(Spinner("dots", text=f"Interrogation de l'agent {agent.name}..."), console=console):
-            response = requests.post(
-                "https://api.mistral.ai/v1/agents/completions",
-                headers=headers,
-                json=conversation_data,
-                timeout=30
-            )
-            response.raise_for_status()
-
-        result = response.json()
-        # Extraire la réponse de l'agent
-        choices = result.get("choices", [])
-        if choices:
-            return choices[0].get("message", {}).get("content", "Réponse vide.")
         
-        # Fallback pour d'autres formats de réponse
-        return result.get("output", "Réponse vide.")
+        return self._stream_response(
+            f"{MISTRAL_API_URL}/agents/completions", conversation_data, headers,
+            header=f"[bold magenta]🤖 {agent.name}>[/bold magenta]",
+            spinner_text=f"Interrogation de l'agent {agent.name}...",
+            border_style="magenta"
+        )
+    
+    def _stream_response(self, url: str, data: Dict[str, Any], headers: dict, header: str,
+                         spinner_text: str, border_style: str) -> Tuple[str, bool]:
+        """Demande une réponse en streaming (SSE) et l'affiche au fil des tokens.
+        
+        Retourne (texte, interrompu). Ctrl+C ou une coupure réseau en cours de
+        réponse arrête l'affichage mais conserve le texte déjà reçu.
+        """
+        from rich.live import Live
+        from rich.spinner import Spinner
+        from rich.markdown import Markdown
+        parts = []
+        interrupted = False
+        last_render = 0.0
+        
+        console.print(f"\n{header}")
+        with Live(Spinner("dots", text=spinner_text), console=console,
+                  refresh_per_second=12, vertical_overflow="visible") as live:
+            try:
+                with get_scheduler().post(url, headers=headers, json=dict(data, stream=True),
+                                          stream=True, timeout=30) as response:
+                    response.raise_for_status()
+                    for delta in iter_chat_deltas(response):
+                        parts.append(delta)
+                        # Limiter le rendu Markdown à ~20 par seconde
+                        now = time.monotonic()
+                        if now - last_render >= 0.05:
+                            live.update(Panel(Markdown("".join(parts)), border_style=border_style, padding=(0, 1)))
+                            last_render = now
+            except KeyboardInterrupt:
+                interrupted = True
+            except requests.RequestException as e:
+                if not parts:
+                    raise
+                console.print(f"❌ Flux interrompu: {e}")
+                interrupted = True
+            
+            text = "".join(parts) or ("" if interrupted else "Réponse vide.")
+            live.update(Panel(Markdown(text), border_style=border_style, padding=(0, 1)))
+        
+        if interrupted:
+            console.print("[yellow]⏸️ Réponse interrompue (texte partiel conservé dans l'historique)[/yellow]")
+        return text, interrupted
 
     def _display_session_status(self):
         """Affiche le statut de la session actuelle."""
         status_parts = []
         
-        if self.current_session.context.current_agent:
-            agent = next(a for a in self.agents if a.id == self.current_session.context.current_agent)
+        agent = self.agents.get(self.current_session.context.current_agent)
+        if agent:
             if agent.agent_type == "model":
                 status_parts.append(f"📚 [cyan]{agent.name}[/cyan]")
             else:
@@ -1146,12 +1182,15 @@ class MistralChatBot:
 
     def analyze_file(self):
         """Analyse un fichier unique avec Mistral AI."""
+        from rich.live import Live
+        from rich.spinner import Spinner
+        from rich.markdown import Markdown
         if not self.agents:
             console.print("⚠️ Vous devez d'abord ajouter une clé API avec /add_agent")
             return
         
         # Prendre la clé API du premier agent disponible
-        api_key = next((a.api_key for a in self.agents if a.api_key), None)
+        api_key = self.agents.api_key()
         if not api_key:
             console.print("⚠️ Aucune clé API disponible")
             return
@@ -1178,8 +1217,10 @@ class MistralChatBot:
         try:
             from mistral_cli.tools.file_analyzer.file_reader import FileAnalyzer
             
+            from mistral_cli.tools.file_analyzer.response_cache import open_response_cache
+            
             with Live(Spinner("dots", text="Analyse en cours..."), console=console):
-                analyzer = FileAnalyzer(api_key)
+                analyzer = FileAnalyzer(api_key, cache=open_response_cache(self.use_cache, self.cache_ttl))
                 
                 # Lire le fichier
                 content = analyzer.read_file_content(file_path)
@@ -1187,14 +1228,12 @@ class MistralChatBot:
                     console.print(f"❌ {content}")
                     return
                 
-                # Analyser
-                analysis = analyzer.analyze_with_mistral(content, analysis_type)
-                suggestions = analyzer.generate_improvements(content, analysis)
-                
-                # Appliquer les améliorations si demandé
-                applied = False
-                if apply_improvements:
-                    applied = analyzer.apply_suggestions(file_path, content, suggestions)
+                # Analyser (par morceaux si le fichier est gros) et appliquer si demandé
+                result = analyzer.analyze_file(file_path, content, analysis_type,
+                                               apply_improvements=apply_improvements)
+                analysis = result["analysis"]
+                suggestions = result["suggestions"]
+                applied = result["improvements_applied"]
             
             # Afficher les résultats
             console.print(f"\n📄 [bold cyan]Fichier analysé:[/bold cyan] {file_path}")
@@ -1220,12 +1259,14 @@ class MistralChatBot:
 
     def analyze_batch(self):
         """Analyse par lots de fichiers avec Mistral AI."""
+        from rich.live import Live
+        from rich.spinner import Spinner
         if not self.agents:
             console.print("⚠️ Vous devez d'abord ajouter une clé API avec /add_agent")
             return
         
         # Prendre la clé API du premier agent disponible
-        api_key = next((a.api_key for a in self.agents if a.api_key), None)
+        api_key = self.agents.api_key()
         if not api_key:
             console.print("⚠️ Aucune clé API disponible")
             return
@@ -1255,7 +1296,9 @@ class MistralChatBot:
         # Options avancées
         recursive = Confirm.ask("Analyse récursive des sous-répertoires ?", default=True)
         apply_improvements = Confirm.ask("Appliquer automatiquement les améliorations ?", default=False)
-        max_file_size = int(Prompt.ask("Taille max par fichier (bytes)", default="100000"))
+        max_file_size = int(Prompt.ask("Taille max par fichier (bytes)", default="1000000"))
+        max_concurrency = int(Prompt.ask("Requêtes simultanées vers l'API", default="4"))
+        incremental = Confirm.ask("Mode incrémental (ne réanalyser que les fichiers nouveaux ou modifiés) ?", default=False)
         
         try:
             from mistral_cli.tools.file_analyzer.batch_processor import execute
@@ -1269,6 +1312,10 @@ class MistralChatBot:
                 "recursive": recursive,
                 "apply_improvements": apply_improvements,
                 "max_file_size": max_file_size,
+                "max_concurrency": max_concurrency,
+                "incremental": incremental,
+                "use_cache": self.use_cache,
+                "cache_ttl": self.cache_ttl,
                 "api_key": api_key
             }
             
@@ -1277,29 +1324,7 @@ class MistralChatBot:
             
             # Afficher les résultats
             output_data = json.loads(result_context.data["output"])
-            
-            console.print(f"\n📊 [bold cyan]RÉSULTATS DE L'ANALYSE PAR LOTS[/bold cyan]")
-            console.print(f"📁 Répertoire: {directory}")
-            console.print(f"🔍 Type: {analysis_type}")
-            console.print(f"📄 Fichiers trouvés: {output_data['total_files_found']}")
-            console.print(f"✅ Fichiers traités: {output_data['files_processed']}")
-            console.print(f"❌ Erreurs: {output_data['files_with_errors']}")
-            
-            if output_data.get('summary'):
-                console.print("\n[bold green]📋 RÉSUMÉ:[/bold green]")
-                console.print(Panel(output_data['summary'], border_style="green"))
-            
-            if output_data.get('errors'):
-                console.print("\n[bold red]⚠️ ERREURS:[/bold red]")
-                for error in output_data['errors'][:5]:
-                    console.print(f"• {error}")
-            
-            # Sauvegarder le rapport détaillé
-            report_file = f"analysis_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
-            
-            console.print(f"\n💾 [bold blue]Rapport détaillé sauvegardé:[/bold blue] {report_file}")
+            self._display_batch_results(output_data, directory, analysis_type)
             
         except ImportError:
             console.print("❌ Module d'analyse par lots non trouvé.")
@@ -1308,12 +1333,14 @@ class MistralChatBot:
 
     def execute_command_on_folder(self):
         """Exécute un ordre en langage naturel sur un dossier entier et ses sous-dossiers."""
+        from rich.live import Live
+        from rich.spinner import Spinner
         if not self.agents:
             console.print("⚠️ Vous devez d'abord ajouter une clé API avec /add_agent")
             return
         
         # Prendre la clé API du premier agent disponible
-        api_key = next((a.api_key for a in self.agents if a.api_key), None)
+        api_key = self.agents.api_key()
         if not api_key:
             console.print("⚠️ Aucune clé API disponible")
             return
@@ -1365,21 +1392,8 @@ class MistralChatBot:
         recursive = Confirm.ask("Analyse récursive des sous-répertoires ?", default=True)
         
         # Prévisualisation
-        files_found = []
-        if recursive:
-            for root, dirs, files in os.walk(folder_path):
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in [
-                    'node_modules', 'build', 'dist', '__pycache__', 'target'
-                ]]
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if any(fnmatch.fnmatch(file, pattern) for pattern in patterns):
-                        files_found.append(file_path)
-        else:
-            for file in os.listdir(folder_path):
-                file_path = os.path.join(folder_path, file)
-                if os.path.isfile(file_path) and any(fnmatch.fnmatch(file, pattern) for pattern in patterns):
-                    files_found.append(file_path)
+        from mistral_cli.tools.file_analyzer.file_discovery import iter_files
+        files_found = [found.path for found in iter_files(folder_path, patterns, recursive)]
         
         console.print(f"\n📊 [bold]Prévisualisation:[/bold]")
         console.print(f"📁 Dossier: {folder_path}")
@@ -1404,7 +1418,8 @@ class MistralChatBot:
             return
         
         apply_changes = Confirm.ask("Appliquer automatiquement les modifications ?", default=False)
-        max_file_size = int(Prompt.ask("Taille max par fichier (bytes)", default="100000"))
+        max_file_size = int(Prompt.ask("Taille max par fichier (bytes)", default="1000000"))
+        incremental = Confirm.ask("Mode incrémental (ignorer les fichiers inchangés depuis le dernier passage) ?", default=False)
         
         # Exécution avec le nouveau système de langage naturel
         try:
@@ -1420,6 +1435,9 @@ class MistralChatBot:
                     "recursive": recursive,
                     "apply_changes": apply_changes,
                     "max_file_size": max_file_size,
+                    "incremental": incremental,
+                    "use_cache": self.use_cache,
+                    "cache_ttl": self.cache_ttl,
                     "api_key": api_key
                 }
                 
@@ -1429,36 +1447,7 @@ class MistralChatBot:
             # Afficher les résultats
             try:
                 output_data = json.loads(result_context.data["output"])
-                
-                console.print(f"\n✅ [bold green]EXÉCUTION TERMINÉE[/bold green]")
-                console.print(f"🗣️ Ordre: « {natural_command} »")
-                console.print(f"📁 Dossier: {folder_path}")
-                console.print(f"📄 Fichiers trouvés: {output_data.get('total_files_found', 0)}")
-                console.print(f"✅ Fichiers traités: {output_data.get('files_processed', 0)}")
-                console.print(f"🔄 Fichiers modifiés: {output_data.get('files_changed', 0)}")
-                console.print(f"⏭️ Fichiers ignorés: {output_data.get('files_skipped', 0)}")
-                console.print(f"❌ Erreurs: {output_data.get('errors_count', 0)}")
-                
-                if output_data.get('summary'):
-                    console.print("\n[bold green]📋 RAPPORT DÉTAILLÉ:[/bold green]")
-                    console.print(Panel(output_data['summary'], border_style="green"))
-                
-                if output_data.get('errors'):
-                    console.print("\n[bold red]⚠️ ERREURS:[/bold red]")
-                    for error in output_data['errors']:
-                        console.print(f"• {error}")
-                
-                # Sauvegarder le rapport
-                report_file = f"natural_language_execution_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                with open(report_file, 'w', encoding='utf-8') as f:
-                    json.dump(output_data, f, indent=2, ensure_ascii=False)
-                
-                console.print(f"\n💾 [bold blue]Rapport détaillé sauvegardé:[/bold blue] {report_file}")
-                
-                if apply_changes and output_data.get('files_changed', 0) > 0:
-                    console.print(f"\n🔄 [bold yellow]MODIFICATIONS APPLIQUÉES[/bold yellow]")
-                    console.print(f"📁 Les fichiers originaux sont sauvegardés avec l'extension .backup")
-                    console.print(f"⚠️ Vérifiez les modifications avant de supprimer les backups")
+                self._display_execution_results(output_data, natural_command, folder_path, apply_changes)
                 
             except json.JSONDecodeError:
                 console.print(f"❌ Erreur lors du parsing des résultats: {result_context.data['output']}")
@@ -1468,13 +1457,163 @@ class MistralChatBot:
         except Exception as e:
             console.print(f"❌ Erreur lors de l'exécution: {str(e)}")
     
+    def resume_run(self, run_id: Optional[str] = None):
+        """Reprend un traitement sur dossier interrompu à partir de son point de reprise."""
+        from rich.live import Live
+        from rich.spinner import Spinner
+        from mistral_cli.tools.file_analyzer.checkpoint import RunCheckpoint, list_checkpoints
+        
+        if not run_id:
+            runs = list_checkpoints()
+            if not runs:
+                console.print("ℹ️ Aucun traitement interrompu.")
+                return
+            
+            console.print("\n[bold cyan]⏯️ Traitements à reprendre:[/bold cyan]")
+            for i, meta in enumerate(runs, 1):
+                params = meta.get("params", {})
+                folder = params.get("directory") or params.get("folder_path", "?")
+                console.print(f"  {i}. [cyan]{meta['run_id']}[/cyan] - {folder} "
+                              f"[dim]({meta.get('completed', 0)} fichiers terminés, {meta.get('status', '?')})[/dim]")
+            
+            choice = Prompt.ask("Numéro du traitement à reprendre", default="1")
+            try:
+                run_id = runs[int(choice) - 1]["run_id"]
+            except (ValueError, IndexError):
+                console.print("❌ Choix invalide.")
+                return
+        
+        checkpoint = RunCheckpoint.open(run_id)
+        if checkpoint is None:
+            console.print(f"❌ Point de reprise introuvable: {run_id}")
+            return
+        if checkpoint.meta.get("status") == "completed":
+            console.print(f"✅ Le traitement {run_id} est déjà terminé.")
+            return
+        
+        api_key = self.agents.api_key()
+        if not api_key:
+            console.print("⚠️ Aucune clé API disponible")
+            return
+        
+        tool = checkpoint.meta.get("tool")
+        modules = {
+            "analyze_batch": "mistral_cli.tools.file_analyzer.batch_processor",
+            "natural_command": "mistral_cli.tools.file_analyzer.natural_language_executor",
+            "execute_command": "mistral_cli.tools.file_analyzer.command_executor"
+        }
+        if tool not in modules:
+            console.print(f"❌ Outil inconnu pour ce traitement: {tool}")
+            return
+        
+        params = checkpoint.params
+        console.print(f"\n⏯️ [bold green]Reprise du traitement {run_id}[/bold green] "
+                      f"({checkpoint.completed} fichiers déjà terminés)")
+        
+        try:
+            module = __import__(modules[tool], fromlist=[''])
+            context = Context()
+            context.data = dict(params, run_id=run_id, api_key=api_key,
+                                use_cache=self.use_cache, cache_ttl=self.cache_ttl)
+            
+            with Live(Spinner("dots", text="Reprise du traitement en cours..."), console=console):
+                result_context = module.execute(context)
+            
+            output_data = json.loads(result_context.data["output"])
+            if tool == "analyze_batch":
+                self._display_batch_results(output_data, params.get("directory", "."),
+                                            params.get("analysis_type", "general"))
+            else:
+                self._display_execution_results(
+                    output_data, params.get("natural_command") or params.get("command", ""),
+                    params.get("folder_path", "."), params.get("apply_changes", False)
+                )
+        except json.JSONDecodeError:
+            console.print(f"❌ {result_context.data['output']}")
+        except Exception as e:
+            console.print(f"❌ Erreur lors de la reprise: {str(e)}")
+    
+    def _display_batch_results(self, output_data: Dict[str, Any], directory: str, analysis_type: str):
+        """Affiche le résultat d'une analyse par lots."""
+        console.print(f"\n📊 [bold cyan]RÉSULTATS DE L'ANALYSE PAR LOTS[/bold cyan]")
+        console.print(f"📁 Répertoire: {directory}")
+        console.print(f"🔍 Type: {analysis_type}")
+        console.print(f"📄 Fichiers trouvés: {output_data['total_files_found']}")
+        console.print(f"✅ Fichiers traités: {output_data['files_processed']}")
+        if output_data.get('files_reused'):
+            console.print(f"♻️ Résultats réutilisés (fichiers inchangés): {output_data['files_reused']}")
+        if output_data.get('files_resumed'):
+            console.print(f"⏯️ Fichiers repris d'un passage interrompu: {output_data['files_resumed']}")
+        console.print(f"❌ Erreurs: {output_data['files_with_errors']}")
+        
+        if output_data.get('summary'):
+            console.print("\n[bold green]📋 RÉSUMÉ:[/bold green]")
+            console.print(Panel(output_data['summary'], border_style="green"))
+        
+        if output_data.get('errors'):
+            console.print("\n[bold red]⚠️ ERREURS:[/bold red]")
+            for error in output_data['errors'][:5]:
+                console.print(f"• {error}")
+        
+        # Le rapport détaillé (un résultat par ligne) est écrit pendant le traitement
+        console.print(f"\n💾 [bold blue]Rapport détaillé sauvegardé:[/bold blue] {output_data['report_file']}")
+        
+        self._display_run_status(output_data)
+
+    def _display_execution_results(self, output_data: Dict[str, Any], command: str,
+                                   folder_path: str, apply_changes: bool):
+        """Affiche le résultat d'un ordre exécuté sur un dossier."""
+        if output_data.get('interrupted'):
+            console.print(f"\n⏸️ [bold yellow]EXÉCUTION INTERROMPUE[/bold yellow]")
+        else:
+            console.print(f"\n✅ [bold green]EXÉCUTION TERMINÉE[/bold green]")
+        console.print(f"🗣️ Ordre: « {command} »")
+        console.print(f"📁 Dossier: {folder_path}")
+        console.print(f"📄 Fichiers trouvés: {output_data.get('total_files_found', 0)}")
+        console.print(f"✅ Fichiers traités: {output_data.get('files_processed', 0)}")
+        console.print(f"🔄 Fichiers modifiés: {output_data.get('files_changed', 0)}")
+        console.print(f"⏭️ Fichiers ignorés: {output_data.get('files_skipped', 0)}")
+        if output_data.get('files_reused'):
+            console.print(f"♻️ Fichiers inchangés (résultat précédent réutilisé): {output_data['files_reused']}")
+        if output_data.get('files_resumed'):
+            console.print(f"⏯️ Fichiers repris d'un passage interrompu: {output_data['files_resumed']}")
+        console.print(f"❌ Erreurs: {output_data.get('errors_count', 0)}")
+        
+        if output_data.get('summary'):
+            console.print("\n[bold green]📋 RAPPORT DÉTAILLÉ:[/bold green]")
+            console.print(Panel(output_data['summary'], border_style="green"))
+        
+        if output_data.get('errors'):
+            console.print("\n[bold red]⚠️ ERREURS:[/bold red]")
+            for error in output_data['errors']:
+                console.print(f"• {error}")
+        
+        # Le rapport détaillé (un résultat par ligne) est écrit pendant le traitement
+        console.print(f"\n💾 [bold blue]Rapport détaillé sauvegardé:[/bold blue] {output_data['report_file']}")
+        
+        if apply_changes and output_data.get('files_changed', 0) > 0:
+            console.print(f"\n🔄 [bold yellow]MODIFICATIONS APPLIQUÉES[/bold yellow]")
+            console.print(f"📁 Les fichiers originaux sont sauvegardés avec l'extension .backup")
+            console.print(f"⚠️ Vérifiez les modifications avant de supprimer les backups")
+        
+        self._display_run_status(output_data)
+
+    def _display_run_status(self, output_data: Dict[str, Any]):
+        """Indique comment reprendre un traitement interrompu."""
+        run_id = output_data.get('run_id')
+        if output_data.get('interrupted') and run_id:
+            console.print(f"\n⏸️ [bold yellow]Traitement interrompu[/bold yellow] — les fichiers terminés sont conservés.")
+            console.print(f"▶️ Reprendre avec [cyan]/resume {run_id}[/cyan] ou [cyan]mistral-cli --resume {run_id}[/cyan]")
+
     def start(self):
         """Démarre l'interface conversationnelle."""
+        import readline  # Édition de ligne et historique pour console.input
+        
         # Affichage de bienvenue amélioré
         welcome_text = Text()
         welcome_text.append("🚀 Bienvenue dans ", style="bold cyan")
         welcome_text.append("Mistral CLI", style="bold magenta")
-        welcome_text.append(" v0.1.0", style="dim cyan")
+        welcome_text.append(f" v{__version__}", style="dim cyan")
         welcome_text.append("\n\n", style="")
         welcome_text.append("✨ Votre assistant IA avec modèles et agents personnalisés", style="italic blue")
         
@@ -1490,12 +1629,14 @@ class MistralChatBot:
 
         while True:
             try:
+                self._apply_catalog_refresh()
+                
                 # Prompt personnalisé avec informations contextuelles
                 prompt_parts = []
                 
                 # Indicateur d'agent actuel
-                if self.current_session.context.current_agent:
-                    agent = next(a for a in self.agents if a.id == self.current_session.context.current_agent)
+                agent = self.agents.get(self.current_session.context.current_agent)
+                if agent:
                     if agent.agent_type == "model":
                         prompt_parts.append(f"[dim cyan]📚 {agent.name}[/dim cyan]")
                     else:
@@ -1536,6 +1677,11 @@ class MistralChatBot:
                     self.set_default_pipeline()
                 elif user_input.lower() == "/servers":
                     self.manage_servers()
+                elif user_input.lower().split()[0] == "/tools":
+                    parts = user_input.split(maxsplit=1)
+                    self.list_tools(parts[1].strip() if len(parts) > 1 else None)
+                elif user_input.lower() == "/map_pipeline":
+                    self.map_pipeline()
                 elif user_input.lower() == "/pipelines":
                     self.display_pipelines()
                     if self.pipelines:
@@ -1548,6 +1694,9 @@ class MistralChatBot:
                     self.analyze_batch()
                 elif user_input.lower() == "/execute_command":
                     self.execute_command_on_folder()
+                elif user_input.lower().split()[0] == "/resume":
+                    parts = user_input.split(maxsplit=1)
+                    self.resume_run(parts[1].strip() if len(parts) > 1 else None)
                 elif user_input.lower() == "/install-npm":
                     install_npm_tools()
                 elif user_input.lower() == "/help":
@@ -1555,25 +1704,8 @@ class MistralChatBot:
                     # Afficher aussi le statut actuel après l'aide
                     self._display_session_status()
                 elif self.current_session.context.current_agent and not user_input.startswith("/"):
-                    response = self.call_mistral_agent(user_input)
-                    
-                    # Affichage de la réponse avec formatting amélioré
-                    agent = next(a for a in self.agents if a.id == self.current_session.context.current_agent)
-                    if agent.agent_type == "model":
-                        header = f"[bold cyan]📚 {agent.name}>[/bold cyan]"
-                    else:
-                        header = f"[bold magenta]🤖 {agent.name}>[/bold magenta]"
-                    
-                    # Afficher la réponse dans un panel si elle est longue
-                    if len(response) > 200:
-                        console.print(f"\n{header}")
-                        console.print(Panel(
-                            Markdown(response),
-                            border_style="cyan" if agent.agent_type == "model" else "magenta",
-                            padding=(0, 1)
-                        ))
-                    else:
-                        console.print(f"\n{header} {response}")
+                    # La réponse est affichée au fil de l'eau pendant l'appel
+                    self.call_mistral_agent(user_input)
                 elif self.current_session.context.default_pipeline:
                     self.execute_pipeline(self.current_session.context.default_pipeline, user_input)
                 else:
@@ -1598,45 +1730,47 @@ class MistralChatBot:
 # --- Point d'entrée ---
 def main():
     """Point d'entrée principal de l'application."""
-    import sys
+    from mistral_cli.__main__ import handle_info_options
+    
+    # --help et --version sont traités sans charger l'interface
+    if handle_info_options(sys.argv):
+        return
     
-    # Gérer les arguments de ligne de commande
-    if len(sys.argv) > 1:
-        arg = sys.argv[1]
-        if arg in ['--help', '-h']:
-            print("""
-🤖 Mistral CLI v0.1.0 - Assistant IA avec modèles et agents personnalisés
-
-Usage: mistral-cli [options]
-
-Options:
-  -h, --help     Affiche cette aide
-  --version      Affiche la version
-
-Fonctionnalités:
-  📚 Modèles Mistral - Chat direct avec les modèles
-  🤖 Agents personnalisés - Agents avec outils intégrés
-  🔧 Outils de développement multi-langages
-  💾 Sessions persistantes
-  🔒 Chiffrement des clés API
-
-Pour commencer:
-  1. Lancez 'mistral-cli' 
-  2. Entrez votre clé API Mistral (https://mistral.ai)
-  3. Sélectionnez un agent ou créez-en un nouveau
-
-Commandes disponibles dans l'interface:
-  /create_agent  - Créer un agent avec outils
-  /list_agents   - Voir tous les agents disponibles
-  /help         - Aide complète
-            """)
+    from mistral_cli.tools.file_analyzer.response_cache import DEFAULT_RESPONSE_TTL
+    use_cache = "--no-cache" not in sys.argv
+    cache_ttl = DEFAULT_RESPONSE_TTL
+    if "--cache-ttl" in sys.argv:
+        try:
+            cache_ttl = float(sys.argv[sys.argv.index("--cache-ttl") + 1])
+        except (IndexError, ValueError):
+            print("❌ --cache-ttl attend une durée en secondes")
             return
-        elif arg in ['--version', '-v']:
-            print("mistral-cli 0.1.0")
+    
+    # Limites de débit de l'ordonnanceur des requêtes
+    limits = {}
+    for option, name in [("--rate-limit", "requests_per_second"), ("--tokens-per-minute", "tokens_per_minute")]:
+        if option in sys.argv:
+            try:
+                limits[name] = float(sys.argv[sys.argv.index(option) + 1])
+            except (IndexError, ValueError):
+                print(f"❌ {option} attend une valeur numérique")
+                return
+    if limits:
+        from mistral_cli.scheduler import configure_scheduler
+        configure_scheduler(**limits)
+    
+    resume_id = None
+    if "--resume" in sys.argv:
+        try:
+            resume_id = sys.argv[sys.argv.index("--resume") + 1]
+        except IndexError:
+            print("❌ --resume attend l'identifiant du traitement (voir /resume)")
             return
     
     os.makedirs("config/sessions", exist_ok=True)
-    bot = MistralChatBot()
+    bot = MistralChatBot(use_cache=use_cache, cache_ttl=cache_ttl)
+    if resume_id:
+        bot.resume_run(resume_id)
     bot.start()
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+"""
+Contexte d'exécution partagé entre l'interface et les outils.
+
+Ce module ne dépend que de la bibliothèque standard : les outils
+(`tools/<langage>/*.py`) l'importent sans charger rich, pydantic, requests ni
+cryptography, ce qui garde leur démarrage quasi immédiat.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+def _new_session_id() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+@dataclass
+class Context:
+    """Données échangées entre les étapes : chaque outil lit et complète `data`."""
+    data: Dict[str, Any] = field(default_factory=dict)
+    allowed_dirs: List[str] = field(default_factory=list)
+    unsafe_mode: bool = False
+    session_id: str = field(default_factory=_new_session_id)
+    default_pipeline: Optional[str] = None
+    current_agent: Optional[str] = None
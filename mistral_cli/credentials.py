@@ -0,0 +1,131 @@
+"""
+Fournisseur de clés API.
+
+La clé de chiffrement (`config/secret.key`) est lue une seule fois et les clés
+API déchiffrées sont conservées en mémoire pour la durée du processus : les
+accès répétés (chaque message, chaque fichier d'un lot) ne font plus ni lecture
+disque ni déchiffrement Fernet. `invalidate()` vide ce cache, par exemple après
+un changement de `secret.key`.
+
+Une clé peut aussi être fournie sans être stockée dans `config/` :
+variable d'environnement `MISTRAL_API_KEY`, ou trousseau du système si le paquet
+optionnel `keyring` est installé (service « mistral-cli », compte « api_key »).
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+SECRET_KEY_FILE = "config/secret.key"
+ENV_API_KEY = "MISTRAL_API_KEY"
+KEYRING_SERVICE = "mistral-cli"
+KEYRING_USERNAME = "api_key"
+
+_provider: Optional["CredentialProvider"] = None
+_provider_lock = threading.Lock()
+
+
+# --- Génération et gestion de la clé de chiffrement ---
+def generate_or_load_key(key_file: str = SECRET_KEY_FILE) -> bytes:
+    """Génère ou charge une clé de chiffrement."""
+    os.makedirs(os.path.dirname(key_file) or ".", exist_ok=True)
+    if not os.path.exists(key_file):
+        from cryptography.fernet import Fernet
+        key = Fernet.generate_key()
+        with open(key_file, "wb") as f:
+            f.write(key)
+    else:
+        with open(key_file, "rb") as f:
+            key = f.read()
+    return key
+
+def encrypt_data(data: str, key: bytes) -> str:
+    """Chiffre les données sensibles."""
+    from cryptography.fernet import Fernet
+    cipher = Fernet(key)
+    return cipher.encrypt(data.encode()).decode()
+
+def decrypt_data(encrypted_data: str, key: bytes) -> str:
+    """Déchiffre les données."""
+    from cryptography.fernet import Fernet
+    cipher = Fernet(key)
+    return cipher.decrypt(encrypted_data.encode()).decode()
+
+
+class CredentialProvider:
+    """Chiffre et déchiffre les clés API avec une clé chargée une seule fois."""
+
+    def __init__(self, key_file: str = SECRET_KEY_FILE):
+        self.key_file = key_file
+        self._cipher = None
+        self._decrypted: Dict[str, str] = {}  # Jeton chiffré -> clé en clair
+        self._external: Optional[str] = None
+        self._external_loaded = False
+        self._lock = threading.Lock()
+
+    def _get_cipher(self):
+        if self._cipher is None:
+            with self._lock:
+                if self._cipher is None:
+                    from cryptography.fernet import Fernet
+                    self._cipher = Fernet(generate_or_load_key(self.key_file))
+        return self._cipher
+
+    def encrypt(self, value: str) -> str:
+        """Chiffre une clé API ; la valeur en clair reste en cache pour les lectures suivantes."""
+        token = self._get_cipher().encrypt(value.encode()).decode()
+        self._decrypted[token] = value
+        return token
+
+    def decrypt(self, token: str) -> str:
+        """Déchiffre une clé API, une seule fois par jeton et par processus."""
+        value = self._decrypted.get(token)
+        if value is None:
+            value = self._get_cipher().decrypt(token.encode()).decode()
+            self._decrypted[token] = value
+        return value
+
+    def external_api_key(self) -> Optional[str]:
+        """Clé fournie hors de `config/` : MISTRAL_API_KEY, puis trousseau du système."""
+        env_key = os.environ.get(ENV_API_KEY, "").strip()
+        if env_key:
+            return env_key
+        if not self._external_loaded:
+            self._external = _keyring_api_key()
+            self._external_loaded = True
+        return self._external
+
+    def invalidate(self):
+        """Oublie la clé de chiffrement et les clés déchiffrées (rechargées au prochain accès)."""
+        with self._lock:
+            self._cipher = None
+            self._decrypted.clear()
+            self._external = None
+            self._external_loaded = False
+
+
+def _keyring_api_key() -> Optional[str]:
+    try:
+        import keyring
+    except ImportError:
+        return None  # Dépendance optionnelle
+    try:
+        return keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME) or None
+    except Exception:
+        return None  # Trousseau indisponible (pas de session graphique, etc.)
+
+
+def get_credentials() -> CredentialProvider:
+    """Retourne le fournisseur partagé, créé à la première utilisation."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = CredentialProvider()
+    return _provider
+
+
+def invalidate_credentials():
+    """Vide le cache des clés du fournisseur partagé."""
+    if _provider is not None:
+        _provider.invalidate()
@@ -0,0 +1,131 @@
+"""
+Cache persistant sur disque, adressé par contenu.
+
+Chaque entrée est un petit fichier JSON nommé d'après le hash de sa clé.
+La date de modification des fichiers sert d'horodatage LRU : elle est mise à
+jour à chaque lecture, et les entrées les plus anciennes sont supprimées dès
+que la taille totale dépasse la limite configurée.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024  # 100 Mo
+
+
+class DiskCache:
+    """Cache clé/valeur JSON sur disque avec éviction LRU par taille et TTL."""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl: Optional[float] = None, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Calcule une clé stable à partir de valeurs sérialisables en JSON."""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retourne la valeur en cache, ou None si absente ou expirée."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self.ttl is not None and time.time() - entry.get("created_at", 0) > self.ttl:
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path, None)  # Marquer l'entrée comme récemment utilisée
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key: str, value: Any):
+        """Enregistre une valeur et déclenche l'éviction si nécessaire."""
+        if not self.enabled:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"created_at": time.time(), "value": value}, f, ensure_ascii=False)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            new_size = os.path.getsize(path)
+        except OSError:
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += new_size - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def clear(self):
+        """Supprime toutes les entrées du cache."""
+        with self._lock:
+            for path, _, _ in self._entries():
+                self._remove(path)
+            self._total_bytes = 0
+
+    def _entries(self):
+        """Liste (chemin, taille, date d'accès) de toutes les entrées."""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(".json"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées (jusqu'à 90% de la limite)."""
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+        self._total_bytes = total
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,77 @@
+// Worker ESLint persistant utilisé par mistral_cli/linter_workers.py.
+// ESLint est chargé une seule fois ; chaque ligne reçue sur stdin est une requête
+// JSON {id, code, filePath, cwd, config} (extrait) ou {id, files, cwd, config}
+// (fichiers existants), chaque réponse une ligne JSON {id, output, results} ou
+// {id, error} sur stdout. `config` est l'empreinte des fichiers de configuration
+// du projet : le moteur d'un répertoire est recréé quand elle change.
+
+"use strict";
+
+const path = require("path");
+const readline = require("readline");
+
+function loadESLint() {
+  const candidates = [process.env.MISTRAL_ESLINT_PATH, process.cwd(), __dirname].filter(Boolean);
+  for (const base of candidates) {
+    try {
+      return require(require.resolve("eslint", { paths: [base] }));
+    } catch (e) {
+      // Essayer l'emplacement suivant
+    }
+  }
+  return require("eslint"); // NODE_PATH
+}
+
+let eslintModule = null;
+let loadError = null;
+try {
+  eslintModule = loadESLint();
+  if (!eslintModule.ESLint) {
+    loadError = "version d'ESLint trop ancienne (API ESLint absente)";
+  }
+} catch (e) {
+  loadError = `ESLint introuvable: ${e.message}`;
+}
+
+const linters = new Map(); // Un moteur (et son formateur) par répertoire de travail
+
+async function getLinter(cwd, config) {
+  let linter = linters.get(cwd);
+  if (!linter || linter.config !== config) {
+    // Configuration modifiée : ESLint garde en mémoire celle lue à sa création
+    const eslint = new eslintModule.ESLint({ cwd });
+    linter = { eslint, config, formatter: await eslint.loadFormatter("stylish") };
+    linters.set(cwd, linter);
+  }
+  return linter;
+}
+
+async function handle(request) {
+  if (loadError) {
+    return { id: request.id, error: loadError, fatal: true };
+  }
+  const cwd = request.cwd || process.cwd();
+  const { eslint, formatter } = await getLinter(cwd, request.config || "");
+  const results = request.files
+    ? await eslint.lintFiles(request.files)
+    : await eslint.lintText(request.code || "", {
+        filePath: path.resolve(cwd, request.filePath || "snippet.js"),
+      });
+  return { id: request.id, output: await formatter.format(results), results };
+}
+
+const input = readline.createInterface({ input: process.stdin });
+input.on("line", async (line) => {
+  let reply;
+  try {
+    reply = await handle(JSON.parse(line));
+  } catch (e) {
+    reply = { id: null, error: String(e && e.message ? e.message : e) };
+    try {
+      reply.id = JSON.parse(line).id;
+    } catch (ignored) {
+      // Requête illisible : réponse sans identifiant
+    }
+  }
+  process.stdout.write(JSON.stringify(reply) + "\n");
+});
@@ -0,0 +1,141 @@
+"""
+Client HTTP partagé pour tous les appels à l'API Mistral.
+
+Une seule `requests.Session` est créée par processus : les connexions TCP/TLS
+sont conservées (keep-alive) et réutilisées d'une requête à l'autre au lieu
+d'être rétablies à chaque appel.
+"""
+
+import json
+import threading
+from typing import Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MISTRAL_API_URL = "https://api.mistral.ai/v1"
+
+# Taille par défaut des pools de connexions
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_pool_connections = DEFAULT_POOL_CONNECTIONS
+_pool_maxsize = DEFAULT_POOL_MAXSIZE
+
+
+def _build_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    """Construit une session avec un adaptateur HTTP dimensionné."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=False
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """Retourne la session partagée, créée à la première utilisation."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(_pool_connections, _pool_maxsize)
+    return _session
+
+
+def configure_pool(pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None):
+    """Redimensionne les pools de connexions.
+
+    Le pool n'est agrandi que si nécessaire, pour que plusieurs traitements
+    concurrents ne réduisent pas la capacité les uns des autres.
+    """
+    global _pool_connections, _pool_maxsize
+    with _session_lock:
+        new_connections = max(_pool_connections, pool_connections or 0)
+        new_maxsize = max(_pool_maxsize, pool_maxsize or 0)
+        if (new_connections, new_maxsize) == (_pool_connections, _pool_maxsize):
+            return
+        _pool_connections, _pool_maxsize = new_connections, new_maxsize
+        if _session is not None:
+            adapter = HTTPAdapter(
+                pool_connections=_pool_connections,
+                pool_maxsize=_pool_maxsize,
+                pool_block=False
+            )
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+
+
+def close_session():
+    """Ferme la session partagée et libère les connexions ouvertes."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def iter_sse_data(response: requests.Response) -> Iterator[str]:
+    """Lit un flux Server-Sent Events et produit le champ `data` de chaque événement.
+
+    La réponse doit avoir été obtenue avec `stream=True` ; les octets sont lus au
+    fur et à mesure de leur arrivée, sans attendre de remplir un tampon.
+    """
+    data_lines = []
+    for raw_line in response.iter_lines(chunk_size=None):
+        line = raw_line.decode("utf-8", errors="replace") if isinstance(raw_line, bytes) else raw_line
+        if not line:
+            # Ligne vide : fin de l'événement
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue  # Commentaire / keep-alive
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+def _content_text(content) -> str:
+    """Texte d'un contenu de message (chaîne ou liste de fragments typés)."""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def iter_chat_deltas(response: requests.Response) -> Iterator[str]:
+    """Produit les fragments de texte d'une complétion demandée avec `"stream": true`.
+
+    Si le serveur répond sans streaming (JSON classique), le contenu complet est
+    produit en une fois.
+    """
+    if "text/event-stream" not in response.headers.get("Content-Type", ""):
+        result = response.json()
+        choices = result.get("choices") or []
+        if choices:
+            yield _content_text(choices[0].get("message", {}).get("content"))
+        else:
+            yield _content_text(result.get("output"))
+        return
+
+    for data in iter_sse_data(response):
+        if data.strip() == "[DONE]":
+            break
+        try:
+            event = json.loads(data)
+        except ValueError:
+            continue
+        choices = event.get("choices") or []
+        if choices:
+            text = _content_text((choices[0].get("delta") or {}).get("content"))
+            if text:
+                yield text
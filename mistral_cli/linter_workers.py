@@ -0,0 +1,316 @@
+"""
+Linters maintenus « à chaud ».
+
+Lancer flake8, eslint ou phpcs pour chaque extrait de code coûte le démarrage de
+l'interpréteur et le chargement des règles (300 ms à 2 s), bien plus que
+l'analyse elle-même. Ce module garde les linters chargés :
+
+- Python : pyflakes et pycodestyle (le cœur de flake8) sont appelés dans le
+  processus, sur le code en mémoire ;
+- JavaScript : des workers Node persistants (`eslint_worker.js`) chargent ESLint
+  une fois et reçoivent les extraits sur leur entrée standard, une requête JSON
+  par ligne ;
+- sinon (PHP, dépendances absentes, configuration flake8 du projet) le linter est
+  lancé avec le code sur son entrée standard, sans fichier temporaire.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from mistral_cli.result_cache import config_hashes
+from mistral_cli.tool_runner import run_tool_command
+
+ESLINT_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eslint_worker.js")
+DEFAULT_WORKER_TIMEOUT = 60.0  # Secondes accordées à une requête
+DEFAULT_POOL_SIZE = 2  # Workers par linter : chacun garde ses règles en mémoire
+FLAKE8_CONFIG_FILES = (".flake8", "setup.cfg", "tox.ini")
+
+_pools: Dict[str, "WorkerPool"] = {}
+_pools_lock = threading.Lock()
+
+
+class LintReport(NamedTuple):
+    """Sortie d'un linter : rapport et messages d'erreur, comme stdout/stderr d'un processus."""
+    stdout: str
+    stderr: str = ""
+    results: Any = None  # Résultats bruts du linter quand il les fournit (ESLint)
+
+
+class WorkerError(RuntimeError):
+    """Le worker ne répond pas, s'est arrêté ou a signalé une erreur."""
+
+    def __init__(self, message: str, fatal: bool = False):
+        super().__init__(message)
+        self.fatal = fatal  # Erreur définitive (ex. linter introuvable) : inutile de relancer
+
+
+class WorkerProcess:
+    """Processus persistant interrogé en JSON : une requête par ligne sur stdin, une réponse sur stdout."""
+
+    def __init__(self, command: List[str], env: Optional[Dict[str, str]] = None,
+                 timeout: float = DEFAULT_WORKER_TIMEOUT):
+        self.command = command
+        self.env = env
+        self.timeout = timeout
+        self._process: Optional[subprocess.Popen] = None
+        self._replies: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process else None
+
+    def _start(self):
+        self._replies = queue.Queue()
+        self._process = subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding="utf-8", bufsize=1, env=self.env
+        )
+        replies, stdout = self._replies, self._process.stdout
+
+        def read_replies():
+            for line in stdout:
+                replies.put(line)
+            replies.put(None)  # Fin du processus
+
+        threading.Thread(target=read_replies, name="linter-worker-reader", daemon=True).start()
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Envoie une requête et attend sa réponse ; le worker est (re)lancé si nécessaire."""
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            request_id = next(self._ids)
+            try:
+                self._process.stdin.write(json.dumps(dict(payload, id=request_id)) + "\n")
+                self._process.stdin.flush()
+            except OSError as e:
+                self.close()
+                raise WorkerError(f"worker arrêté: {e}")
+            while True:
+                try:
+                    line = self._replies.get(timeout=self.timeout)
+                except queue.Empty:
+                    self.close()  # Worker bloqué : relancé à la prochaine requête
+                    raise WorkerError(f"pas de réponse après {self.timeout:.0f} s")
+                if line is None:
+                    self.close()
+                    raise WorkerError("le worker s'est arrêté")
+                reply = json.loads(line)
+                if reply.get("id") == request_id:
+                    break  # Les réponses d'une requête abandonnée sont ignorées
+        if reply.get("error"):
+            raise WorkerError(reply["error"], fatal=bool(reply.get("fatal")))
+        return reply
+
+    def close(self):
+        process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+class WorkerPool:
+    """Jusqu'à `size` workers identiques, créés à la demande et réutilisés."""
+
+    def __init__(self, factory: Callable[[], WorkerProcess], size: int = DEFAULT_POOL_SIZE):
+        self.factory = factory
+        self.size = size
+        self._idle: "queue.Queue[WorkerProcess]" = queue.Queue()
+        self._workers: List[WorkerProcess] = []
+        self._lock = threading.Lock()
+        self.error: Optional[str] = None  # Erreur définitive : le pool n'est plus utilisé
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self.error:
+            raise WorkerError(self.error, fatal=True)
+        worker = self._acquire()
+        try:
+            return worker.request(payload)
+        except WorkerError as e:
+            if e.fatal:
+                self.error = str(e)
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def _acquire(self) -> WorkerProcess:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._workers) < self.size:
+                worker = self.factory()
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+
+
+def get_pool(name: str, factory: Callable[[], WorkerProcess], size: int = DEFAULT_POOL_SIZE) -> WorkerPool:
+    """Pool partagé `name`, créé à la première utilisation et arrêté à la sortie du programme."""
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = _pools[name] = WorkerPool(factory, size)
+    return pool
+
+
+@atexit.register
+def close_pools():
+    for pool in list(_pools.values()):
+        pool.close()
+
+
+def run_with_stdin(command: List[str], code: str, timeout: float = DEFAULT_WORKER_TIMEOUT) -> LintReport:
+    """Lance un linter en lui passant le code sur son entrée standard."""
+    result = run_tool_command(command, timeout=timeout, input=code)
+    return LintReport(result.stdout, result.stderr)
+
+
+# --- Python ---
+def has_flake8_config(directory: str = ".") -> bool:
+    """Le projet configure flake8 : seul flake8 lui-même applique cette configuration."""
+    for name in FLAKE8_CONFIG_FILES:
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            continue
+        if name == ".flake8":
+            return True
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            if "[flake8]" in f.read():
+                return True
+    return False
+
+
+def _pyflakes_codes() -> Dict[str, str]:
+    try:
+        from flake8.plugins.pyflakes import FLAKE8_PYFLAKES_CODES
+        return FLAKE8_PYFLAKES_CODES
+    except ImportError:
+        return {}
+
+
+def lint_python_in_process(code: str, filename: str = "stdin") -> Optional[LintReport]:
+    """Vérifications par défaut de flake8 (pyflakes + pycodestyle) sur du code en mémoire.
+
+    Retourne None si pyflakes ou pycodestyle n'est pas installé.
+    """
+    try:
+        import pycodestyle
+        from pyflakes import api as pyflakes_api
+    except ImportError:
+        return None
+
+    lines: List[tuple] = []
+    codes = _pyflakes_codes()
+
+    class PyflakesReporter:
+        def unexpectedError(self, name, message):
+            lines.append((1, 1, f"E902 {message}"))
+
+        def syntaxError(self, name, message, line_number, offset, text):
+            lines.append((line_number or 1, offset or 1, f"E999 SyntaxError: {message}"))
+
+        def flake(self, message):
+            code = codes.get(type(message).__name__, "F")
+            lines.append((message.lineno, message.col + 1, f"{code} {message.message % message.message_args}"))
+
+    class StyleReport(pycodestyle.BaseReport):
+        def error(self, line_number, offset, text, check):
+            code = super().error(line_number, offset, text, check)
+            if code:
+                lines.append((line_number, offset + 1, text))
+            return code
+
+    pyflakes_api.check(code, filename, PyflakesReporter())
+    style = pycodestyle.StyleGuide(quiet=True)
+    report = StyleReport(style.options)
+    pycodestyle.Checker(filename, lines=code.splitlines(True), options=style.options, report=report).check_all()
+
+    lines.sort(key=lambda line: (line[0], line[1]))
+    return LintReport("".join(f"{filename}:{line}:{col}: {text}\n" for line, col, text in lines))
+
+
+def python_checks_version() -> Optional[str]:
+    """Versions de pyflakes et pycodestyle utilisés dans le processus, None s'ils sont absents."""
+    try:
+        import pycodestyle
+        import pyflakes
+    except ImportError:
+        return None
+    return f"pyflakes {pyflakes.__version__}, pycodestyle {pycodestyle.__version__}"
+
+
+def lint_python(code: str, filename: str = "stdin") -> LintReport:
+    """flake8 sur un extrait : dans le processus si possible, sinon `flake8 -`."""
+    if not has_flake8_config():
+        report = lint_python_in_process(code, filename)
+        if report is not None:
+            return report
+    return run_with_stdin(["flake8", "--stdin-display-name", filename, "-"], code)
+
+
+# --- JavaScript ---
+def _eslint_worker() -> WorkerProcess:
+    env = dict(os.environ)
+    eslint_bin = shutil.which("eslint")
+    if eslint_bin:
+        # Installation globale : .../node_modules/eslint/bin/eslint.js
+        package_dir = os.path.dirname(os.path.dirname(os.path.realpath(eslint_bin)))
+        if os.path.basename(package_dir) == "eslint":
+            env["MISTRAL_ESLINT_PATH"] = os.path.dirname(package_dir)
+    return WorkerProcess(["node", ESLINT_WORKER_SCRIPT], env=env)
+
+
+def eslint_config_fingerprint(cwd: str) -> str:
+    """Empreinte des fichiers de configuration ESLint du projet : le worker recrée son moteur quand elle change."""
+    return json.dumps(config_hashes("eslint", cwd), sort_keys=True)
+
+
+def lint_javascript(code: str, filename: str = "snippet.js") -> LintReport:
+    """ESLint sur un extrait via un worker Node persistant, sinon `eslint --stdin`."""
+    if shutil.which("node"):
+        try:
+            cwd = os.getcwd()
+            reply = get_pool("eslint", _eslint_worker).request(
+                {"code": code, "filePath": filename, "cwd": cwd, "config": eslint_config_fingerprint(cwd)}
+            )
+            return LintReport(reply.get("output", ""), results=reply.get("results"))
+        except WorkerError:
+            pass  # ESLint absent du worker ou worker en échec : lancement classique
+    return run_with_stdin(["eslint", "--stdin", "--stdin-filename", filename], code)
+
+
+def eslint_files(paths: List[str]) -> Optional[List[Dict[str, Any]]]:
+    """Résultats bruts d'ESLint pour des fichiers existants, via le worker ; None s'il est indisponible."""
+    if not shutil.which("node"):
+        return None
+    try:
+        cwd = os.getcwd()
+        reply = get_pool("eslint", _eslint_worker).request(
+            {"files": paths, "cwd": cwd, "config": eslint_config_fingerprint(cwd)}
+        )
+    except WorkerError:
+        return None
+    return reply.get("results") or []
+
+
+# --- PHP ---
+def lint_php(code: str, standard: str = "PSR12", filename: str = "snippet.php") -> LintReport:
+    """PHP_CodeSniffer n'a pas de mode serveur : le code lui est passé sur l'entrée standard."""
+    return run_with_stdin(["phpcs", f"--standard={standard}", f"--stdin-path={filename}", "-"], code)
@@ -0,0 +1,102 @@
+"""
+Modèles de données persistés (agents, serveurs, pipelines, sessions).
+
+Ces modèles pydantic sont séparés de l'interface : les charger n'importe ni rich
+ni requests. Les clés API sont chiffrées et déchiffrées par le fournisseur
+partagé de `credentials.py`.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, field_validator
+
+from mistral_cli.context import Context
+from mistral_cli.credentials import get_credentials
+
+# --- Modèles de données ---
+class MistralAgent(BaseModel):
+    id: str
+    name: str
+    model: str
+    agent_type: str = "model"  # "model" ou "agent"
+    description: Optional[str] = None
+    instructions: Optional[str] = None
+    tools: List[str] = []
+    active: bool = True
+    encrypted_api_key: Optional[str] = None  # Clé API chiffrée
+    created_at: Optional[str] = None
+    version: Optional[str] = None
+
+    @field_validator('created_at', mode='before')
+    @classmethod
+    def validate_created_at(cls, v):
+        """Convertit les timestamps Unix en chaînes."""
+        if v is None:
+            return None
+        if isinstance(v, int):
+            # Convertir le timestamp Unix en string ISO
+            return datetime.fromtimestamp(v).isoformat()
+        if isinstance(v, (str, float)):
+            # Si c'est déjà une chaîne ou un float, le convertir en string
+            if isinstance(v, float):
+                return datetime.fromtimestamp(v).isoformat()
+            return str(v)
+        return v
+
+    @property
+    def api_key(self) -> Optional[str]:
+        """Clé API déchiffrée (mise en cache), sinon MISTRAL_API_KEY ou le trousseau."""
+        if not self.encrypted_api_key:
+            return get_credentials().external_api_key()
+        return get_credentials().decrypt(self.encrypted_api_key)
+
+    @api_key.setter
+    def api_key(self, value: str):
+        """Chiffre la clé API avant stockage."""
+        if value:
+            self.encrypted_api_key = get_credentials().encrypt(value)
+
+class MCPServer(BaseModel):
+    name: str
+    type: str  # 'api' ou 'npx'
+    url: Optional[str] = None
+    package: Optional[str] = None
+    encrypted_api_key: Optional[str] = None
+    active: bool = True
+    install_args: str = "--global"
+
+    @property
+    def api_key(self) -> Optional[str]:
+        if not self.encrypted_api_key:
+            return None
+        return get_credentials().decrypt(self.encrypted_api_key)
+
+    @api_key.setter
+    def api_key(self, value: str):
+        if value:
+            self.encrypted_api_key = get_credentials().encrypt(value)
+
+class PipelineStep(BaseModel):
+    step_type: str  # 'api', 'npx', 'python'
+    server: str
+    action: str
+    params: Dict[str, Any] = {}
+    id: Optional[str] = None  # Par défaut "step<n>" (position dans le pipeline)
+    depends_on: Optional[List[str]] = None  # None : étape précédente ; [] : entrée utilisateur
+    cache: Optional[bool] = None  # None : mémorisée sauf tests et builds ; False : jamais mémorisée
+    executor: str = "thread"  # "process" : outil Python gourmand en CPU, lancé dans un processus séparé
+
+class Pipeline(BaseModel):
+    name: str
+    steps: List[PipelineStep]
+
+class ChatSession(BaseModel):
+    session_id: str
+    context: Context
+    history: List[Dict[str, Any]] = []
+
+class NPXCache(BaseModel):
+    package: str
+    installed: bool = False
+    version: Optional[str] = None
@@ -0,0 +1,353 @@
+"""
+Moteur d'exécution des pipelines.
+
+Les étapes forment un graphe : chacune peut déclarer ses dépendances
+(`depends_on`) et les étapes indépendantes s'exécutent en parallèle. Sans
+`depends_on`, une étape dépend de la précédente, ce qui conserve le
+comportement séquentiel des pipelines existants ; `depends_on: []` la fait
+partir directement de l'entrée utilisateur.
+
+Une étape reçoit la sortie de sa dépendance (ou les sorties concaténées de ses
+dépendances) et la sortie du pipeline est celle des étapes finales. Les modules
+des outils Python sont résolus par le registre des outils (intégrés ou tiers) et
+ne sont importés qu'une fois.
+
+Les résultats des étapes sont mémorisés sur disque (`config/cache/pipeline_steps`)
+sous un hash de (type, serveur, action, paramètres, entrée, version de l'outil,
+version et configuration de son binaire) : relancer un pipeline sur une entrée
+inchangée ne réexécute pas ses étapes. Les outils qui lisent des fichiers ou le projet
+ajoutent à la clé le hash de ce contenu. `"cache": false` exclut une étape non
+déterministe ; les tests et builds ne sont mémorisés qu'avec `"cache": true`.
+
+`PipelineEngine.map()` applique un pipeline à chaque fichier d'un dossier : les
+fichiers sont traités en parallèle par un pool de threads (étapes API, limitées
+par l'ordonnanceur) et les étapes Python déclarées `"executor": "process"`
+tournent dans un pool de processus pour occuper tous les cœurs. Une ligne par
+fichier est écrite dans un rapport JSONL dès qu'elle est disponible.
+"""
+
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from mistral_cli.context import Context
+from mistral_cli.disk_cache import DiskCache
+from mistral_cli.models import Pipeline, PipelineStep
+from mistral_cli.result_cache import binary_fingerprint, tool_extra, tool_input_hash
+from mistral_cli.tool_registry import get_tool_registry
+from mistral_cli.tool_runner import ToolRunner, execute_tool, tool_timeout
+
+DEFAULT_PIPELINE_WORKERS = 4
+STEP_CACHE_DIR = "config/cache/pipeline_steps"
+STEP_CACHE_MAX_BYTES = 50 * 1024 * 1024  # 50 Mo
+DEFAULT_STEP_CACHE_TTL = 7 * 24 * 3600  # Une semaine
+DEFAULT_MAP_CONCURRENCY = 4  # Fichiers traités simultanément en mode map
+DEFAULT_MAP_MAX_FILE_SIZE = 1000000
+MAP_DETAILED_RESULTS_LIMIT = 20
+UNCACHED_KINDS = ("test", "build")  # Outils dont le résultat ne dépend pas que de leur entrée
+
+StepRunner = Callable[[PipelineStep, str], str]
+
+
+class StepResult(NamedTuple):
+    """Résultat d'une étape : sortie, succès, durée (secondes) et message d'erreur éventuel."""
+    step_id: str
+    output: str
+    ok: bool
+    elapsed: float
+    error: Optional[str] = None
+    cached: bool = False
+
+
+def load_tool(server: str):
+    """Module de l'outil `server` (ex. "python/py_linter"), importé une seule fois par processus."""
+    return get_tool_registry().load(server)
+
+
+def tool_version(server: str) -> str:
+    """Version d'un outil Python : `__version__` du module, sinon hash de son code source."""
+    return get_tool_registry().version(server)
+
+
+def python_step_version(step: PipelineStep) -> str:
+    """Version d'une étape Python : code de l'outil, version et configuration de son binaire."""
+    spec = get_tool_registry().get(step.server)
+    return DiskCache.make_key(tool_version(step.server), binary_fingerprint(spec.binary if spec else None),
+                              tool_extra(load_tool(step.server)))
+
+
+def _file_fingerprints(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Taille et date de modification des fichiers désignés par les paramètres (ex. file_path)."""
+    fingerprints = {}
+    for name, value in params.items():
+        if isinstance(value, str) and value and os.path.isfile(value):
+            stat = os.stat(value)
+            fingerprints[name] = [stat.st_size, stat.st_mtime_ns]
+    return fingerprints
+
+
+def open_step_cache(enabled: bool = True, ttl: Optional[float] = DEFAULT_STEP_CACHE_TTL) -> DiskCache:
+    """Ouvre le cache des résultats d'étapes (taille bornée, éviction LRU)."""
+    return DiskCache(STEP_CACHE_DIR, max_bytes=STEP_CACHE_MAX_BYTES, ttl=ttl, enabled=enabled)
+
+
+def step_ids(pipeline: Pipeline) -> List[str]:
+    return [step.id or f"step{i + 1}" for i, step in enumerate(pipeline.steps)]
+
+
+def resolve_dependencies(pipeline: Pipeline) -> Dict[str, List[str]]:
+    """Dépendances de chaque étape, dans l'ordre du pipeline.
+
+    Lève ValueError pour un identifiant dupliqué, une dépendance inconnue ou un cycle.
+    """
+    ids = step_ids(pipeline)
+    if len(set(ids)) != len(ids):
+        raise ValueError("identifiants d'étapes dupliqués")
+    deps: Dict[str, List[str]] = {}
+    for i, (step_id, step) in enumerate(zip(ids, pipeline.steps)):
+        if step.depends_on is None:
+            deps[step_id] = [ids[i - 1]] if i else []
+        else:
+            unknown = [d for d in step.depends_on if d not in ids]
+            if unknown:
+                raise ValueError(f"l'étape {step_id} dépend d'étapes inconnues: {', '.join(unknown)}")
+            deps[step_id] = list(step.depends_on)
+
+    # Tri topologique : toute étape doit pouvoir être atteinte
+    remaining = {step_id: set(d) for step_id, d in deps.items()}
+    resolved = [step_id for step_id, d in remaining.items() if not d]
+    for step_id in resolved:
+        for other, d in remaining.items():
+            if step_id in d:
+                d.discard(step_id)
+                if not d:
+                    resolved.append(other)
+    if len(resolved) != len(ids):
+        cycle = [step_id for step_id in ids if step_id not in resolved]
+        raise ValueError(f"dépendances circulaires entre: {', '.join(cycle)}")
+    return deps
+
+
+def combine_outputs(outputs: Dict[str, str]) -> str:
+    """Une seule sortie est transmise telle quelle ; plusieurs sont concaténées avec leur étape."""
+    if len(outputs) == 1:
+        return next(iter(outputs.values()))
+    return "\n\n".join(f"### {step_id}\n{output}" for step_id, output in outputs.items())
+
+
+class PipelineEngine:
+    """Exécute un pipeline en lançant chaque étape dès que ses dépendances sont terminées."""
+
+    def __init__(self, runners: Optional[Dict[str, StepRunner]] = None,
+                 context: Optional[Context] = None, base_data: Optional[Dict[str, Any]] = None,
+                 max_workers: int = DEFAULT_PIPELINE_WORKERS, cache: Optional[DiskCache] = None,
+                 versions: Optional[Dict[str, Callable[[PipelineStep], str]]] = None):
+        # Les étapes "python" sont gérées ici ; les autres types via `runners`
+        self.runners: Dict[str, StepRunner] = {"python": self.run_python_step}
+        self.runners.update(runners or {})
+        self.context = context or Context()
+        self.base_data = base_data or {}
+        self.max_workers = max_workers
+        self.cache = cache
+        # Version de l'outil par type d'étape (ex. paquet npx installé) pour la clé de cache
+        self.versions: Dict[str, Callable[[PipelineStep], str]] = {"python": python_step_version}
+        self.versions.update(versions or {})
+        # Pool de processus des étapes "executor": "process", ouvert par map()
+        self.tool_runner: Optional[ToolRunner] = None
+
+    def step_cacheable(self, step: PipelineStep) -> bool:
+        """`cache` de l'étape s'il est précisé ; sinon tout sauf les tests et builds (non déterministes)."""
+        if step.cache is not None:
+            return step.cache
+        spec = get_tool_registry().get(step.server) if step.step_type == "python" else None
+        return spec is None or spec.kind not in UNCACHED_KINDS
+
+    def step_cache_key(self, step: PipelineStep, input_text: str,
+                       data: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Clé d'un résultat d'étape : outil, action, paramètres, données du fichier, entrée et version.
+
+        Pour un outil Python, le hash de ce qu'il analyse (fichier, fichiers du projet)
+        fait partie de la clé ; None (pas de mémorisation) s'il ne peut être calculé.
+        """
+        version = self.versions.get(step.step_type)
+        params = {**(data or {}), **step.params}
+        content_hash = None
+        spec = get_tool_registry().get(step.server) if step.step_type == "python" else None
+        if spec is not None:
+            content_hash = tool_input_hash(spec, {**self.base_data, **params, "input": input_text})
+            if content_hash is None:
+                return None
+        return DiskCache.make_key(
+            "pipeline-step", step.step_type, step.server, step.action, params,
+            _file_fingerprints(params), input_text, content_hash, version(step) if version else None
+        )
+
+    def run_python_step(self, step: PipelineStep, input_text: str,
+                        data: Optional[Dict[str, Any]] = None) -> str:
+        """Appelle `execute()` de l'outil avec un contexte propre à l'étape.
+
+        `data` complète les données de base pour une exécution (ex. file_path en mode map).
+        """
+        step_data = {**self.base_data, **(data or {}), **step.params}
+        step_data["input"] = input_text
+        if "timeout" not in step_data and tool_timeout(step.server):
+            step_data["timeout"] = tool_timeout(step.server)
+        context = replace(self.context, data=step_data)
+        if step.executor == "process" and self.tool_runner is not None:
+            return self.tool_runner.run(step.server, context, input_text)
+        return execute_tool(step.server, context, input_text)
+
+    def _run_step(self, step_id: str, step: PipelineStep, input_text: str,
+                  data: Optional[Dict[str, Any]] = None) -> StepResult:
+        started = time.perf_counter()
+        runner = self.runners.get(step.step_type)
+        try:
+            if runner is None:
+                raise ValueError(f"type d'étape inconnu: {step.step_type}")
+            key = self.step_cache_key(step, input_text, data) if self.cache is not None and self.step_cacheable(step) else None
+            if key is not None:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return StepResult(step_id, cached, True, time.perf_counter() - started, cached=True)
+            if runner == self.run_python_step:
+                output = self.run_python_step(step, input_text, data)
+            else:
+                output = runner(step, input_text)
+            # Les outils signalent leurs échecs par un texte "Erreur..." : jamais mémorisé
+            if key is not None and not output.startswith("Erreur"):
+                self.cache.set(key, output)
+            return StepResult(step_id, output, True, time.perf_counter() - started)
+        except Exception as e:
+            # Une étape en échec laisse passer son entrée, comme avant
+            return StepResult(step_id, input_text, False, time.perf_counter() - started, str(e))
+
+    def run(self, pipeline: Pipeline, user_input: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Exécute le pipeline ; retourne la sortie finale, les résultats par étape et le raisonnement.
+
+        `data` s'ajoute aux données de base des étapes Python pour cette exécution seulement.
+        """
+        deps = resolve_dependencies(pipeline)
+        steps = dict(zip(deps, pipeline.steps))
+        remaining = {step_id: set(d) for step_id, d in deps.items()}
+        dependents: Dict[str, List[str]] = defaultdict(list)
+        for step_id, d in deps.items():
+            for dependency in d:
+                dependents[dependency].append(step_id)
+
+        def step_input(step_id: str) -> str:
+            if not deps[step_id]:
+                return user_input
+            return combine_outputs({d: results[d].output for d in deps[step_id]})
+
+        results: Dict[str, StepResult] = {}
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            ready = [step_id for step_id, d in remaining.items() if not d]
+            running = {}
+            while ready or running:
+                for step_id in ready:
+                    future = executor.submit(self._run_step, step_id, steps[step_id], step_input(step_id), data)
+                    running[future] = step_id
+                ready = []
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step_id = running.pop(future)
+                    results[step_id] = future.result()
+                    for dependent in dependents[step_id]:
+                        remaining[dependent].discard(step_id)
+                        if not remaining[dependent]:
+                            ready.append(dependent)
+        elapsed = time.perf_counter() - started
+
+        sinks = [step_id for step_id in deps if not dependents[step_id]]
+        return {
+            "output": combine_outputs({s: results[s].output for s in sinks}),
+            "results": results,
+            "elapsed": elapsed,
+            "reasoning": self._reasoning(deps, steps, results, elapsed)
+        }
+
+    def map(self, pipeline: Pipeline, directory: str, patterns: List[str], recursive: bool = True,
+            max_concurrency: int = DEFAULT_MAP_CONCURRENCY, max_file_size: int = DEFAULT_MAP_MAX_FILE_SIZE,
+            report_path: Optional[str] = None, process_workers: Optional[int] = None) -> Dict[str, Any]:
+        """Exécute le pipeline sur chaque fichier du dossier et agrège les sorties dans un rapport JSONL.
+
+        L'entrée de chaque exécution est le contenu du fichier et `file_path` est
+        transmis aux étapes Python. Au plus `max_concurrency` fichiers sont traités
+        à la fois ; le pool de processus n'est créé que si une étape le demande.
+        """
+        from mistral_cli.tools.file_analyzer.streaming import (
+            JsonlReportWriter, ResultSampler, default_report_path, discover, ordered_map
+        )
+        resolve_dependencies(pipeline)  # Pipeline invalide : erreur avant de parcourir le dossier
+        report_path = report_path or default_report_path("pipeline_map_report")
+        skipped = []
+        sampler = ResultSampler(MAP_DETAILED_RESULTS_LIMIT)
+        errors_count = 0
+        interrupted = False
+
+        def process_file(found) -> Dict[str, Any]:
+            record: Dict[str, Any] = {"file_path": found.path}
+            try:
+                with open(found.path, "r", encoding="utf-8") as f:
+                    content = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                record["error"] = f"Erreur de lecture: {e}"
+                return record
+            run = self.run(pipeline, content, data={"file_path": found.path})
+            record["output"] = run["output"]
+            record["steps"] = {
+                step_id: {"ok": r.ok, "elapsed": round(r.elapsed, 3), "cached": r.cached, "error": r.error}
+                for step_id, r in run["results"].items()
+            }
+            record["elapsed"] = round(run["elapsed"], 3)
+            return record
+
+        if any(step.executor == "process" for step in pipeline.steps):
+            self.tool_runner = ToolRunner(process_workers)
+        started = time.perf_counter()
+        try:
+            with JsonlReportWriter(report_path) as report:
+                files = discover(directory, patterns, recursive, max_file_size, skipped.append)
+                for record in ordered_map(process_file, files, max_concurrency):
+                    report.write(record)
+                    if "error" in record or not all(step["ok"] for step in record["steps"].values()):
+                        errors_count += 1
+                    sampler.add(record)
+        except KeyboardInterrupt:
+            interrupted = True
+        finally:
+            if self.tool_runner is not None:
+                self.tool_runner.shutdown()
+                self.tool_runner = None
+
+        return {
+            "pipeline": pipeline.name,
+            "processed_files": sampler.count,
+            "errors_count": errors_count,
+            "skipped_files": len(skipped),
+            "interrupted": interrupted,
+            "elapsed": round(time.perf_counter() - started, 3),
+            "report_file": report_path,
+            "detailed_results": sampler.detailed_results()
+        }
+
+    @staticmethod
+    def _reasoning(deps: Dict[str, List[str]], steps: Dict[str, PipelineStep],
+                   results: Dict[str, StepResult], elapsed: float) -> List[str]:
+        """Une ligne par étape (dans l'ordre du pipeline) avec sa durée, puis la durée totale."""
+        reasoning = []
+        for step_id, step in steps.items():
+            result = results[step_id]
+            after = f" après {', '.join(deps[step_id])}" if step.depends_on else ""
+            origin = " (en cache)" if result.cached else ""
+            reasoning.append(f"🔹 Étape [bold]{step.step_type}[/bold]: {step.server} ({step.action})"
+                             f"{after} — {result.elapsed:.2f} s{origin}")
+            if not result.ok:
+                reasoning.append(f"   ❌ Erreur avec {step.server}: {result.error}")
+        total = sum(r.elapsed for r in results.values())
+        reasoning.append(f"⏱️ Durée totale: {elapsed:.2f} s (étapes cumulées: {total:.2f} s)")
+        return reasoning
@@ -0,0 +1,216 @@
+"""
+Cache des résultats de linters et d'analyseurs de sécurité, adressé par contenu.
+
+Un résultat est réutilisé tant que rien de ce qui le détermine n'a changé : la
+clé combine le nom et la version de l'outil, la version de son binaire, le hash
+de ses fichiers de configuration (règles) et le hash du contenu analysé (code
+transmis, fichier, ou fichiers sources du projet pour les outils qui analysent le
+répertoire courant). Mettre à jour le linter ou modifier `.eslintrc` change la
+clé : les anciennes entrées ne sont plus lues et finissent évincées (stockage
+borné, LRU).
+
+La version d'un binaire (`binaire --version`) est demandée une fois par processus
+et par exécutable (chemin, taille, date de modification) : une analyse répétée
+d'un dépôt ne lance aucun linter pour les fichiers inchangés.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from mistral_cli.disk_cache import DiskCache
+from mistral_cli.tool_registry import DIRECTORY_PARAMS, FILE_PARAMS, ToolSpec
+from mistral_cli.tools.file_analyzer.file_discovery import iter_files
+
+RESULT_CACHE_DIR = "config/cache/tool_results"
+RESULT_CACHE_MAX_BYTES = 50 * 1024 * 1024  # 50 Mo
+CACHED_KINDS = ("linter", "security")  # Outils déterministes pour une entrée donnée
+VERSION_TIMEOUT = 30  # Secondes accordées à `binaire --version`
+
+# Fichiers de configuration (règles) lus par chaque binaire, relatifs au projet
+CONFIG_FILES: Dict[str, Tuple[str, ...]] = {
+    "flake8": (".flake8", "setup.cfg", "tox.ini"),
+    "bandit": (".bandit", "pyproject.toml"),
+    "eslint": (".eslintrc", ".eslintrc.js", ".eslintrc.cjs", ".eslintrc.json", ".eslintrc.yml",
+               ".eslintrc.yaml", "eslint.config.js", "eslint.config.mjs", "eslint.config.cjs", "package.json"),
+    "phpcs": ("phpcs.xml", ".phpcs.xml", "phpcs.xml.dist", ".phpcs.xml.dist"),
+    "psalm": ("psalm.xml", "psalm.xml.dist"),
+    "golangci-lint": (".golangci.yml", ".golangci.yaml", ".golangci.toml", ".golangci.json", "go.mod"),
+    "gosec": ("go.mod",),
+    "rubocop": (".rubocop.yml", ".rubocop_todo.yml"),
+    "brakeman": ("config/brakeman.yml", "config/brakeman.ignore"),
+    "ktlint": (".editorconfig",),
+    "mvn": ("pom.xml", "spotbugs-exclude.xml"),
+    "java": ("checkstyle.xml",),
+    "dotnet": (".editorconfig",),
+    "hadolint": (".hadolint.yaml", ".hadolint.yml"),
+    "tflint": (".tflint.hcl",),
+    "cargo": ("Cargo.toml", "clippy.toml", ".clippy.toml"),
+    "swiftlint": (".swiftlint.yml",),
+    "npm": ("package.json", "package-lock.json"),
+}
+
+# Fichiers sources des outils qui analysent le répertoire courant, par langage
+TREE_PATTERNS: Dict[str, Tuple[str, ...]] = {
+    "python": ("*.py",),
+    "javascript": ("*.js", "*.jsx", "*.mjs", "*.cjs", "*.ts", "*.tsx"),
+    "php": ("*.php",),
+    "kotlin": ("*.kt", "*.kts"),
+    "go": ("*.go", "go.sum"),
+    "java": ("*.java", "*.gradle", "*.gradle.kts"),
+    "ruby": ("*.rb", "*.erb", "*.haml", "*.slim", "Gemfile", "Gemfile.lock"),
+    "rust": ("*.rs", "Cargo.lock"),
+    "swift": ("*.swift",),
+    "csharp": ("*.cs", "*.csproj", "*.sln"),
+    "devops": ("*.tf", "*.tfvars"),
+    "nodejs": ("package-lock.json",),
+}
+
+_versions: Dict[str, str] = {}
+_result_cache: Optional[DiskCache] = None
+_lock = threading.Lock()
+
+
+def open_result_cache(enabled: bool = True) -> DiskCache:
+    """Ouvre le cache des résultats d'outils (taille bornée, éviction LRU, sans expiration)."""
+    return DiskCache(RESULT_CACHE_DIR, max_bytes=RESULT_CACHE_MAX_BYTES, enabled=enabled)
+
+
+def get_result_cache() -> DiskCache:
+    """Cache partagé par les outils du processus."""
+    global _result_cache
+    if _result_cache is None:
+        with _lock:
+            if _result_cache is None:
+                _result_cache = open_result_cache()
+    return _result_cache
+
+
+# --- Empreintes ---
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def hash_file(path: str) -> Optional[str]:
+    """Hash du contenu d'un fichier, None s'il est illisible."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def hash_tree(directory: str, patterns: Iterable[str]) -> str:
+    """Hash des fichiers d'un projet correspondant aux patterns (mêmes exclusions que la découverte)."""
+    digest = hashlib.sha256()
+    for found in iter_files(directory, patterns):
+        digest.update(f"{os.path.relpath(found.path, directory)}\0{hash_file(found.path)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def binary_version(binary: str) -> Optional[str]:
+    """Version affichée par `binaire --version` ; None si le binaire est introuvable."""
+    path = shutil.which(binary)
+    if path is None:
+        return None
+    path = os.path.realpath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    identity = f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+    version = _versions.get(identity)
+    if version is None:
+        try:
+            result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=VERSION_TIMEOUT)
+            version = result.stdout.strip() or result.stderr.strip()
+        except (OSError, subprocess.SubprocessError):
+            version = ""
+        version = version or identity  # Pas de --version : l'exécutable lui-même fait foi
+        _versions[identity] = version
+    return version
+
+
+def config_hashes(binary: str, directory: str = ".") -> Dict[str, str]:
+    """Hash des fichiers de configuration du binaire présents dans le projet."""
+    hashes = {}
+    for name in CONFIG_FILES.get(binary, ()):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            hashes[name] = hash_file(path)
+    return hashes
+
+
+def binary_fingerprint(binary: Optional[str], directory: str = ".") -> Dict[str, Any]:
+    """Version et configuration d'un binaire : tout ce qui, hors entrée, change son résultat."""
+    if not binary:
+        return {}
+    return {"version": binary_version(binary), "config": config_hashes(binary, directory)}
+
+
+def result_key(tool: str, binary: Optional[str], content_hash: str, params: Optional[Dict[str, Any]] = None,
+               directory: str = ".", extra: Any = None) -> str:
+    """Clé d'un résultat : outil, version et configuration du binaire, hash du contenu, paramètres."""
+    return DiskCache.make_key("tool-result", tool, binary_fingerprint(binary, directory),
+                              content_hash, params or {}, extra)
+
+
+# --- Outils ---
+def tool_extra(module) -> Any:
+    """Ce qui, propre à l'outil, change ses résultats hors entrée : `cache_extra()` du module s'il en a un."""
+    cache_extra = getattr(module, "cache_extra", None)
+    return cache_extra() if callable(cache_extra) else None
+
+
+def _first_param(spec: ToolSpec, data: Dict[str, Any], names) -> Optional[str]:
+    return next((data[name] for name in spec.params if name in names and data.get(name)), None)
+
+
+def tool_input_hash(spec: ToolSpec, data: Dict[str, Any]) -> Optional[str]:
+    """Hash de ce qu'analyse l'outil selon son mode d'entrée ; None si le résultat ne se met pas en cache."""
+    if spec.input_mode == "input":
+        return hash_text(str(data.get("input") or ""))
+    if spec.input_mode == "file":
+        path = _first_param(spec, data, FILE_PARAMS)
+        return hash_file(path) if path else None
+    patterns = TREE_PATTERNS.get(spec.language)
+    directory = _first_param(spec, data, DIRECTORY_PARAMS) if spec.input_mode == "directory" else "."
+    if not patterns or not directory or not os.path.isdir(directory):
+        return None
+    return hash_tree(directory, patterns)
+
+
+def execute_cached(spec: Optional[ToolSpec], module, context, version: Optional[str] = None):
+    """Appelle `module.execute(context)` en réutilisant le résultat d'une entrée déjà analysée.
+
+    Seuls les linters et analyseurs de sécurité sont mis en cache, jamais leurs
+    erreurs ; `use_cache` à False ou le mode lot (`files`, mis en cache fichier par
+    fichier par `batch_lint`) appellent directement l'outil.
+    """
+    data = context.data
+    if (spec is None or spec.kind not in CACHED_KINDS or not data.get("use_cache", True)
+            or data.get("files")):
+        return module.execute(context)
+    content_hash = tool_input_hash(spec, data)
+    if content_hash is None:
+        return module.execute(context)
+
+    params = {name: data.get(name) for name in spec.params if name not in ("input", "files")}
+    cache = get_result_cache()
+    key = result_key(spec.name, spec.binary, content_hash, params, extra=[version, tool_extra(module)])
+    cached = cache.get(key)
+    if cached is not None:
+        data["output"] = cached
+        return context
+
+    context = module.execute(context)
+    output = context.data.get("output")
+    if isinstance(output, str) and not output.startswith("Erreur"):
+        cache.set(key, output)
+    return context
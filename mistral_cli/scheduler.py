@@ -0,0 +1,209 @@
+"""
+Ordonnanceur central des requêtes vers l'API Mistral.
+
+Toutes les requêtes passent par deux seaux à jetons (requêtes par seconde et
+tokens par minute) afin de rester sous les quotas du compte, même quand de
+nombreux fichiers sont traités en parallèle. Les réponses 429 et 5xx sont
+retentées avec un délai exponentiel aléatoire (jitter) ; un en-tête
+`Retry-After` est respecté et suspend l'ensemble des requêtes, pas seulement
+celle qui a été refusée.
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+
+from mistral_cli.http_client import get_session
+
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+DEFAULT_TOKENS_PER_MINUTE = 2000000
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0   # Premier délai de backoff (secondes)
+DEFAULT_MAX_DELAY = 60.0
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+CHARS_PER_TOKEN = 4
+
+_scheduler: Optional["RequestScheduler"] = None
+_scheduler_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Seau à jetons thread-safe.
+
+    Les réservations sont servies dans l'ordre d'arrivée : le solde peut devenir
+    négatif et chaque appelant attend le temps nécessaire pour le rembourser.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate  # Jetons ajoutés par seconde
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Réserve `amount` jetons et retourne le délai d'attente correspondant (secondes)."""
+        if self.rate <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self, amount: float):
+        """Rend des jetons réservés en trop (consommation réelle inférieure à l'estimation)."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Délai indiqué par un en-tête Retry-After (secondes ou date HTTP)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def estimate_request_tokens(payload: Optional[Dict[str, Any]]) -> int:
+    """Estime les tokens consommés par une requête : prompt envoyé + max_tokens demandés."""
+    if not payload:
+        return 0
+    prompt = payload.get("messages") or payload.get("inputs")
+    if not prompt:
+        return 0  # Pas une complétion (création d'agent, etc.)
+    return len(json.dumps(prompt, ensure_ascii=False)) // CHARS_PER_TOKEN + int(payload.get("max_tokens") or 1000)
+
+
+class RequestScheduler:
+    """Envoie les requêtes HTTP en respectant les limites de débit, avec reprise automatique."""
+
+    def __init__(self, requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY):
+        # Capacité d'une seconde de requêtes : petite rafale autorisée au démarrage
+        self.requests = TokenBucket(requests_per_second, max(1.0, requests_per_second))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float):
+        """Suspend toutes les requêtes pendant `seconds` (quota dépassé côté serveur)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self, estimated_tokens: int = 0):
+        """Attend qu'une requête de `estimated_tokens` tokens puisse partir."""
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+        delay = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens) if estimated_tokens else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Backoff exponentiel avec jitter complet : aléatoire dans [0, base × 2^attempt]."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def request(self, method: str, url: str, estimated_tokens: int = 0,
+                retry_server_errors: bool = True, **kwargs) -> requests.Response:
+        """Envoie une requête via la session partagée.
+
+        Les réponses 429/5xx et les erreurs de connexion sont retentées jusqu'à
+        `max_retries` fois ; la dernière réponse (ou exception) est renvoyée telle quelle.
+        Pour une requête non idempotente (création), `retry_server_errors=False`
+        limite les reprises aux refus explicites (429), sans risque de doublon.
+        """
+        retry_statuses = RETRY_STATUSES if retry_server_errors else frozenset([429])
+        if not estimated_tokens:
+            estimated_tokens = estimate_request_tokens(kwargs.get("json"))
+
+        for attempt in range(self.max_retries + 1):
+            self.acquire(estimated_tokens)
+            try:
+                response = get_session().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries or not retry_server_errors:
+                    raise
+                time.sleep(self.backoff_delay(attempt))
+                continue
+
+            if response.status_code in retry_statuses and attempt < self.max_retries:
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = self.backoff_delay(attempt)
+                else:
+                    delay = min(delay, self.max_delay)
+                if response.status_code == 429:
+                    # Quota atteint : inutile que les autres requêtes tentent leur chance
+                    self.pause(delay)
+                response.close()
+                time.sleep(delay)
+                continue
+
+            if estimated_tokens and not kwargs.get("stream"):
+                self._settle_tokens(response, estimated_tokens)
+            return response
+
+    def _settle_tokens(self, response: requests.Response, estimated_tokens: int):
+        """Rend au seau la différence entre l'estimation et la consommation réelle."""
+        try:
+            used = response.json().get("usage", {}).get("total_tokens")
+        except (ValueError, AttributeError):
+            return
+        if used and used < estimated_tokens:
+            self.tokens.refund(estimated_tokens - used)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+def get_scheduler() -> RequestScheduler:
+    """Retourne l'ordonnanceur partagé, créé à la première utilisation."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler()
+    return _scheduler
+
+
+def configure_scheduler(requests_per_second: Optional[float] = None,
+                        tokens_per_minute: Optional[float] = None,
+                        max_retries: Optional[int] = None) -> RequestScheduler:
+    """Remplace l'ordonnanceur partagé en ajustant ses limites (options de lancement)."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = RequestScheduler(
+            requests_per_second if requests_per_second is not None else DEFAULT_REQUESTS_PER_SECOND,
+            tokens_per_minute if tokens_per_minute is not None else DEFAULT_TOKENS_PER_MINUTE,
+            max_retries if max_retries is not None else DEFAULT_MAX_RETRIES
+        )
+        return _scheduler
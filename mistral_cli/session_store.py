@@ -0,0 +1,244 @@
+"""
+Stockage des sessions de conversation.
+
+Chaque session est un journal JSONL en ajout seul (`config/sessions/<id>.jsonl`) :
+un en-tête avec le contexte, puis un enregistrement par échange et un nouvel
+enregistrement de contexte quand celui-ci change (agent, pipeline). Sauvegarder
+après chaque message ne coûte qu'une ligne, et un arrêt brutal ne peut abîmer que
+la dernière ligne, ignorée à la relecture. Le journal est compacté (réécrit de
+façon atomique) quand les contextes périmés s'accumulent.
+
+Un index compact, lui aussi en ajout seul (`config/sessions/index.jsonl`), garde
+pour chaque session l'agent, le pipeline et le nombre de messages : la liste des
+sessions se construit sans lire leur historique. Les anciennes sessions `<id>.json`
+restent lisibles et sont converties à leur prochaine sauvegarde.
+"""
+
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from mistral_cli.models import ChatSession
+
+SESSIONS_DIR = "config/sessions"
+INDEX_FILE = "index.jsonl"
+LEGACY_INDEX_FILE = "index.json"
+COMPACT_AFTER = 50  # Enregistrements périmés tolérés avant compaction
+
+
+def session_summary(session: ChatSession) -> Dict[str, Any]:
+    """Métadonnées d'une session conservées dans l'index."""
+    return {
+        "session_id": session.session_id,
+        "agent": session.context.current_agent,
+        "pipeline": session.context.default_pipeline,
+        "messages": len(session.history)
+    }
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, default=str)
+
+
+def _read_records(path: str) -> List[Dict[str, Any]]:
+    """Lit un fichier JSONL ; une dernière ligne tronquée (arrêt brutal) est supprimée."""
+    records = []
+    valid_end = 0
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+            offset += len(line)
+            if line.endswith(b"\n"):
+                valid_end = offset
+            else:
+                break
+    if valid_end < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(valid_end)
+        if records and valid_end < offset:
+            records.pop()  # Ligne complète en JSON mais sans fin de ligne : réécrite ensuite
+    return records
+
+
+class SessionStore:
+    """Sessions sur disque (journaux JSONL) avec un index des métadonnées."""
+
+    def __init__(self, directory: str = SESSIONS_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._index_records = 0
+        # Par session : messages et contexte déjà écrits, nombre d'enregistrements du journal
+        self._logs: Dict[str, Dict[str, Any]] = {}
+
+    def _log_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.jsonl")
+
+    def _legacy_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.json")
+
+    # --- Index ---
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            self._index = {}
+            try:
+                records = _read_records(self.index_path)
+            except OSError:
+                records = []
+            for summary in records:
+                self._index[summary["session_id"]] = summary
+            self._index_records = len(records)
+            self._reconcile()
+        return self._index
+
+    def _reconcile(self):
+        """Aligne l'index sur le dossier : seuls les fichiers absents de l'index sont lus."""
+        os.makedirs(self.directory, exist_ok=True)
+        on_disk = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name, extension = os.path.splitext(entry.name)
+                if extension in (".json", ".jsonl") and entry.name not in (INDEX_FILE, LEGACY_INDEX_FILE):
+                    on_disk.add(name)
+
+        changed = False
+        for session_id in on_disk - set(self._index):
+            session = self._read(session_id)
+            if session is not None:
+                self._index[session_id] = session_summary(session)
+                changed = True
+        for session_id in set(self._index) - on_disk:
+            del self._index[session_id]
+            changed = True
+        if changed:
+            self._write_index()
+
+    def _write_index(self):
+        """Réécrit l'index compacté (une ligne par session) de façon atomique."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for summary in self._index.values():
+                f.write(_dumps(summary) + "\n")
+        os.replace(tmp_path, self.index_path)
+        self._index_records = len(self._index)
+
+    def _update_index(self, session: ChatSession):
+        index = self._load_index()
+        summary = session_summary(session)
+        if index.get(session.session_id) == summary:
+            return
+        index[session.session_id] = summary
+        if self._index_records > 2 * len(index) + COMPACT_AFTER:
+            self._write_index()
+            return
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(_dumps(summary) + "\n")
+        self._index_records += 1
+
+    # --- Sessions ---
+    def _read(self, session_id: str) -> Optional[ChatSession]:
+        try:
+            if os.path.exists(self._log_path(session_id)):
+                return self._replay(session_id)
+            with open(self._legacy_path(session_id), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return ChatSession(**(data[0] if isinstance(data, list) else data))
+        except Exception:
+            return None  # Fichier illisible : ignoré dans la liste
+
+    def _replay(self, session_id: str) -> Optional[ChatSession]:
+        """Reconstruit une session à partir de son journal."""
+        records = _read_records(self._log_path(session_id))
+        if not records or records[0].get("type") != "session":
+            return None
+        context = records[0]["context"]
+        history = []
+        for record in records[1:]:
+            if record.get("type") == "context":
+                context = record["context"]
+            elif record.get("type") == "message":
+                history.append(record["message"])
+        session = ChatSession(session_id=session_id, context=context, history=history)
+        self._logs[session_id] = {
+            "messages": len(history),
+            "context": _dumps(context),
+            "records": len(records)
+        }
+        return session
+
+    def list(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Métadonnées des sessions, les plus récentes d'abord (sans lire leur historique)."""
+        summaries = sorted(self._load_index().values(), key=lambda s: s["session_id"], reverse=True)
+        return summaries[:limit] if limit is not None else summaries
+
+    def count(self) -> int:
+        return len(self._load_index())
+
+    def load(self, session_id: str) -> Optional[ChatSession]:
+        """Charge une session complète, historique compris."""
+        return self._read(session_id)
+
+    def record(self, session: ChatSession):
+        """Ajoute au journal les nouveaux messages et le contexte s'il a changé.
+
+        Chaque ligne est écrite et synchronisée sur disque avant de rendre la main.
+        Si la session n'a pas encore de journal (nouvelle ou ancien format), ou si
+        son historique a été raccourci, le journal complet est réécrit.
+        """
+        state = self._logs.get(session.session_id)
+        if state is None and os.path.exists(self._log_path(session.session_id)):
+            self._replay(session.session_id)
+            state = self._logs.get(session.session_id)
+        if state is None or len(session.history) < state["messages"]:
+            self.save(session)
+            return
+
+        context = _dumps(asdict(session.context))
+        lines = []
+        if context != state["context"]:
+            lines.append(_dumps({"type": "context", "context": asdict(session.context)}))
+        for message in session.history[state["messages"]:]:
+            lines.append(_dumps({"type": "message", "message": message}))
+        if not lines:
+            return
+
+        with open(self._log_path(session.session_id), "a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+        state["messages"] = len(session.history)
+        state["context"] = context
+        state["records"] += len(lines)
+        self._update_index(session)
+
+        # En-tête + messages = journal compact ; le reste sont des contextes périmés
+        if state["records"] - state["messages"] - 1 > COMPACT_AFTER:
+            self.save(session)
+
+    def save(self, session: ChatSession):
+        """Réécrit le journal compacté de la session (de façon atomique) et met à jour l'index."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(_dumps({"type": "session", "session_id": session.session_id,
+                            "context": asdict(session.context)}) + "\n")
+            for message in session.history:
+                f.write(_dumps({"type": "message", "message": message}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._log_path(session.session_id))
+        if os.path.exists(self._legacy_path(session.session_id)):
+            os.remove(self._legacy_path(session.session_id))
+        self._logs[session.session_id] = {
+            "messages": len(session.history),
+            "context": _dumps(asdict(session.context)),
+            "records": len(session.history) + 1
+        }
+        self._update_index(session)
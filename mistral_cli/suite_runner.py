@@ -0,0 +1,540 @@
+"""
+Exécution parallèle des suites de tests, avec résultats structurés et historique des durées.
+
+Chaque outil de test est décrit par un `SuiteRunner` : fichiers ou paquets de
+test (les « unités »), commande par shard, lecture de la progression au fil de la
+sortie et du rapport lisible par machine (`go test -json`, JUnit XML, JSON de
+Jest). `run_suite()` :
+
+- ordonne les unités de la plus lente à la plus rapide d'après l'historique
+  (`config/test_history.json`, durées lissées par test) ; les unités inconnues
+  passent en premier ;
+- répartit la suite sur les cœurs : parallélisme de l'outil quand il en a un
+  (pytest-xdist, `go test -p`, workers Jest, `node --test`, forks Surefire,
+  threads de libtest), sinon plusieurs processus lancés sur des shards équilibrés
+  (plus longue durée d'abord) ;
+- transmet chaque résultat dès qu'il apparaît dans la sortie (`on_result`) et
+  arrête l'outil au-delà de son délai.
+"""
+
+import abc
+import fnmatch
+import importlib.util
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional
+
+from mistral_cli.tool_runner import ToolTimeoutError, scratch_dir, stream_tool_command
+from mistral_cli.tools.file_analyzer.file_discovery import iter_files
+
+TEST_HISTORY_FILE = "config/test_history.json"
+HISTORY_WEIGHT = 0.5  # Poids de la dernière mesure dans la durée lissée
+DEFAULT_WORKERS = os.cpu_count() or 2
+PROGRESS_EVERY = 25  # Tests terminés entre deux lignes de progression
+OUTPUT_TAIL_LINES = 20  # Lignes de sortie conservées pour expliquer un échec sans résultat
+MAX_MESSAGE_CHARS = 2000
+STATUSES = ("passed", "failed", "error", "skipped")
+
+
+class TestResult(NamedTuple):
+    __test__ = False  # Pas une classe de test pour pytest
+
+    name: str
+    status: str  # "passed", "failed", "error" ou "skipped"
+    duration: float = 0.0  # Secondes
+    unit: str = ""  # Fichier ou paquet de test
+    message: str = ""
+
+
+class SuiteResult(NamedTuple):
+    runner: str
+    results: List[TestResult]
+    workers: int
+    shards: int
+    elapsed: float
+    returncode: int
+    timed_out: bool
+    output_tail: List[str]  # Dernières lignes de sortie (erreur de compilation, crash...)
+
+
+# --- Historique des durées ---
+class TestHistory:
+    """Durées lissées des tests, par suite (outil et répertoire)."""
+
+    __test__ = False
+
+    def __init__(self, path: str = TEST_HISTORY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Dict[str, List[Any]]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, List[Any]]]:
+        if self._data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def unit_durations(self, suite: str) -> Dict[str, float]:
+        """Durée connue de chaque unité : somme des durées de ses tests."""
+        durations: Dict[str, float] = {}
+        with self._lock:
+            for unit, duration in self._load().get(suite, {}).values():
+                durations[unit] = durations.get(unit, 0.0) + duration
+        return durations
+
+    def record(self, suite: str, results: Iterable[TestResult]):
+        """Met à jour les durées avec une exécution et enregistre l'historique."""
+        with self._lock:
+            tests = self._load().setdefault(suite, {})
+            for result in results:
+                if result.status == "skipped":
+                    continue
+                previous = tests.get(result.name)
+                duration = result.duration
+                if previous is not None:
+                    duration = HISTORY_WEIGHT * duration + (1 - HISTORY_WEIGHT) * previous[1]
+                tests[result.name] = [result.unit, round(duration, 4)]
+            directory = os.path.dirname(self.path) or "."
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass  # Historique facultatif
+
+
+def order_units(units: List[str], durations: Dict[str, float]) -> List[str]:
+    """Unités de la plus lente à la plus rapide ; celles sans historique d'abord."""
+    return sorted(units, key=lambda unit: (unit in durations, -durations.get(unit, 0.0)))
+
+
+def plan_shards(units: List[str], durations: Dict[str, float], count: int) -> List[List[str]]:
+    """Répartit les unités (déjà ordonnées) sur `count` shards : chacune va au moins chargé."""
+    known = [d for d in durations.values() if d > 0]
+    default = max(known) if known else 1.0  # Une unité inconnue compte comme la plus lente
+    shards: List[List[str]] = [[] for _ in range(max(1, min(count, len(units))))]
+    loads = [0.0] * len(shards)
+    for unit in units:
+        index = loads.index(min(loads))
+        shards[index].append(unit)
+        loads[index] += durations.get(unit, default)
+    return shards
+
+
+# --- Rapports ---
+def _message(text: Optional[str]) -> str:
+    return (text or "").strip()[:MAX_MESSAGE_CHARS]
+
+
+def parse_junit(path: str, unit_of: Optional[Callable[[Dict[str, str]], str]] = None) -> List[TestResult]:
+    """Cas de test d'un rapport JUnit XML (pytest, Surefire, node --test, PHPUnit...)."""
+    results = []
+    for _, element in ET.iterparse(path):
+        if element.tag != "testcase":
+            continue
+        attributes = dict(element.attrib)
+        status, message = "passed", ""
+        for child in element:
+            if child.tag in ("failure", "error"):
+                status = "failed" if child.tag == "failure" else "error"
+                message = _message(child.get("message") or child.text)
+                break
+            if child.tag == "skipped":
+                status, message = "skipped", _message(child.get("message"))
+        classname = attributes.get("classname", "")
+        name = f"{classname}::{attributes.get('name', '')}" if classname else attributes.get("name", "")
+        unit = unit_of(attributes) if unit_of else attributes.get("file") or classname
+        results.append(TestResult(name, status, float(attributes.get("time") or 0), unit, message))
+        element.clear()
+    return results
+
+
+# --- Outils de test ---
+class SuiteRunner(abc.ABC):
+    """Adaptateur d'un outil de test : unités, commande, progression et rapport."""
+
+    name = ""
+    patterns: tuple = ()  # Fichiers de test (patterns glob sur le nom)
+    test_dirs: tuple = ()  # Répertoires dont les fichiers `test_dir_patterns` sont tous des tests
+    test_dir_patterns: tuple = ()
+    native_workers = True  # L'outil répartit lui-même les unités sur ses workers
+    discovers_units = True  # False : l'outil trouve lui-même ses tests (aucune unité transmise)
+
+    def __init__(self):
+        self.directory = "."
+        self.suite_units: List[str] = []  # Unités de l'exécution en cours
+
+    def units(self, directory: str) -> List[str]:
+        """Fichiers de test, relatifs au répertoire de la suite."""
+        units = []
+        for found in iter_files(directory, self.patterns + self.test_dir_patterns):
+            unit = os.path.relpath(found.path, directory).replace(os.sep, "/")
+            *parents, name = unit.split("/")
+            if (any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+                    or any(parent in self.test_dirs for parent in parents)):
+                units.append(unit)
+        return units
+
+    @abc.abstractmethod
+    def command(self, units: List[str], workers: int, report_path: str) -> List[str]:
+        """Commande qui exécute les unités sur `workers` workers et écrit son rapport dans `report_path`."""
+
+    def parse_line(self, line: str) -> Optional[TestResult]:
+        """Résultat annoncé par une ligne de sortie, pour la progression."""
+        return None
+
+    def read_report(self, report_path: str, units: List[str]) -> Optional[List[TestResult]]:
+        """Résultats complets ; None pour garder ceux lus au fil de la sortie."""
+        return None
+
+
+PYTEST_STATUS = {"PASSED": "passed", "XPASS": "passed", "FAILED": "failed", "ERROR": "error",
+                 "SKIPPED": "skipped", "XFAIL": "skipped"}
+# `fichier::test STATUT [ 10%]`, ou `[gw0] [ 10%] STATUT fichier::test` avec pytest-xdist
+PYTEST_LINE = re.compile(r"^(?:(?P<id>\S+::\S+)\s+(?P<status>PASSED|FAILED|ERROR|SKIPPED|XFAIL|XPASS)\b"
+                         r"|\[gw\d+\].*?(?P<status2>PASSED|FAILED|ERROR|SKIPPED|XFAIL|XPASS)\s+(?P<id2>\S+::\S+))")
+
+
+class PytestRunner(SuiteRunner):
+    """pytest : pytest-xdist (`-n`) s'il est installé, sinon des processus pytest par shard."""
+
+    name = "pytest"
+    patterns = ("test_*.py", "*_test.py")
+
+    def __init__(self):
+        super().__init__()
+        self.native_workers = importlib.util.find_spec("xdist") is not None
+
+    def command(self, units: List[str], workers: int, report_path: str) -> List[str]:
+        pytest = ["pytest"] if shutil.which("pytest") else [sys.executable, "-m", "pytest"]
+        parallel = ["-n", str(workers), "--dist", "load"] if self.native_workers and workers > 1 else []
+        return [*pytest, "-v", "-p", "no:cacheprovider", f"--junitxml={report_path}", *parallel, *units]
+
+    def parse_line(self, line: str) -> Optional[TestResult]:
+        match = PYTEST_LINE.match(line)
+        if not match:
+            return None
+        test_id = match["id"] or match["id2"]
+        return TestResult(test_id, PYTEST_STATUS[match["status"] or match["status2"]],
+                          unit=test_id.split("::", 1)[0])
+
+    def read_report(self, report_path: str, units: List[str]) -> Optional[List[TestResult]]:
+        if not os.path.exists(report_path):
+            return None
+        modules = sorted(((unit[:-3].replace("/", "."), unit) for unit in units), reverse=True)
+
+        def unit_of(attributes: Dict[str, str]) -> str:
+            # classname = chemin du module en notation pointée, suivi de la classe éventuelle
+            classname = attributes.get("classname", "")
+            return next((unit for module, unit in modules
+                         if classname == module or classname.startswith(module + ".")), classname)
+
+        return parse_junit(report_path, unit_of)
+
+
+class GoTestRunner(SuiteRunner):
+    """`go test -json -p N` : les paquets sont compilés et testés en parallèle."""
+
+    name = "go test"
+    patterns = ("*_test.go",)
+
+    def __init__(self):
+        super().__init__()
+        self._output: Dict[tuple, Deque[str]] = {}
+
+    def units(self, directory: str) -> List[str]:
+        packages = {os.path.dirname(path) for path in super().units(directory)}
+        return sorted(f"./{package}" if package else "." for package in packages)
+
+    def command(self, units: List[str], workers: int, report_path: str) -> List[str]:
+        return ["go", "test", "-json", "-p", str(workers), *units]
+
+    def _unit(self, package: str) -> str:
+        # Chemin d'import -> paquet relatif ("example.com/mod/pkg/sub" -> "./pkg/sub")
+        candidates = [unit for unit in self.suite_units if unit != "." and package.endswith(unit[1:])]
+        return max(candidates, key=len) if candidates else "."
+
+    def parse_line(self, line: str) -> Optional[TestResult]:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(event, dict) or "Test" not in event:
+            return None
+        key = (event.get("Package", ""), event["Test"])
+        action = event.get("Action")
+        if action == "output":
+            self._output.setdefault(key, deque(maxlen=OUTPUT_TAIL_LINES)).append(event.get("Output", ""))
+            return None
+        if action not in ("pass", "fail", "skip"):
+            return None
+        output = self._output.pop(key, ())
+        status = {"pass": "passed", "fail": "failed", "skip": "skipped"}[action]
+        return TestResult(f"{key[0]}.{key[1]}", status, float(event.get("Elapsed") or 0),
+                          self._unit(key[0]), _message("".join(output)) if status == "failed" else "")
+
+    def read_report(self, report_path: str, units: List[str]) -> Optional[List[TestResult]]:
+        return None  # Résultats lus dans le flux JSON
+
+
+JEST_LINE = re.compile(r"^\s*(PASS|FAIL)\s+(\S+)")
+JEST_STATUS = {"passed": "passed", "failed": "failed", "pending": "skipped", "skipped": "skipped",
+               "todo": "skipped", "disabled": "skipped"}
+
+
+class JestRunner(SuiteRunner):
+    """Jest avec `--maxWorkers` ; Jest lance lui-même les fichiers les plus lents d'abord."""
+
+    name = "jest"
+    discovers_units = False  # testMatch de Jest (__tests__/**, *.test.js...) et sa configuration
+
+    def command(self, units: List[str], workers: int, report_path: str) -> List[str]:
+        return ["jest", "--ci", f"--maxWorkers={workers}", "--json", f"--outputFile={report_path}"]
+
+    def parse_line(self, line: str) -> Optional[TestResult]:
+        match = JEST_LINE.match(line)
+        if not match:
+            return None
+        return TestResult(match[2], "passed" if match[1] == "PASS" else "failed", unit=match[2])
+
+    def read_report(self, report_path: str, units: List[str]) -> Optional[List[TestResult]]:
+        try:
+            with open(report_path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            return None
+        results = []
+        for test_file in report.get("testResults", []):
+            unit = os.path.relpath(test_file.get("name", ""), self.directory).replace(os.sep, "/")
+            for assertion in test_file.get("assertionResults", []):
+                results.append(TestResult(
+                    f"{unit}::{assertion.get('fullName') or assertion.get('title', '')}",
+                    JEST_STATUS.get(assertion.get("status"), "error"), (assertion.get("duration") or 0) / 1000,
+                    unit, _message("\n".join(assertion.get("failureMessages") or []))
+                ))
+        return results
+
+
+TAP_LINE = re.compile(r"^\s*(not )?ok \d+ - (.*?)(?:\s+#\s*(SKIP|TODO)\b.*)?$")
+
+
+class NodeTestRunner(SuiteRunner):
+    """Lanceur intégré de Node (`node --test`) : fichiers en parallèle, rapport JUnit."""
+
+    name = "node --test"
+    patterns = ("*.test.js", "*.test.mjs", "*.test.cjs", "*-test.js", "*_test.js", "test-*.js", "test.js")
+    test_dirs = ("test",)  # Convention de node --test : test/**/*.js
+    test_dir_patterns = ("*.js", "*.mjs", "*.cjs")
+
+    def command(self, units: List[str], workers: int, report_path: str) -> List[str]:
+        return ["node", "--test", f"--test-concurrency={workers}",
+                "--test-reporter=tap", "--test-reporter-destination=stdout",
+                "--test-reporter=junit", f"--test-reporter-destination={report_path}", *units]
+
+    def parse_line(self, line: str) -> Optional[TestResult]:
+        match = TAP_LINE.match(line)
+        if not match:
+            return None
+        status = "skipped" if match[3] else ("failed" if match[1] else "passed")
+        return TestResult(match[2], status)
+
+    def read_report(self, report_path: str, units: List[str]) -> Optional[List[TestResult]]:
+        if not os.path.exists(report_path):
+            return None
+
+        def unit_of(attributes: Dict[str, str]) -> str:
+            path = attributes.get("file", "")
+            return os.path.relpath(path, self.directory).replace(os.sep, "/") if path else ""
+
+        # Les suites (describe) apparaissent aussi comme cas de test sans durée propre
+        return [result for result in parse_junit(report_path, unit_of) if result.name]
+
+
+SUREFIRE_LINE = re.compile(r"Tests run: (\d+), Failures: (\d+), Errors: (\d+), Skipped: (\d+), "
+                           r"Time elapsed: ([\d.,]+) s.*? - in (\S+)")
+
+
+class MavenTestRunner(SuiteRunner):
+    """Maven Surefire : classes de test réparties sur `forkCount` JVM, rapports JUnit XML."""
+
+    name = "mvn test"
+    discovers_units = False  # Surefire applique ses propres includes/excludes
+
+    def __init__(self):
+        super().__init__()
+        self._started = time.time()
+
+    def command(self, units: List[str], workers: int, report_path: str) -> List[str]:
+        self._started = time.time()
+        return ["mvn", "-B", "test", f"-DforkCount={workers}", "-DreuseForks=true"]
+
+    def parse_line(self, line: str) -> Optional[TestResult]:
+        match = SUREFIRE_LINE.search(line)
+        if not match:
+            return None
+        failed = int(match[2]) + int(match[3])
+        return TestResult(match[6], "failed" if failed else "passed", float(match[5].replace(",", ".")), match[6])
+
+    def read_report(self, report_path: str, units: List[str]) -> Optional[List[TestResult]]:
+        results = []
+        for found in iter_files(self.directory, ["TEST-*.xml"], use_ignore_files=False, ignored_dirs=()):
+            if "surefire-reports" in found.path and found.mtime >= self._started - 1:
+                results.extend(parse_junit(found.path, lambda attributes: attributes.get("classname", "")))
+        return results or None
+
+
+LIBTEST_LINE = re.compile(r"^test (\S+) \.\.\. (ok|FAILED|ignored)")
+
+
+class CargoTestRunner(SuiteRunner):
+    """`cargo test` : libtest exécute les tests sur `--test-threads` threads."""
+
+    name = "cargo test"
+
+    def units(self, directory: str) -> List[str]:
+        return ["."] if os.path.isfile(os.path.join(directory, "Cargo.toml")) else []
+
+    def command(self, units: List[str], workers: int, report_path: str) -> List[str]:
+        return ["cargo", "test", "--", f"--test-threads={workers}"]
+
+    def parse_line(self, line: str) -> Optional[TestResult]:
+        match = LIBTEST_LINE.match(line)
+        if not match:
+            return None
+        return TestResult(match[1], {"ok": "passed", "FAILED": "failed", "ignored": "skipped"}[match[2]], unit=".")
+
+
+# --- Exécution ---
+def run_suite(runner: SuiteRunner, directory: str = ".", workers: Optional[int] = None,
+              timeout: Optional[float] = None, history: Optional[TestHistory] = None,
+              on_result: Optional[Callable[[TestResult], None]] = None) -> SuiteResult:
+    """Exécute une suite de tests en parallèle et retourne ses résultats structurés.
+
+    `timeout` borne chaque processus de l'outil (délai du binaire par défaut) ;
+    au-delà il est arrêté et `timed_out` vaut True.
+    """
+    started = time.perf_counter()
+    workers = max(1, int(workers or DEFAULT_WORKERS))
+    history = history or TestHistory()
+    suite = f"{runner.name}:{os.path.abspath(directory)}"
+    runner.directory = directory
+
+    units = runner.units(directory) if runner.discovers_units else []
+    if runner.discovers_units and not units:
+        return SuiteResult(runner.name, [], workers, 0, time.perf_counter() - started, 0, False,
+                           ["Aucun test trouvé."])
+    durations = history.unit_durations(suite)
+    units = order_units(units, durations)
+    runner.suite_units = units
+    shards = [units] if runner.native_workers else plan_shards(units, durations, workers)
+    shard_workers = workers if runner.native_workers else 1
+
+    streamed: List[TestResult] = []
+    tail: Deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+    lock = threading.Lock()
+
+    def on_line(line: str):
+        result = runner.parse_line(line)
+        with lock:
+            tail.append(line)
+            if result is not None:
+                streamed.append(result)
+        if result is not None and on_result:
+            on_result(result)
+
+    with scratch_dir() as reports:
+        def run_shard(index: int) -> tuple:
+            report_path = os.path.join(reports, f"shard{index}.report")
+            try:
+                returncode = stream_tool_command(runner.command(shards[index], shard_workers, report_path),
+                                                 on_line, timeout=timeout, cwd=directory)
+                timed_out = False
+            except ToolTimeoutError as e:
+                tail.append(str(e))
+                returncode, timed_out = -1, True
+            return returncode, timed_out, runner.read_report(report_path, shards[index])
+
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            outcomes = list(executor.map(run_shard, range(len(shards))))
+
+    reported = [outcome[2] for outcome in outcomes]
+    if all(results is not None for results in reported):
+        results = [result for results in reported for result in results]
+    else:
+        results = streamed  # Rapport absent (arrêt, outil sans rapport) : résultats lus au fil de la sortie
+    history.record(suite, results)
+    returncode = next((code for code, _, _ in outcomes if code != 0), 0)
+    return SuiteResult(runner.name, results, workers, len(shards), time.perf_counter() - started,
+                       returncode, any(timed_out for _, timed_out, _ in outcomes), list(tail))
+
+
+class ProgressPrinter:
+    """Affiche les échecs dès qu'ils surviennent et un décompte régulier des tests terminés."""
+
+    def __init__(self, every: int = PROGRESS_EVERY):
+        self.every = every
+        self.done = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, result: TestResult):
+        with self._lock:
+            self.done += 1
+            if result.status in ("failed", "error"):
+                self.failed += 1
+                print(f"❌ {result.name}")
+            if self.done % self.every == 0:
+                print(f"🧪 {self.done} tests terminés ({self.failed} en échec)")
+
+
+def suite_report(result: SuiteResult, slowest: int = 10) -> str:
+    """Synthèse JSON : compteurs, tests les plus lents et échecs (sortie des outils de test)."""
+    counts = {status: 0 for status in STATUSES}
+    for test in result.results:
+        counts[test.status] = counts.get(test.status, 0) + 1
+    failures = [test for test in result.results if test.status in ("failed", "error")]
+    report = {
+        "runner": result.runner,
+        # Aucun test exécuté n'est pas un succès (suite introuvable, filtre trop strict...)
+        "success": bool(result.results) and result.returncode == 0 and not result.timed_out and not failures,
+        "no_tests": not result.results,
+        "tests": len(result.results),
+        "counts": counts,
+        "workers": result.workers,
+        "shards": result.shards,
+        "elapsed": round(result.elapsed, 3),
+        "timed_out": result.timed_out,
+        "returncode": result.returncode,
+        "slowest": [{"name": test.name, "duration": round(test.duration, 3)}
+                    for test in sorted(result.results, key=lambda t: -t.duration)[:slowest]],
+        "failures": [test._asdict() for test in failures],
+    }
+    if not result.results or (result.returncode != 0 and not failures):
+        report["output"] = "\n".join(result.output_tail)  # Échec hors tests (compilation, configuration...)
+    return json.dumps(report, indent=2, ensure_ascii=False)
+
+
+def execute_suite(context, runner_cls: Callable[[], SuiteRunner], directory: str = ".",
+                  workers: Optional[int] = None):
+    """Corps commun des outils de test : suite répartie sur les cœurs, progression en direct, rapport JSON."""
+    try:
+        result = run_suite(runner_cls(), directory, workers=workers, timeout=context.data.get("timeout"),
+                           on_result=ProgressPrinter())
+        context.data["output"] = suite_report(result)
+    except Exception as e:
+        context.data["output"] = f"Erreur: {str(e)}"
+    return context
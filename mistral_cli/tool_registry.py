@@ -0,0 +1,274 @@
+"""
+Registre des outils utilisables dans les pipelines.
+
+Les outils intégrés (`mistral_cli/tools/<langage>/<outil>.py`) sont décrits par un
+manifeste précalculé, `mistral_cli/tools/manifest.json` : nom, langage, type
+(linter, test, doc, security...), binaire requis et mode d'entrée. Il est produit
+par analyse statique du code des outils, sans les importer :
+
+    python -m mistral_cli.tool_registry
+
+Les outils tiers se déclarent dans le groupe de points d'entrée
+`mistral_cli.tools` (nom = "<langage>/<outil>", valeur = module exposant
+`execute(context)`). Lister les outils ne lit que le manifeste et les métadonnées
+des paquets ; un module n'est importé qu'à sa première utilisation.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+TOOLS_PACKAGE = "mistral_cli.tools"
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOLS_DIR = os.path.join(PACKAGE_DIR, "tools")
+MANIFEST_FILE = os.path.join(TOOLS_DIR, "manifest.json")
+ENTRY_POINT_GROUP = "mistral_cli.tools"
+
+# Type d'outil déduit des mots du nom du module (premier mot-clé trouvé)
+KIND_KEYWORDS = [
+    ("test", "test"),
+    ("doc", "doc"),
+    ("security", "security"),
+    ("audit", "security"),
+    ("linter", "linter"),
+    ("analyzer", "linter"),
+    ("validator", "linter"),
+    ("checker", "linter"),
+    ("bundler", "build"),
+]
+# Données de contexte qui ne décrivent pas l'entrée de l'outil
+COMMON_PARAMS = {"api_key", "use_cache", "cache_ttl", "output", "timeout"}
+FILE_PARAMS = {"file_path", "dockerfile_path", "test_file", "entry_file"}
+DIRECTORY_PARAMS = {"directory", "folder_path", "code_dir", "project_path"}
+
+_registry: Optional["ToolRegistry"] = None
+_registry_lock = threading.Lock()
+
+
+@dataclass
+class ToolSpec:
+    """Description d'un outil, lue depuis le manifeste ou un point d'entrée."""
+    name: str  # Nom utilisé dans les pipelines (ex. "python/py_linter")
+    module: str
+    language: str
+    kind: str
+    binary: Optional[str] = None  # Programme externe appelé par l'outil
+    input_mode: str = "cwd"  # "input" (code transmis), "file", "directory" ou "cwd"
+    params: List[str] = field(default_factory=list)  # Clés lues dans context.data
+    description: str = ""
+    source: str = "builtin"  # "builtin" ou "entry_point"
+
+
+def tool_kind(name: str) -> str:
+    words = name.rsplit("/", 1)[-1].split("_")
+    return next((kind for keyword, kind in KIND_KEYWORDS if keyword in words), "analysis")
+
+
+def _input_mode(params: List[str]) -> str:
+    if "input" in params:
+        return "input"
+    if FILE_PARAMS.intersection(params):
+        return "file"
+    if DIRECTORY_PARAMS.intersection(params):
+        return "directory"
+    return "cwd"
+
+
+def _is_context_data(node: ast.AST) -> bool:
+    return (isinstance(node, ast.Attribute) and node.attr == "data"
+            and isinstance(node.value, ast.Name) and node.value.id == "context")
+
+
+def _is_command_call(func: ast.AST) -> bool:
+    if isinstance(func, ast.Name):
+        return func.id == "run_tool_command"
+    return isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "subprocess"
+
+
+def _string(node: ast.AST) -> Optional[str]:
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+
+def inspect_tool(path: str, name: str) -> Optional[ToolSpec]:
+    """Décrit un outil à partir de son code source ; None si le module n'a pas de `execute()`."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    execute = next((node for node in tree.body
+                    if isinstance(node, ast.FunctionDef) and node.name == "execute"), None)
+    if execute is None:
+        return None
+
+    params: List[str] = []
+    # Binaire déclaré par l'outil (REQUIRED_BINARY = "..."), sinon premier programme lancé
+    binary = next((_string(node.value) for node in tree.body
+                   if isinstance(node, ast.Assign) and len(node.targets) == 1
+                   and isinstance(node.targets[0], ast.Name) and node.targets[0].id == "REQUIRED_BINARY"), None)
+    for node in ast.walk(tree):
+        key = None
+        # context.data.get("clé", ...) et context.data["clé"] (en lecture)
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "get" and _is_context_data(node.func.value) and node.args):
+            key = _string(node.args[0])
+        elif (isinstance(node, ast.Subscript) and isinstance(node.ctx, ast.Load)
+              and _is_context_data(node.value)):
+            key = _string(node.slice)
+        if key and key not in COMMON_PARAMS and key not in params:
+            params.append(key)
+        # run_tool_command(["binaire", ...]) ou subprocess.run(["binaire", ...])
+        if (binary is None and isinstance(node, ast.Call) and _is_command_call(node.func)
+                and node.args and isinstance(node.args[0], ast.List) and node.args[0].elts):
+            binary = _string(node.args[0].elts[0])
+
+    docstring = ast.get_docstring(execute) or ""
+    return ToolSpec(
+        name=name,
+        module=f"{TOOLS_PACKAGE}.{name.replace('/', '.')}",
+        language=name.rsplit("/", 1)[0],
+        kind=tool_kind(name),
+        binary=binary,
+        input_mode=_input_mode(params),
+        params=params,
+        description=docstring.strip().splitlines()[0] if docstring.strip() else ""
+    )
+
+
+def build_manifest(tools_dir: str = TOOLS_DIR) -> List[Dict[str, Any]]:
+    """Parcourt les outils intégrés (sans les importer) et retourne le manifeste trié par nom."""
+    specs = []
+    for root, dirs, files in os.walk(tools_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(("_", ".")))
+        for file_name in sorted(files):
+            if not file_name.endswith(".py") or file_name.startswith("_"):
+                continue
+            path = os.path.join(root, file_name)
+            name = os.path.relpath(path, tools_dir)[:-3].replace(os.sep, "/")
+            if "/" not in name:
+                continue  # Seuls les outils rangés par langage
+            spec = inspect_tool(path, name)
+            if spec is not None:
+                specs.append(asdict(spec))
+    return sorted(specs, key=lambda s: s["name"])
+
+
+def write_manifest(path: str = MANIFEST_FILE, tools_dir: str = TOOLS_DIR) -> int:
+    """Régénère le manifeste ; retourne le nombre d'outils décrits."""
+    manifest = build_manifest(tools_dir)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return len(manifest)
+
+
+def _entry_points() -> List[Any]:
+    from importlib.metadata import entry_points
+    try:
+        return list(entry_points(group=ENTRY_POINT_GROUP))
+    except TypeError:  # Python < 3.10
+        return list(entry_points().get(ENTRY_POINT_GROUP, []))
+
+
+class ToolRegistry:
+    """Outils intégrés et tiers, indexés par nom ; modules importés à la demande."""
+
+    def __init__(self, manifest_path: str = MANIFEST_FILE, entry_points: bool = True):
+        self.manifest_path = manifest_path
+        self.use_entry_points = entry_points
+        self._specs: Optional[Dict[str, ToolSpec]] = None
+        self._entry_points: Dict[str, Any] = {}
+        self._modules: Dict[str, Any] = {}
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _load_specs(self) -> Dict[str, ToolSpec]:
+        if self._specs is None:
+            specs: Dict[str, ToolSpec] = {}
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    for entry in json.load(f):
+                        specs[entry["name"]] = ToolSpec(**entry)
+            except (OSError, ValueError):
+                pass  # Manifeste absent : les outils restent utilisables par leur chemin
+            if self.use_entry_points:
+                for entry_point in _entry_points():
+                    if entry_point.name in specs:
+                        continue  # Un outil intégré n'est pas remplacé
+                    self._entry_points[entry_point.name] = entry_point
+                    specs[entry_point.name] = ToolSpec(
+                        name=entry_point.name,
+                        module=entry_point.value,
+                        language=entry_point.name.rsplit("/", 1)[0] if "/" in entry_point.name else "autre",
+                        kind=tool_kind(entry_point.name),
+                        input_mode="input",
+                        source="entry_point"
+                    )
+            self._specs = specs
+        return self._specs
+
+    def specs(self, language: Optional[str] = None, kind: Optional[str] = None) -> List[ToolSpec]:
+        """Outils connus, filtrés par langage et/ou type, sans rien importer."""
+        return [spec for spec in self._load_specs().values()
+                if (language is None or spec.language == language) and (kind is None or spec.kind == kind)]
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._load_specs().get(name.strip("/"))
+
+    def load(self, name: str):
+        """Module de l'outil `name`, importé une seule fois.
+
+        Un nom absent du manifeste est résolu sous `mistral_cli.tools` comme avant.
+        """
+        name = name.strip("/")
+        module = self._modules.get(name)
+        if module is None:
+            with self._lock:
+                module = self._modules.get(name)
+                if module is None:
+                    spec = self.get(name)
+                    if spec is not None and spec.source == "entry_point":
+                        module = self._entry_points[name].load()
+                    else:
+                        module_path = spec.module if spec else f"{TOOLS_PACKAGE}.{name.replace('/', '.')}"
+                        module = __import__(module_path, fromlist=[''])
+                    self._modules[name] = module
+        return module
+
+    def version(self, name: str) -> str:
+        """Version d'un outil : `__version__` du module, sinon hash de son code source.
+
+        Le code source comprend les fichiers de `mistral_cli/` listés dans
+        `CACHE_DEPENDENCIES` par l'outil (module qui fait le travail, script Node...).
+        """
+        name = name.strip("/")
+        version = self._versions.get(name)
+        if version is None:
+            module = self.load(name)
+            version = getattr(module, "__version__", None)
+            if version is None:
+                digest = hashlib.sha256()
+                paths = [module.__file__] + [os.path.join(PACKAGE_DIR, dependency)
+                                             for dependency in getattr(module, "CACHE_DEPENDENCIES", ())]
+                for path in paths:
+                    with open(path, "rb") as f:
+                        digest.update(f.read())
+                version = digest.hexdigest()[:16]
+            self._versions[name] = version
+        return version
+
+
+def get_tool_registry() -> ToolRegistry:
+    """Retourne le registre partagé, créé à la première utilisation."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ToolRegistry()
+    return _registry
+
+
+if __name__ == "__main__":
+    count = write_manifest()
+    print(f"✅ Manifeste des outils régénéré : {count} outils ({MANIFEST_FILE})")
@@ -0,0 +1,271 @@
+"""
+Exécution isolée et bornée des outils.
+
+- `scratch_dir()` donne à chaque appel son propre répertoire de travail (sur tmpfs,
+  `/dev/shm`, quand il est disponible) : deux exécutions simultanées n'écrivent
+  plus dans le même `temp.py` du répertoire courant.
+- `run_tool_command()` lance un binaire avec un délai maximal et un nombre
+  d'exécutions simultanées borné par binaire (cargo, mvn ou gradle verrouillent
+  leur répertoire de build et ne gagnent rien à tourner en parallèle) ;
+  `stream_tool_command()` fait de même en lisant sa sortie au fil de l'eau.
+- `ToolRunner` exécute `execute()` des outils Python dans un pool de processus,
+  avec un délai et une concurrence bornés par outil, pour traiter de nombreux
+  fichiers en parallèle.
+
+Les limites par défaut (`TOOL_LIMITS`) s'ajustent dans `config/tool_limits.json`,
+par binaire ou par outil :
+
+    {"cargo": {"timeout": 1800}, "php/php_security_scanner": {"max_concurrency": 2}}
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import ExitStack, contextmanager
+from dataclasses import replace
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from mistral_cli.context import Context
+from mistral_cli.tool_registry import get_tool_registry
+
+TOOL_LIMITS_FILE = "config/tool_limits.json"
+SCRATCH_ROOTS = ("/dev/shm",)  # tmpfs : pas d'écriture sur disque pour des fichiers éphémères
+SCRATCH_PREFIX = "mistral-cli-"
+DEFAULT_TOOL_TIMEOUT = 600.0  # Secondes
+DEFAULT_MAX_CONCURRENCY = os.cpu_count() or 4
+TIMEOUT_GRACE = 5.0  # Marge laissée à l'outil pour arrêter lui-même son binaire
+
+# Binaires qui verrouillent leur répertoire de build ou chargent une JVM complète
+TOOL_LIMITS: Dict[str, Dict[str, float]] = {
+    "cargo": {"max_concurrency": 1, "timeout": 1800},
+    "mvn": {"max_concurrency": 1, "timeout": 1800},
+    "./gradlew": {"max_concurrency": 1, "timeout": 1800},
+    "dotnet": {"max_concurrency": 1, "timeout": 1800},
+    "swift": {"max_concurrency": 1, "timeout": 1800},
+    "psalm": {"max_concurrency": 2},
+}
+
+_configured_limits: Optional[Dict[str, Dict[str, float]]] = None
+_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+class ToolLimits(NamedTuple):
+    timeout: float
+    max_concurrency: int
+
+
+class ToolTimeoutError(TimeoutError):
+    """Un outil a dépassé son délai maximal."""
+
+
+def _load_configured_limits() -> Dict[str, Dict[str, float]]:
+    global _configured_limits
+    if _configured_limits is None:
+        try:
+            with open(TOOL_LIMITS_FILE, "r", encoding="utf-8") as f:
+                _configured_limits = json.load(f)
+        except (OSError, ValueError):
+            _configured_limits = {}
+    return _configured_limits
+
+
+def _limits(name: str) -> Dict[str, float]:
+    return dict(TOOL_LIMITS.get(name, {}), **_load_configured_limits().get(name, {}))
+
+
+def tool_timeout(name: str) -> Optional[float]:
+    """Délai défini pour un outil ou un binaire, None s'il n'en a pas de propre."""
+    timeout = _limits(name).get("timeout")
+    return float(timeout) if timeout else None
+
+
+def tool_limits(name: str) -> ToolLimits:
+    """Délai et concurrence d'un binaire ou d'un outil : configuration, puis valeurs intégrées."""
+    limits = _limits(name)
+    return ToolLimits(
+        timeout=float(limits.get("timeout", DEFAULT_TOOL_TIMEOUT)),
+        max_concurrency=max(1, int(limits.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)))
+    )
+
+
+def _semaphore(name: str, max_concurrency: int) -> threading.BoundedSemaphore:
+    semaphore = _semaphores.get(name)
+    if semaphore is None:
+        with _semaphores_lock:
+            semaphore = _semaphores.setdefault(name, threading.BoundedSemaphore(max_concurrency))
+    return semaphore
+
+
+def scratch_root() -> Optional[str]:
+    """Répertoire des espaces de travail : tmpfs si disponible, sinon le dossier temporaire système."""
+    for root in SCRATCH_ROOTS:
+        if os.path.isdir(root) and os.access(root, os.W_OK):
+            return root
+    return None
+
+
+@contextmanager
+def scratch_dir() -> Iterator[str]:
+    """Répertoire de travail propre à un appel, supprimé à la sortie du bloc."""
+    path = tempfile.mkdtemp(prefix=SCRATCH_PREFIX, dir=scratch_root())
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def write_scratch_file(directory: str, name: str, content: str) -> str:
+    """Écrit `content` dans `directory/name` et retourne le chemin du fichier."""
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+def run_tool_command(command: List[str], timeout: Optional[float] = None, input: Optional[str] = None,
+                     cwd: Optional[str] = None) -> subprocess.CompletedProcess:
+    """Lance un binaire et capture sa sortie texte.
+
+    Le délai vaut `timeout` s'il est fourni, sinon celui du binaire ; au-delà le
+    processus est tué et ToolTimeoutError est levée. Les exécutions simultanées
+    d'un même binaire sont limitées par sa `max_concurrency`.
+    """
+    name = command[0]
+    limits = tool_limits(name)
+    timeout = timeout or limits.timeout
+    with _semaphore(name, limits.max_concurrency):
+        try:
+            return subprocess.run(command, input=input, cwd=cwd, capture_output=True, text=True,
+                                  timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise ToolTimeoutError(f"{name} a dépassé le délai de {timeout:.0f} s")
+
+
+def stream_tool_command(command: List[str], on_line: Callable[[str], None], timeout: Optional[float] = None,
+                        cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> int:
+    """Lance un binaire en transmettant chaque ligne de sa sortie (stdout et stderr) à `on_line`.
+
+    Mêmes délai et concurrence que `run_tool_command` ; retourne le code de sortie.
+    """
+    name = command[0]
+    limits = tool_limits(name)
+    timeout = timeout or limits.timeout
+    with _semaphore(name, limits.max_concurrency):
+        # Groupe de processus propre : les sous-processus (binaires de test...) sont tués avec lui
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=cwd, env=env,
+                                   text=True, errors="replace", bufsize=1, start_new_session=os.name == "posix")
+        expired = threading.Event()
+
+        def kill():
+            expired.set()
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                process.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            for line in process.stdout:
+                on_line(line.rstrip("\n"))
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        if expired.is_set():
+            raise ToolTimeoutError(f"{name} a dépassé le délai de {timeout:.0f} s")
+        return returncode
+
+
+def execute_tool(server: str, context: Context, input_text: str = "") -> str:
+    """Appelle `execute()` d'un outil Python et retourne sa sortie texte.
+
+    Fonction de module (et non méthode) pour pouvoir être exécutée dans un pool de processus.
+    Les résultats des linters et analyseurs de sécurité sont servis par `result_cache`
+    quand l'entrée, le binaire et sa configuration n'ont pas changé.
+    """
+    from mistral_cli.result_cache import execute_cached
+
+    registry = get_tool_registry()
+    context = execute_cached(registry.get(server), registry.load(server), context, registry.version(server))
+    output = context.data.get("output", input_text)
+    return output if isinstance(output, str) else str(output)
+
+
+class ToolRunner:
+    """Pool de processus pour les outils Python, avec délai et concurrence bornés par outil.
+
+    Le délai propre à l'outil est transmis à ses binaires (`context.data["timeout"]`) ;
+    le pool n'attend au-delà que d'une courte marge avant de rendre la main. Sans
+    délai propre, ce sont ceux des binaires qui s'appliquent.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or DEFAULT_MAX_CONCURRENCY
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # "spawn" : un fork depuis un processus multi-thread peut se bloquer
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def run(self, server: str, context: Context, input_text: str = "",
+            timeout: Optional[float] = None) -> str:
+        """Exécute l'outil dans un processus du pool et retourne sa sortie."""
+        timeout = timeout or context.data.get("timeout") or tool_timeout(server)
+        if timeout:
+            context = replace(context, data=dict(context.data, timeout=timeout))
+        spec = get_tool_registry().get(server)
+        with ExitStack() as limits:
+            limits.enter_context(_semaphore(server, tool_limits(server).max_concurrency))
+            # Le binaire s'exécute dans le worker : sa limite doit être prise ici, dans le parent
+            if spec is not None and spec.binary and spec.binary != server:
+                limits.enter_context(_semaphore(spec.binary, tool_limits(spec.binary).max_concurrency))
+            future: Future = self._executor().submit(execute_tool, server, context, input_text)
+            try:
+                return future.result(timeout=timeout + TIMEOUT_GRACE if timeout else None)
+            except FutureTimeoutError:
+                future.cancel()
+                raise ToolTimeoutError(f"{server} a dépassé le délai de {timeout:.0f} s")
+
+    def map(self, server: str, contexts: Iterable[Context], max_concurrency: Optional[int] = None) -> Iterator[str]:
+        """Exécute l'outil sur chaque contexte (un par fichier) ; sorties dans l'ordre des contextes."""
+        from mistral_cli.tools.file_analyzer.streaming import ordered_map
+
+        def run_one(context: Context) -> str:
+            try:
+                return self.run(server, context)
+            except Exception as e:
+                return f"Erreur: {e}"
+
+        return ordered_map(run_one, contexts, max_concurrency or self.max_workers)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                if sys.version_info >= (3, 9):
+                    self._pool.shutdown(cancel_futures=True)
+                else:  # cancel_futures n'existe qu'à partir de Python 3.9
+                    self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
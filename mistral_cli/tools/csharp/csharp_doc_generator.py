@@ -1,14 +1,13 @@
-from mistral_cli.cli import Context
-import subprocess
+from mistral_cli.context import Context
+from mistral_cli.tool_runner import run_tool_command
 import os
 
 def execute(context: Context) -> Context:
     """Génère de la documentation avec DocFX."""
     try:
-        result = subprocess.run(
+        result = run_tool_command(
             ["docfx", "docfx.json"],
-            capture_output=True,
-            text=True
+            timeout=context.data.get("timeout")
         )
         context.data["output"] = (
             f"Documentation générée dans _site\n{result.stdout}\n"
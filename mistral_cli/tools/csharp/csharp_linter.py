@@ -1,14 +1,13 @@
-from mistral_cli.cli import Context
-import subprocess
+from mistral_cli.context import Context
+from mistral_cli.tool_runner import run_tool_command
 import os
 
 def execute(context: Context) -> Context:
     """Linter C# avec dotnet-format."""
     try:
-        result = subprocess.run(
+        result = run_tool_command(
             ["dotnet", "format", "--verify-no-changes"],
-            capture_output=True,
-            text=True
+            timeout=context.data.get("timeout")
         )
         context.data["output"] = (
             f"Rapport dotnet-format:\n{result.stdout}\n"
@@ -1,5 +1,5 @@
-from mistral_cli.cli import Context
-import subprocess
+from mistral_cli.context import Context
+from mistral_cli.tool_runner import run_tool_command
 import os
 
 def execute(context: Context) -> Context:
@@ -10,10 +10,9 @@ def execute(context: Context) -> Context:
         return context
 
     try:
-        result = subprocess.run(
+        result = run_tool_command(
             ["hadolint", dockerfile_path],
-            capture_output=True,
-            text=True
+            timeout=context.data.get("timeout")
         )
         context.data["output"] = (
             f"Rapport Hadolint:\n{result.stdout}\n"
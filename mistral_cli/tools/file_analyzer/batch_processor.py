@@ -1,10 +1,15 @@
-from mistral_cli.cli import Context
+from mistral_cli.context import Context
+from mistral_cli.http_client import configure_pool
 from .file_reader import FileAnalyzer
+from .response_cache import open_response_cache, DEFAULT_RESPONSE_TTL
+from .manifest import FileManifest
+from .checkpoint import open_checkpoint
+from .chunking import DEFAULT_CHUNK_TOKENS, DEFAULT_CHUNK_CONCURRENCY, DEFAULT_MAX_FILE_SIZE
+from .streaming import discover, ordered_map, open_report, ResultSampler, default_report_path
 import os
 import json
 from pathlib import Path
-from typing import List, Dict, Any
-import fnmatch
+from typing import List, Dict, Any, Optional, Tuple
 
 def execute(context: Context) -> Context:
     """Traitement par lots de fichiers avec analyse Mistral."""
@@ -15,7 +20,15 @@ def execute(context: Context) -> Context:
     analysis_type = context.data.get("analysis_type", "general")
     recursive = context.data.get("recursive", True)
     apply_improvements = context.data.get("apply_improvements", False)
-    max_file_size = context.data.get("max_file_size", 100000)  # 100KB max par défaut
+    max_file_size = context.data.get("max_file_size", DEFAULT_MAX_FILE_SIZE)  # Au-delà, fichier ignoré
+    chunk_tokens = context.data.get("chunk_tokens", DEFAULT_CHUNK_TOKENS)  # Découpage des gros fichiers
+    max_concurrency = max(1, int(context.data.get("max_concurrency", 4)))  # Requêtes simultanées
+    use_cache = context.data.get("use_cache", True)
+    cache_ttl = context.data.get("cache_ttl", DEFAULT_RESPONSE_TTL)
+    incremental = context.data.get("incremental", False)  # Ne réanalyser que les fichiers modifiés
+    report_path = context.data.get("report_path") or default_report_path("analysis_report")
+    context.data["report_path"] = report_path  # Conservé pour une éventuelle reprise
+    use_checkpoint = context.data.get("checkpoint", True)  # Point de reprise dans config/checkpoints
     
     api_key = context.data.get("api_key")
     if not api_key:
@@ -27,83 +40,100 @@ def execute(context: Context) -> Context:
         return context
     
     try:
-        analyzer = FileAnalyzer(api_key)
-        results = []
+        # Une connexion réutilisable par requête simultanée (morceaux des gros fichiers compris)
+        configure_pool(pool_maxsize=max_concurrency * DEFAULT_CHUNK_CONCURRENCY)
+        analyzer = FileAnalyzer(api_key, cache=open_response_cache(use_cache, cache_ttl), chunk_tokens=chunk_tokens)
+        stats = new_batch_stats()
+        samples = ResultSampler(5)
+        errors = ResultSampler(10)  # Limiter les erreurs conservées
+        total_files_found = 0
         processed_files = 0
-        errors = []
+        files_reused = 0
+        files_resumed = 0
+        interrupted = False
         
-        # Trouver tous les fichiers correspondants aux patterns
-        files_to_process = []
+        # Point de reprise : nouveau traitement, ou reprise si run_id est fourni
+        checkpoint = open_checkpoint("analyze_batch", context.data) if use_checkpoint else None
         
-        if recursive:
-            for root, dirs, files in os.walk(directory):
-                # Ignorer les répertoires cachés et de build courants
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', 'build', 'dist', '__pycache__', 'target']]
-                
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if any(fnmatch.fnmatch(file, pattern) for pattern in patterns):
-                        if os.path.getsize(file_path) <= max_file_size:
-                            files_to_process.append(file_path)
-                        else:
-                            errors.append(f"Fichier ignoré (trop volumineux): {file_path}")
-        else:
-            for file in os.listdir(directory):
-                file_path = os.path.join(directory, file)
-                if os.path.isfile(file_path) and any(fnmatch.fnmatch(file, pattern) for pattern in patterns):
-                    if os.path.getsize(file_path) <= max_file_size:
-                        files_to_process.append(file_path)
-                    else:
-                        errors.append(f"Fichier ignoré (trop volumineux): {file_path}")
+        manifest = None
+        if incremental:
+            manifest = FileManifest(FileManifest.make_run_key(
+                "analyze_batch", os.path.abspath(directory), sorted(patterns), recursive, analysis_type
+            ))
         
-        # Traiter chaque fichier
-        for file_path in files_to_process:
+        # Découverte au fil de l'eau des fichiers correspondants aux patterns
+        files = discover(
+            directory, patterns, recursive, max_file_size,
+            on_skip=lambda found: errors.add(f"Fichier ignoré (trop volumineux): {found.path}")
+        )
+        
+        def handle(found):
+            # Fichier déjà terminé lors d'un passage interrompu de ce traitement
+            if checkpoint:
+                previous = checkpoint.lookup(found.path)
+                if previous is not None:
+                    return found.path, previous, None, "checkpoint"
+            # En mode incrémental, reprendre le résultat d'un fichier inchangé
+            if manifest:
+                previous = manifest.lookup(found.path, found.size, found.mtime)
+                if previous is not None:
+                    return found.path, previous, None, "manifest"
+            file_result, error = process_file(analyzer, found.path, analysis_type, apply_improvements, manifest)
+            return found.path, file_result, error, "api"
+        
+        # Traiter les fichiers en parallèle et écrire chaque résultat dès qu'il est prêt
+        # (l'ordre du rapport reste celui de la découverte)
+        # À la reprise, le rapport interrompu est complété (ses résultats ne sont pas réécrits)
+        report, written = open_report(report_path, resume=bool(checkpoint and checkpoint.resumed))
+        with report:
             try:
-                print(f"Traitement de: {file_path}")
-                
-                # Lire le contenu
-                content = analyzer.read_file_content(file_path)
-                if content.startswith("Erreur"):
-                    errors.append(f"{file_path}: {content}")
-                    continue
-                
-                # Analyser
-                analysis = analyzer.analyze_with_mistral(content, analysis_type)
-                suggestions = analyzer.generate_improvements(content, analysis)
-                
-                # Appliquer les améliorations si demandé
-                applied = False
-                if apply_improvements:
-                    applied = analyzer.apply_suggestions(file_path, content, suggestions)
-                
-                file_result = {
-                    "file_path": file_path,
-                    "file_size": len(content),
-                    "analysis": analysis,
-                    "suggestions": suggestions,
-                    "improvements_applied": applied
-                }
-                
-                results.append(file_result)
-                processed_files += 1
-                
-            except Exception as e:
-                errors.append(f"{file_path}: Erreur - {str(e)}")
+                for file_path, file_result, error, origin in ordered_map(handle, files, max_concurrency):
+                    total_files_found += 1
+                    if error:
+                        errors.add(error)
+                        report.write({"file_path": file_path, "error": error})
+                        continue
+                    
+                    processed_files += 1
+                    if origin == "manifest":
+                        files_reused += 1
+                    elif origin == "checkpoint":
+                        files_resumed += 1
+                    if checkpoint and origin != "checkpoint" and not api_failed(file_result):
+                        checkpoint.record(file_result)
+                    update_batch_stats(stats, file_result)
+                    samples.add(file_result)
+                    if origin != "checkpoint" or os.path.abspath(file_path) not in written:
+                        report.write(file_result)
+            except KeyboardInterrupt:
+                # Les fichiers terminés sont déjà dans le rapport et le point de reprise
+                interrupted = True
+        
+        if manifest:
+            manifest.save(prune=not interrupted)
+        if checkpoint:
+            checkpoint.finish("interrupted" if interrupted else "completed")
         
         # Générer un rapport de synthèse
-        summary = generate_batch_summary(results, analysis_type)
+        summary = format_batch_summary(stats, analysis_type)
         
         # Préparer la sortie finale
         output = {
             "summary": summary,
-            "total_files_found": len(files_to_process),
+            "total_files_found": total_files_found,
             "files_processed": processed_files,
-            "files_with_errors": len(errors),
+            "files_reused": files_reused,
+            "files_resumed": files_resumed,
+            "files_with_errors": errors.count,
             "analysis_type": analysis_type,
+            "max_concurrency": max_concurrency,
             "directory": directory,
             "patterns": patterns,
-            "errors": errors[:10],  # Limiter les erreurs affichées
-            "detailed_results": results[:5] if len(results) <= 5 else results[:5] + [{"note": f"... et {len(results)-5} autres fichiers"}]
+            "report_file": report_path,
+            "run_id": checkpoint.run_id if checkpoint else None,
+            "interrupted": interrupted,
+            "errors": errors.samples,
+            "detailed_results": samples.detailed_results()
         }
         
         context.data["output"] = json.dumps(output, indent=2, ensure_ascii=False)
@@ -113,31 +143,83 @@ def execute(context: Context) -> Context:
     
     return context
 
+def process_file(analyzer: FileAnalyzer, file_path: str, analysis_type: str,
+                 apply_improvements: bool,
+                 manifest: Optional[FileManifest] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Analyse un fichier et renvoie (résultat, erreur) ; un seul des deux est renseigné."""
+    try:
+        print(f"Traitement de: {file_path}")
+        
+        # Lire le contenu
+        content = analyzer.read_file_content(file_path)
+        if content.startswith("Erreur"):
+            return None, f"{file_path}: {content}"
+        
+        # Analyser (par morceaux si le fichier est gros) et appliquer les améliorations si demandé
+        analyzed = analyzer.analyze_file(file_path, content, analysis_type, apply_improvements=apply_improvements)
+        
+        file_result = {
+            "file_path": file_path,
+            "file_size": len(content),
+            "analysis": analyzed["analysis"],
+            "suggestions": analyzed["suggestions"],
+            "improvements_applied": analyzed["improvements_applied"],
+            "chunks": analyzed["chunks"]
+        }
+        # Ne pas mémoriser une analyse en échec, pour la retenter au prochain passage
+        if manifest and not api_failed(file_result):
+            manifest.record(file_path, file_result)
+        return file_result, None
+        
+    except Exception as e:
+        return None, f"{file_path}: Erreur - {str(e)}"
+
+def api_failed(result: Dict[str, Any]) -> bool:
+    """Vrai si l'analyse ou les suggestions sont un message d'erreur de l'API."""
+    return (result.get("analysis", "").startswith("Erreur lors de")
+            or result.get("suggestions", "").startswith("Erreur lors de"))
+
+def new_batch_stats() -> Dict[str, Any]:
+    """Statistiques agrégées au fil du traitement (sans conserver les résultats)."""
+    return {"total_files": 0, "files_with_improvements": 0, "common_issues": {}}
+
+def update_batch_stats(stats: Dict[str, Any], result: Dict[str, Any]):
+    """Ajoute un résultat aux statistiques du lot."""
+    stats["total_files"] += 1
+    if result.get("improvements_applied", False):
+        stats["files_with_improvements"] += 1
+    
+    # Compter les types de problèmes les plus fréquents (analyse basique)
+    common_issues = stats["common_issues"]
+    analysis = result.get("analysis", "").lower()
+    # Rechercher des mots-clés de problèmes courants
+    if "security" in analysis or "sécurité" in analysis:
+        common_issues["Sécurité"] = common_issues.get("Sécurité", 0) + 1
+    if "performance" in analysis:
+        common_issues["Performance"] = common_issues.get("Performance", 0) + 1
+    if "bug" in analysis or "erreur" in analysis:
+        common_issues["Bugs potentiels"] = common_issues.get("Bugs potentiels", 0) + 1
+    if "documentation" in analysis:
+        common_issues["Documentation"] = common_issues.get("Documentation", 0) + 1
+    if "style" in analysis or "convention" in analysis:
+        common_issues["Style/Conventions"] = common_issues.get("Style/Conventions", 0) + 1
+
 def generate_batch_summary(results: List[Dict[str, Any]], analysis_type: str) -> str:
     """Génère un résumé des résultats de l'analyse par lots."""
+    stats = new_batch_stats()
+    for result in results:
+        update_batch_stats(stats, result)
+    return format_batch_summary(stats, analysis_type)
+
+def format_batch_summary(stats: Dict[str, Any], analysis_type: str) -> str:
+    """Met en forme le résumé à partir des statistiques agrégées."""
     
-    if not results:
+    total_files = stats["total_files"]
+    if not total_files:
         return "Aucun fichier traité avec succès."
     
-    total_files = len(results)
-    files_with_improvements = sum(1 for r in results if r.get("improvements_applied", False))
-    
-    # Compter les types de problèmes les plus fréquents (analyse basique)
-    common_issues = {}
-    
-    for result in results:
-        analysis = result.get("analysis", "").lower()
-        # Rechercher des mots-clés de problèmes courants
-        if "security" in analysis or "sécurité" in analysis:
-            common_issues["Sécurité"] = common_issues.get("Sécurité", 0) + 1
-        if "performance" in analysis:
-            common_issues["Performance"] = common_issues.get("Performance", 0) + 1
-        if "bug" in analysis or "erreur" in analysis:
-            common_issues["Bugs potentiels"] = common_issues.get("Bugs potentiels", 0) + 1
-        if "documentation" in analysis:
-            common_issues["Documentation"] = common_issues.get("Documentation", 0) + 1
-        if "style" in analysis or "convention" in analysis:
-            common_issues["Style/Conventions"] = common_issues.get("Style/Conventions", 0) + 1
+    files_with_improvements = stats["files_with_improvements"]
+    common_issues = stats["common_issues"]
     
     summary = f"""
 === RÉSUMÉ DE L'ANALYSE PAR LOTS ===
@@ -0,0 +1,208 @@
+import os
+import json
+import secrets
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+CHECKPOINT_DIR = "config/checkpoints"
+
+# Paramètres jamais écrits dans un point de reprise
+PRIVATE_PARAMS = ("api_key", "output", "run_id")
+# Contenus de fichier non conservés : ils sont sur disque, seul le résultat est repris
+HEAVY_FIELDS = ("original_content", "improved_content")
+KEEP_COMPLETED_RUNS = 20  # Traitements terminés gardés pour l'historique (métadonnées seules)
+
+def new_run_id(tool: str) -> str:
+    """Identifiant de traitement lisible : outil, date et suffixe aléatoire."""
+    return f"{tool}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(2)}"
+
+class RunCheckpoint:
+    """Point de reprise d'un traitement sur dossier.
+
+    Deux fichiers par traitement dans config/checkpoints/ :
+    • <run_id>.json  : outil, paramètres et statut (running, interrupted, completed) ;
+    • <run_id>.jsonl : un résultat réussi par ligne, ajouté dès que le fichier est terminé.
+
+    À la reprise, seuls les décalages des lignes sont gardés en mémoire ; un résultat
+    n'est relu que lorsque son fichier est rencontré. Les fichiers en erreur ne sont
+    pas enregistrés et sont donc retentés. Un résultat est enregistré sans le contenu
+    des fichiers (HEAVY_FIELDS) ; le .jsonl d'un traitement terminé est supprimé et
+    seules les métadonnées des KEEP_COMPLETED_RUNS derniers traitements terminés restent.
+    """
+
+    def __init__(self, run_id: str, directory: str = CHECKPOINT_DIR):
+        self.run_id = run_id
+        self.meta_path = os.path.join(directory, f"{run_id}.json")
+        self.results_path = os.path.join(directory, f"{run_id}.jsonl")
+        self.meta: Dict[str, Any] = {}
+        self.resumed = False  # Vrai pour un traitement rechargé (reprise)
+        self._offsets: Dict[str, int] = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def start(cls, tool: str, params: Dict[str, Any], directory: str = CHECKPOINT_DIR) -> "RunCheckpoint":
+        """Crée le point de reprise d'un nouveau traitement."""
+        checkpoint = cls(new_run_id(tool), directory)
+        now = datetime.now().isoformat()
+        checkpoint.meta = {
+            "run_id": checkpoint.run_id,
+            "tool": tool,
+            "params": {k: v for k, v in params.items() if k not in PRIVATE_PARAMS},
+            "status": "running",
+            "created_at": now,
+            "updated_at": now,
+            "completed": 0
+        }
+        checkpoint.save_meta()
+        return checkpoint
+
+    @classmethod
+    def open(cls, run_id: str, directory: str = CHECKPOINT_DIR) -> Optional["RunCheckpoint"]:
+        """Recharge un point de reprise existant, ou None s'il est introuvable."""
+        checkpoint = cls(run_id, directory)
+        try:
+            with open(checkpoint.meta_path, "r", encoding="utf-8") as f:
+                checkpoint.meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        checkpoint.resumed = True
+        checkpoint._index_results()
+        return checkpoint
+
+    def _index_results(self):
+        """Indexe les résultats enregistrés ; une dernière ligne tronquée est supprimée."""
+        valid_end = 0
+        try:
+            with open(self.results_path, "rb") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    self._offsets[os.path.abspath(record["file_path"])] = offset
+                    offset += len(line)
+                    valid_end = offset
+            if valid_end < os.path.getsize(self.results_path):
+                with open(self.results_path, "r+b") as f:
+                    f.truncate(valid_end)
+        except (OSError, KeyError, TypeError):
+            pass
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.meta.get("params", {})
+
+    @property
+    def completed(self) -> int:
+        return len(self._offsets)
+
+    def lookup(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Retourne le résultat enregistré pour ce fichier, ou None s'il reste à traiter."""
+        with self._lock:
+            offset = self._offsets.get(os.path.abspath(file_path))
+        if offset is None:
+            return None
+        try:
+            with open(self.results_path, "rb") as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+    def record(self, result: Dict[str, Any]):
+        """Ajoute le résultat d'un fichier terminé (écrit immédiatement sur disque)."""
+        slim = {k: v for k, v in result.items() if k not in HEAVY_FIELDS}
+        line = (json.dumps(slim, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.results_path) or ".", exist_ok=True)
+                self._file = open(self.results_path, "ab")
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._offsets[os.path.abspath(result["file_path"])] = offset
+
+    def set_param(self, key: str, value: Any):
+        """Mémorise un paramètre calculé en cours de route (ex: prompt interprété)."""
+        self.meta.setdefault("params", {})[key] = value
+        self.save_meta()
+
+    def finish(self, status: str = "completed"):
+        """Ferme le point de reprise en indiquant comment le traitement s'est terminé."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.meta["status"] = status
+        self.save_meta()
+        if status == "completed":
+            # Plus rien à reprendre : les résultats sont déjà dans le rapport
+            try:
+                os.remove(self.results_path)
+            except OSError:
+                pass
+            prune_checkpoints(os.path.dirname(self.meta_path) or ".")
+
+    def save_meta(self):
+        """Écrit les métadonnées de façon atomique."""
+        self.meta["updated_at"] = datetime.now().isoformat()
+        self.meta["completed"] = self.completed
+        directory = os.path.dirname(self.meta_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+def open_checkpoint(tool: str, params: Dict[str, Any]) -> RunCheckpoint:
+    """Reprend le traitement `params["run_id"]` s'il est fourni, sinon en démarre un nouveau.
+
+    Lève ValueError si le point de reprise demandé est introuvable ou concerne un autre outil.
+    """
+    run_id = params.get("run_id")
+    if not run_id:
+        return RunCheckpoint.start(tool, params)
+    checkpoint = RunCheckpoint.open(run_id)
+    if checkpoint is None:
+        raise ValueError(f"Point de reprise introuvable: {run_id}")
+    if checkpoint.meta.get("tool") != tool:
+        raise ValueError(f"Le traitement {run_id} concerne l'outil {checkpoint.meta.get('tool')}")
+    checkpoint.meta["status"] = "running"
+    checkpoint.save_meta()
+    return checkpoint
+
+def list_checkpoints(directory: str = CHECKPOINT_DIR, include_completed: bool = False) -> List[Dict[str, Any]]:
+    """Liste les traitements enregistrés, du plus récent au plus ancien."""
+    runs = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return runs
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if include_completed or meta.get("status") != "completed":
+            runs.append(meta)
+    runs.sort(key=lambda m: m.get("updated_at", ""), reverse=True)
+    return runs
+
+def prune_checkpoints(directory: str = CHECKPOINT_DIR, keep: int = KEEP_COMPLETED_RUNS) -> int:
+    """Supprime les traitements terminés au-delà des `keep` plus récents ; retourne leur nombre."""
+    completed = [meta for meta in list_checkpoints(directory, include_completed=True)
+                 if meta.get("status") == "completed" and meta.get("run_id")]
+    for meta in completed[keep:]:
+        for suffix in (".json", ".jsonl"):
+            try:
+                os.remove(os.path.join(directory, f"{meta['run_id']}{suffix}"))
+            except OSError:
+                pass
+    return len(completed[keep:])
@@ -0,0 +1,220 @@
+# Découpage des fichiers volumineux en morceaux traités séparément par l'API.
+# Les coupures se font aux frontières syntaxiques (fonctions, classes, blocs) afin
+# que chaque morceau reste lisible seul et que sa réécriture tienne dans max_tokens.
+#
+# Avec DEFAULT_CHUNK_TOKENS = 3000 (≈ 4 caractères par token), un fichier est découpé
+# dès ~12 Ko : les fichiers de 12 à 100 Ko, autrefois envoyés en une seule requête,
+# le sont maintenant en plusieurs. Seuls les fichiers plus petits envoient les mêmes
+# requêtes qu'avant ; un `chunk_tokens` plus élevé repousse le seuil.
+
+import ast
+import os
+import re
+from bisect import bisect_right
+from typing import Dict, List, NamedTuple, Optional
+
+CHARS_PER_TOKEN = 4            # Approximation courante pour du code source
+DEFAULT_CHUNK_TOKENS = 3000    # La réécriture d'un morceau doit tenir dans max_tokens=4000
+DEFAULT_CHUNK_CONCURRENCY = 4  # Morceaux d'un même fichier envoyés simultanément
+DEFAULT_MAX_FILE_SIZE = 1000000  # Les gros fichiers sont découpés plutôt qu'ignorés
+
+# Langages à accolades : découpage selon la profondeur des blocs
+BRACE_EXTENSIONS = frozenset([
+    '.js', '.jsx', '.ts', '.tsx', '.java', '.go', '.php', '.rs', '.c', '.h',
+    '.cpp', '.hpp', '.cc', '.cs', '.kt', '.swift', '.scala', '.dart'
+])
+
+COMMENT_PREFIXES = ("#", "//", "/*", "*", "*/")
+
+# Débuts de ligne qui prolongent l'instruction précédente : jamais de coupure devant
+CONTINUATION_PREFIXES = ("}", ")", "]", ".", "&&", "||", "?", ":", "else", "elif", "elsif",
+                         "except", "catch", "finally", "rescue", "ensure", "when", "end")
+
+_STRINGS_AND_LINE_COMMENTS = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`[^`]*`|//.*')
+
+class Chunk(NamedTuple):
+    """Morceau de fichier : index, lignes de début et de fin (incluses, à partir de 1), texte."""
+    index: int
+    start_line: int
+    end_line: int
+    text: str
+
+def estimate_tokens(text: str) -> int:
+    """Estimation grossière du nombre de tokens d'un texte."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def chunk_label(chunk: Chunk, total: int) -> str:
+    return f"Partie {chunk.index + 1}/{total} (lignes {chunk.start_line}-{chunk.end_line})"
+
+def split_source(content: str, file_path: str = "", max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[Chunk]:
+    """Découpe un fichier source en morceaux d'au plus `max_tokens` tokens (estimés).
+
+    Python est découpé selon son arbre syntaxique (ast) ; les langages à accolades
+    selon la profondeur des blocs ; les autres selon l'indentation. Un fichier assez
+    petit est renvoyé en un seul morceau.
+    """
+    lines = content.splitlines(keepends=True)
+    if estimate_tokens(content) <= max_tokens or len(lines) <= 1:
+        return [Chunk(0, 1, max(len(lines), 1), content)]
+
+    extension = os.path.splitext(file_path)[1].lower()
+    boundaries = python_boundaries(content) if extension in ('.py', '.pyw') else None
+    if boundaries is None:
+        if extension in BRACE_EXTENSIONS:
+            boundaries = brace_boundaries(lines)
+        else:
+            boundaries = indent_boundaries(lines)
+    return pack_lines(lines, boundaries, max_tokens * CHARS_PER_TOKEN)
+
+def _attach_comments(lines: List[str], start: int) -> int:
+    """Remonte la coupure au-dessus des commentaires qui précèdent la ligne."""
+    while start > 0 and lines[start - 1].strip().startswith(COMMENT_PREFIXES):
+        start -= 1
+    return start
+
+def _add_boundary(boundaries: Dict[int, int], line: int, level: int):
+    if line not in boundaries or level < boundaries[line]:
+        boundaries[line] = level
+
+def python_boundaries(content: str) -> Optional[Dict[int, int]]:
+    """Coupures possibles d'un fichier Python : début de chaque instruction, par niveau d'imbrication.
+
+    Retourne None si le fichier n'est pas analysable (erreur de syntaxe).
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    lines = content.splitlines()
+    boundaries: Dict[int, int] = {}
+
+    def visit(body: List[ast.stmt], level: int):
+        for node in body:
+            start = node.lineno - 1
+            decorators = getattr(node, "decorator_list", None)
+            if decorators:
+                start = min(start, min(d.lineno for d in decorators) - 1)
+            _add_boundary(boundaries, _attach_comments(lines, start), level)
+            inner = getattr(node, "body", None)
+            if isinstance(inner, list):
+                visit(inner, level + 1)
+
+    visit(tree.body, 0)
+    return boundaries
+
+def brace_boundaries(lines: List[str]) -> Dict[int, int]:
+    """Coupures possibles d'un langage à accolades : après `}`, `;`, `{` ou une ligne vide.
+
+    Le niveau est la profondeur d'accolades au début de la ligne ; chaînes et
+    commentaires sont ignorés pour le comptage.
+    """
+    boundaries: Dict[int, int] = {}
+    depth = 0
+    in_block_comment = False
+    previous = ""  # Dernière ligne non vide (nettoyée)
+    blank_before = True
+
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped:
+            blank_before = True
+            continue
+
+        if (not in_block_comment and (blank_before or previous.endswith(("}", ";", "{")))
+                and not stripped.startswith(CONTINUATION_PREFIXES)):
+            _add_boundary(boundaries, _attach_comments(lines, i), max(depth, 0))
+
+        code = stripped
+        if in_block_comment:
+            if "*/" not in code:
+                continue
+            code = code.split("*/", 1)[1]
+            in_block_comment = False
+        code = _STRINGS_AND_LINE_COMMENTS.sub("", code)
+        code = re.sub(r"/\*.*?\*/", "", code)
+        if "/*" in code:
+            code = code.split("/*", 1)[0]
+            in_block_comment = True
+        depth += code.count("{") - code.count("}")
+        if code.strip():
+            previous = code.strip()
+        blank_before = False
+
+    return boundaries
+
+def indent_boundaries(lines: List[str]) -> Dict[int, int]:
+    """Coupures possibles selon l'indentation : lignes qui ne sont pas plus indentées que la précédente."""
+    boundaries: Dict[int, int] = {}
+    previous_indent = None
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        indent = len(line.expandtabs(4)) - len(line.expandtabs(4).lstrip())
+        if (previous_indent is None or indent <= previous_indent) and not stripped.startswith(CONTINUATION_PREFIXES):
+            _add_boundary(boundaries, _attach_comments(lines, i), indent)
+        previous_indent = indent
+    return boundaries
+
+def pack_lines(lines: List[str], boundaries: Dict[int, int], max_chars: int) -> List[Chunk]:
+    """Regroupe les lignes en morceaux d'au plus `max_chars` caractères.
+
+    Chaque coupure se fait de préférence à la frontière la moins imbriquée qui
+    laisse un morceau d'au moins la moitié de la taille visée ; à défaut à la
+    frontière la plus lointaine, et en dernier recours entre deux lignes.
+    """
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    candidates = sorted(b for b in boundaries if 0 < b < len(lines))
+
+    chunks: List[Chunk] = []
+    start = 0
+    while start < len(lines):
+        # Dernière ligne de fin possible sans dépasser la taille visée
+        limit = bisect_right(offsets, offsets[start] + max_chars) - 1
+        if limit >= len(lines):
+            end = len(lines)
+        else:
+            window = candidates[bisect_right(candidates, start):bisect_right(candidates, limit)]
+            end = _choose_cut(window, boundaries, offsets, start, max_chars)
+            if end is None:
+                end = max(limit, start + 1)
+        chunks.append(Chunk(len(chunks), start + 1, end, "".join(lines[start:end])))
+        start = end
+    return chunks
+
+def _choose_cut(window: List[int], boundaries: Dict[int, int], offsets: List[int],
+                start: int, max_chars: int) -> Optional[int]:
+    if not window:
+        return None
+    for level in sorted({boundaries[c] for c in window}):
+        farthest = max(c for c in window if boundaries[c] <= level)
+        if offsets[farthest] - offsets[start] >= max_chars // 2:
+            return farthest
+    return window[-1]
+
+def clean_chunk_code(code: str) -> str:
+    """Retire les balises markdown d'une réponse sans toucher à l'indentation du code."""
+    lines = code.strip("\r\n").split("\n")
+    if lines and lines[0].strip().startswith("```"):
+        lines = lines[1:]
+        if lines and lines[-1].strip() == "```":
+            lines = lines[:-1]
+    return "\n".join(lines).strip("\r\n").rstrip()
+
+def stitch_code(parts: List[str], chunks: List[Chunk]) -> str:
+    """Recolle les morceaux réécrits en rétablissant les lignes vides d'origine entre eux."""
+    code = []
+    for part, chunk in zip(parts, chunks):
+        text = chunk.text
+        leading = text[:len(text) - len(text.lstrip("\r\n"))]
+        trailing = text[len(text.rstrip()):]
+        code.append(leading + part + trailing)
+    return "".join(code)
+
+def stitch_text(chunks: List[Chunk], texts: List[str]) -> str:
+    """Assemble les réponses textuelles (analyses, suggestions) obtenues pour chaque morceau."""
+    return "\n\n".join(f"### {chunk_label(chunk, len(chunks))}\n\n{text.strip()}"
+                       for chunk, text in zip(chunks, texts))
@@ -1,8 +1,14 @@
-from mistral_cli.cli import Context
-import requests
+from mistral_cli.context import Context
+from mistral_cli.http_client import MISTRAL_API_URL
+from mistral_cli.disk_cache import DiskCache
+from .response_cache import cached_chat_completion, open_response_cache, DEFAULT_RESPONSE_TTL
+from .manifest import FileManifest
+from .checkpoint import RunCheckpoint, open_checkpoint
+from .streaming import discover, ordered_map, open_report, ResultSampler, default_report_path
+from .chunking import (split_source, clean_chunk_code, stitch_code, chunk_label,
+                       DEFAULT_CHUNK_TOKENS, DEFAULT_CHUNK_CONCURRENCY, DEFAULT_MAX_FILE_SIZE)
 import os
 import json
-import fnmatch
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
@@ -10,9 +16,14 @@ from datetime import datetime
 class FolderCommandExecutor:
     """Exécuteur de commandes personnalisées sur dossiers et sous-dossiers."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[DiskCache] = None,
+                 chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+                 chunk_concurrency: int = DEFAULT_CHUNK_CONCURRENCY):
         self.api_key = api_key
-        self.base_url = "https://api.mistral.ai/v1"
+        self.cache = cache  # Cache des réponses (None = désactivé)
+        self.chunk_tokens = chunk_tokens  # Taille max d'un morceau envoyé à l'API
+        self.chunk_concurrency = chunk_concurrency
+        self.base_url = MISTRAL_API_URL
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
@@ -92,59 +103,30 @@ class FolderCommandExecutor:
         file_extension = Path(file_path).suffix.lower()
         language_info = self._detect_language(file_extension)
         
-        # Construire le prompt complet
-        full_prompt = f"""
-{prompt}
-
-Fichier: {file_path}
-Langage: {language_info}
-
-Code original:
-{content}
-
-Instructions:
-- Respecte la syntaxe et les conventions du {language_info}
-- Préserve la fonctionnalité existante
-- Améliore uniquement ce qui est nécessaire
-- Fournis uniquement le code final, sans explication ni formatage markdown
-"""
-        
         try:
-            # Appeler l'API Mistral
-            data = {
-                "model": "mistral-large-latest",
-                "messages": [
-                    {
-                        "role": "system", 
-                        "content": "Tu es un développeur expert qui améliore le code avec précision. Réponds uniquement avec le code modifié final."
-                    },
-                    {"role": "user", "content": full_prompt}
-                ],
-                "max_tokens": 4000,
-                "temperature": 0.1
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=data,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            improved_code = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+            chunks = split_source(content, file_path, self.chunk_tokens)
+            if len(chunks) == 1:
+                improved_code = self._request_improved_code(prompt, file_path, language_info, content)
+                if improved_code:
+                    # Nettoyer le code (enlever les balises markdown si présentes)
+                    improved_code = self._clean_code_response(improved_code)
+            else:
+                # Gros fichier : morceaux réécrits en parallèle puis recollés dans l'ordre
+                def rewrite(chunk):
+                    code = self._request_improved_code(prompt, file_path, language_info, chunk.text,
+                                                       chunk_label(chunk, len(chunks)))
+                    return clean_chunk_code(code) if code else ""
+                parts = list(ordered_map(rewrite, chunks, self.chunk_concurrency))
+                improved_code = stitch_code(parts, chunks) if all(parts) else ""
             
             if improved_code:
-                # Nettoyer le code (enlever les balises markdown si présentes)
-                improved_code = self._clean_code_response(improved_code)
-                
                 return {
                     "success": True,
                     "original_content": content,
                     "improved_content": improved_code,
                     "file_path": file_path,
                     "command": command,
+                    "chunks": len(chunks),
                     "changes_detected": content.strip() != improved_code.strip()
                 }
             else:
@@ -161,13 +143,63 @@ Instructions:
                 "file_path": file_path
             }
     
+    def _request_improved_code(self, prompt: str, file_path: str, language_info: str,
+                               code: str, part: str = None) -> str:
+        """Demande la version modifiée d'un fichier, ou d'un morceau (`part`) d'un gros fichier."""
+        
+        # Construire le prompt complet
+        extract = f"Extrait: {part} - le reste du fichier est traité séparément\n" if part else ""
+        full_prompt = f"""
+{prompt}
+
+Fichier: {file_path}
+Langage: {language_info}
+{extract}
+Code original:
+{code}
+
+Instructions:
+- Respecte la syntaxe et les conventions du {language_info}
+- Préserve la fonctionnalité existante
+- Améliore uniquement ce qui est nécessaire
+- Fournis uniquement le code final, sans explication ni formatage markdown
+"""
+        if part:
+            full_prompt += "- Renvoie uniquement cet extrait modifié, en conservant son indentation d'origine\n"
+        
+        # Appeler l'API Mistral
+        data = {
+            "model": "mistral-large-latest",
+            "messages": [
+                {
+                    "role": "system", 
+                    "content": "Tu es un développeur expert qui améliore le code avec précision. Réponds uniquement avec le code modifié final."
+                },
+                {"role": "user", "content": full_prompt}
+            ],
+            "max_tokens": 4000,
+            "temperature": 0.1
+        }
+        
+        return cached_chat_completion(self.cache, self.base_url, self.headers, data)
+    
     def execute_command_on_folder(self, folder_path: str, command: str, 
                                  patterns: List[str] = None, 
                                  recursive: bool = True,
                                  custom_prompt: str = None,
                                  apply_changes: bool = False,
-                                 max_file_size: int = 100000) -> Dict[str, Any]:
-        """Exécute une commande sur tous les fichiers d'un dossier."""
+                                 max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+                                 incremental: bool = False,
+                                 max_concurrency: int = 4,
+                                 report_path: str = None,
+                                 checkpoint: Optional[RunCheckpoint] = None) -> Dict[str, Any]:
+        """Exécute une commande sur tous les fichiers d'un dossier.
+        
+        Les fichiers sont traités au fil de leur découverte et chaque résultat est
+        écrit immédiatement dans un rapport JSONL ; seul un aperçu est conservé en mémoire.
+        Avec un point de reprise, les fichiers déjà terminés sont repris sans nouvel appel
+        à l'API et une interruption (Ctrl+C) renvoie le résultat partiel.
+        """
         
         if not os.path.exists(folder_path):
             return {"success": False, "error": f"Dossier inexistant: {folder_path}"}
@@ -175,78 +207,87 @@ Instructions:
         if patterns is None:
             patterns = ["*.py", "*.js", "*.ts", "*.java", "*.go", "*.php", "*.rb", "*.rs", "*.cpp", "*.c", "*.cs"]
         
-        results = []
-        errors = []
+        report_path = report_path or default_report_path("command_execution_report")
+        samples = ResultSampler(5)
+        errors = ResultSampler(10)  # Limiter les erreurs conservées
+        total_files_found = 0
         files_processed = 0
         files_changed = 0
         files_skipped = 0
+        files_reused = 0
+        files_resumed = 0
+        interrupted = False
         
-        # Trouver tous les fichiers
-        files_to_process = []
+        # Manifeste des fichiers déjà traités (mode incrémental)
+        manifest = None
+        if incremental:
+            manifest = FileManifest(FileManifest.make_run_key(
+                "execute_command", os.path.abspath(folder_path), command, custom_prompt, sorted(patterns), recursive
+            ))
         
-        if recursive:
-            for root, dirs, files in os.walk(folder_path):
-                # Ignorer les répertoires cachés et de build
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in [
-                    'node_modules', 'build', 'dist', '__pycache__', 'target', 
-                    '.git', '.vscode', '.idea', 'venv', 'env'
-                ]]
-                
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if any(fnmatch.fnmatch(file, pattern) for pattern in patterns):
-                        if os.path.getsize(file_path) <= max_file_size:
-                            files_to_process.append(file_path)
-                        else:
-                            files_skipped += 1
-        else:
-            for file in os.listdir(folder_path):
-                file_path = os.path.join(folder_path, file)
-                if os.path.isfile(file_path) and any(fnmatch.fnmatch(file, pattern) for pattern in patterns):
-                    if os.path.getsize(file_path) <= max_file_size:
-                        files_to_process.append(file_path)
-                    else:
-                        files_skipped += 1
+        # Découverte des fichiers (les fichiers trop volumineux sont ignorés)
+        skipped = []
+        files = discover(folder_path, patterns, recursive, max_file_size, on_skip=skipped.append)
         
-        # Traiter chaque fichier
-        for file_path in files_to_process:
-            print(f"Traitement de: {file_path}")
-            
-            result = self.execute_command_on_file(file_path, command, custom_prompt)
-            
-            if result["success"]:
-                files_processed += 1
-                
-                if result.get("changes_detected", False):
-                    files_changed += 1
+        def handle(found):
+            if checkpoint:
+                previous = checkpoint.lookup(found.path)
+                if previous is not None:
+                    # Fichier déjà terminé lors d'un passage interrompu de ce traitement
+                    return previous, "checkpoint"
+            if manifest:
+                previous = manifest.lookup(found.path, found.size, found.mtime)
+                if previous is not None:
+                    # Fichier inchangé depuis le dernier passage : réutiliser le résultat
+                    return previous, "manifest"
+            print(f"Traitement de: {found.path}")
+            result = self.execute_command_on_file(found.path, command, custom_prompt)
+            if result["success"] and apply_changes:
+                self._apply_changes(result)
+            if manifest and result["success"] and "apply_error" not in result:
+                manifest.record(found.path, result)
+            return result, "api"
+        
+        # Traiter les fichiers et émettre chaque résultat dans le rapport
+        # À la reprise, le rapport interrompu est complété (ses résultats ne sont pas réécrits)
+        report, written = open_report(report_path, resume=bool(checkpoint and checkpoint.resumed))
+        with report:
+            try:
+                for result, origin in ordered_map(handle, files, max_concurrency):
+                    total_files_found += 1
+                    if origin != "checkpoint" or os.path.abspath(result["file_path"]) not in written:
+                        report.write(result)
                     
-                    # Appliquer les changements si demandé
-                    if apply_changes:
-                        try:
-                            # Créer un backup
-                            backup_path = f"{file_path}.backup"
-                            with open(backup_path, 'w', encoding='utf-8') as f:
-                                f.write(result["original_content"])
-                            
-                            # Écrire le nouveau contenu
-                            with open(file_path, 'w', encoding='utf-8') as f:
-                                f.write(result["improved_content"])
-                                
-                            result["backup_created"] = backup_path
-                            result["changes_applied"] = True
-                            
-                        except Exception as e:
-                            result["apply_error"] = str(e)
-                            errors.append(f"{file_path}: Erreur d'application - {str(e)}")
-                
-                results.append(result)
-            else:
-                errors.append(f"{file_path}: {result['error']}")
+                    if not result["success"]:
+                        errors.add(f"{result['file_path']}: {result['error']}")
+                        continue
+                    
+                    files_processed += 1
+                    if origin == "manifest":
+                        files_reused += 1
+                    elif origin == "checkpoint":
+                        files_resumed += 1
+                    elif result.get("changes_detected", False):
+                        files_changed += 1
+                    if "apply_error" in result:
+                        errors.add(f"{result['file_path']}: Erreur d'application - {result['apply_error']}")
+                    elif checkpoint and origin != "checkpoint":
+                        checkpoint.record(result)
+                    samples.add(result)
+            except KeyboardInterrupt:
+                # Les fichiers terminés sont déjà dans le rapport et le point de reprise
+                interrupted = True
+        files_skipped = len(skipped)
+        
+        if manifest:
+            manifest.save(prune=not interrupted)
+        if checkpoint:
+            checkpoint.finish("interrupted" if interrupted else "completed")
         
         # Générer un rapport de synthèse
         summary = self._generate_execution_summary(
-            command, folder_path, len(files_to_process), files_processed, 
-            files_changed, files_skipped, errors
+            command, folder_path, total_files_found, files_processed, 
+            files_changed, files_skipped, errors.samples, errors.count
         )
         
         return {
@@ -254,18 +295,42 @@ Instructions:
             "summary": summary,
             "command": command,
             "folder_path": folder_path,
-            "total_files_found": len(files_to_process),
+            "total_files_found": total_files_found,
             "files_processed": files_processed,
             "files_changed": files_changed,
             "files_skipped": files_skipped,
-            "errors_count": len(errors),
-            "errors": errors[:10],  # Limiter les erreurs affichées
-            "detailed_results": results[:5] if len(results) <= 5 else results[:5] + [
-                {"note": f"... et {len(results)-5} autres fichiers traités"}
-            ],
+            "files_reused": files_reused,
+            "files_resumed": files_resumed,
+            "errors_count": errors.count,
+            "errors": errors.samples,
+            "report_file": report_path,
+            "run_id": checkpoint.run_id if checkpoint else None,
+            "interrupted": interrupted,
+            "detailed_results": samples.detailed_results("autres fichiers traités"),
             "apply_changes": apply_changes
         }
     
+    def _apply_changes(self, result: Dict[str, Any]):
+        """Écrit le code modifié sur disque (avec backup) si des changements sont détectés."""
+        if not result.get("changes_detected", False):
+            return
+        file_path = result["file_path"]
+        try:
+            # Créer un backup
+            backup_path = f"{file_path}.backup"
+            with open(backup_path, 'w', encoding='utf-8') as f:
+                f.write(result["original_content"])
+            
+            # Écrire le nouveau contenu
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(result["improved_content"])
+                
+            result["backup_created"] = backup_path
+            result["changes_applied"] = True
+            
+        except Exception as e:
+            result["apply_error"] = str(e)
+    
     def _detect_language(self, file_extension: str) -> str:
         """Détecte le langage basé sur l'extension de fichier."""
         language_map = {
@@ -300,7 +365,7 @@ Instructions:
     
     def _generate_execution_summary(self, command: str, folder_path: str, 
                                   total_files: int, processed: int, changed: int, 
-                                  skipped: int, errors: List[str]) -> str:
+                                  skipped: int, errors: List[str], errors_count: int = None) -> str:
         """Génère un résumé de l'exécution."""
         
         command_name = self.predefined_commands.get(command, {}).get("description", command)
@@ -316,7 +381,7 @@ Instructions:
 • Fichiers traités: {processed}
 • Fichiers modifiés: {changed}
 • Fichiers ignorés: {skipped} (trop volumineux)
-• Erreurs: {len(errors)}
+• Erreurs: {errors_count if errors_count is not None else len(errors)}
 
 📈 Taux de réussite: {(processed/total_files*100):.1f}% si {total_files > 0} sinon 0.0%
 🔄 Taux de modification: {(changed/processed*100):.1f}% si {processed > 0} sinon 0.0%
@@ -341,7 +406,15 @@ def execute(context: Context) -> Context:
     recursive = context.data.get("recursive", True)
     custom_prompt = context.data.get("custom_prompt", None)
     apply_changes = context.data.get("apply_changes", False)
-    max_file_size = context.data.get("max_file_size", 100000)
+    max_file_size = context.data.get("max_file_size", DEFAULT_MAX_FILE_SIZE)
+    chunk_tokens = context.data.get("chunk_tokens", DEFAULT_CHUNK_TOKENS)
+    use_cache = context.data.get("use_cache", True)
+    cache_ttl = context.data.get("cache_ttl", DEFAULT_RESPONSE_TTL)
+    incremental = context.data.get("incremental", False)
+    max_concurrency = context.data.get("max_concurrency", 4)
+    report_path = context.data.get("report_path") or default_report_path("command_execution_report")
+    context.data["report_path"] = report_path  # Conservé pour une éventuelle reprise
+    use_checkpoint = context.data.get("checkpoint", True)
     
     api_key = context.data.get("api_key")
     if not api_key:
@@ -353,7 +426,10 @@ def execute(context: Context) -> Context:
         return context
     
     try:
-        executor = FolderCommandExecutor(api_key)
+        executor = FolderCommandExecutor(api_key, cache=open_response_cache(use_cache, cache_ttl),
+                                         chunk_tokens=chunk_tokens)
+        # Point de reprise : nouveau traitement, ou reprise si run_id est fourni
+        checkpoint = open_checkpoint("execute_command", context.data) if use_checkpoint else None
         
         result = executor.execute_command_on_folder(
             folder_path=folder_path,
@@ -362,7 +438,11 @@ def execute(context: Context) -> Context:
             recursive=recursive,
             custom_prompt=custom_prompt,
             apply_changes=apply_changes,
-            max_file_size=max_file_size
+            max_file_size=max_file_size,
+            incremental=incremental,
+            max_concurrency=max_concurrency,
+            report_path=report_path,
+            checkpoint=checkpoint
         )
         
         context.data["output"] = json.dumps(result, indent=2, ensure_ascii=False)
@@ -0,0 +1,161 @@
+import os
+import re
+import fnmatch
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Pattern, Tuple
+
+# Répertoires de dépendances et de build ignorés partout (les répertoires cachés le sont aussi)
+DEFAULT_IGNORED_DIRS = frozenset([
+    'node_modules', 'build', 'dist', '__pycache__', 'target', 'venv', 'env'
+])
+
+# Fichiers d'exclusion lus dans chaque répertoire parcouru
+IGNORE_FILES = (".gitignore", ".mistralignore")
+
+class DiscoveredFile(NamedTuple):
+    """Fichier trouvé lors du parcours, avec les informations de stat déjà lues."""
+    path: str
+    size: int
+    mtime: float
+
+class IgnoreRule(NamedTuple):
+    regex: Pattern
+    negate: bool
+    dir_only: bool
+
+def compile_patterns(patterns: Iterable[str]) -> Pattern:
+    """Compile des patterns glob (*.py, *.js...) en une seule expression régulière."""
+    parts = [fnmatch.translate(os.path.normcase(p)) for p in patterns]
+    return re.compile("|".join(f"(?:{p})" for p in parts) or r"(?!)")
+
+def translate_ignore_pattern(pattern: str) -> Pattern:
+    """Traduit un pattern au format .gitignore en expression régulière.
+
+    L'expression s'applique au chemin relatif (séparateur '/') au répertoire
+    contenant le fichier d'exclusion.
+    """
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    regex = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+        else:
+            c = pattern[i]
+            if c == "*":
+                regex.append("[^/]*")
+            elif c == "?":
+                regex.append("[^/]")
+            elif c == "[":
+                end = pattern.find("]", i + 1)
+                if end == -1:
+                    regex.append(re.escape(c))
+                else:
+                    content = pattern[i + 1:end]
+                    if content.startswith("!"):
+                        content = "^" + content[1:]
+                    regex.append(f"[{content}]")
+                    i = end
+            elif c == "\\" and i + 1 < n:
+                i += 1
+                regex.append(re.escape(pattern[i]))
+            else:
+                regex.append(re.escape(c))
+            i += 1
+    prefix = "" if anchored else "(?:.*/)?"
+    return re.compile(prefix + "".join(regex) + r"\Z", re.DOTALL)
+
+def parse_ignore_file(file_path: str) -> List[IgnoreRule]:
+    """Lit un fichier .gitignore / .mistralignore."""
+    rules = []
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if line:
+            rules.append(IgnoreRule(translate_ignore_pattern(line), negate, dir_only))
+    return rules
+
+def _is_ignored(rel_path: str, is_dir: bool, rule_sets: Tuple[Tuple[str, List[IgnoreRule]], ...]) -> bool:
+    """Applique les règles d'exclusion actives ; la dernière règle correspondante l'emporte."""
+    ignored = False
+    for base, rules in rule_sets:
+        local_path = rel_path[len(base) + 1:] if base else rel_path
+        for rule in rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(local_path):
+                ignored = not rule.negate
+    return ignored
+
+def iter_files(root: str, patterns: Optional[Iterable[str]] = None, recursive: bool = True,
+               ignored_dirs: Iterable[str] = DEFAULT_IGNORED_DIRS,
+               use_ignore_files: bool = True) -> Iterator[DiscoveredFile]:
+    """Parcourt un répertoire avec os.scandir et produit les fichiers correspondants.
+
+    Les fichiers sont produits au fil du parcours, dans un ordre déterministe
+    (tri par nom, fichiers d'un répertoire avant ses sous-répertoires). Les
+    répertoires cachés, ceux de `ignored_dirs` et les chemins exclus par les
+    fichiers .gitignore / .mistralignore ne sont pas visités.
+    """
+    matcher = compile_patterns(patterns) if patterns else None
+    ignored_dirs = frozenset(ignored_dirs)
+    stack = [(root, "", ())]
+
+    while stack:
+        directory, rel_dir, rule_sets = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        if use_ignore_files:
+            names = {e.name for e in entries}
+            for ignore_file in IGNORE_FILES:
+                if ignore_file in names:
+                    rules = parse_ignore_file(os.path.join(directory, ignore_file))
+                    if rules:
+                        rule_sets = rule_sets + ((rel_dir, rules),)
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir():
+                    if (recursive and not entry.is_symlink() and not entry.name.startswith('.')
+                            and entry.name not in ignored_dirs
+                            and not (rule_sets and _is_ignored(rel_path, True, rule_sets))):
+                        subdirs.append((entry.path, rel_path))
+                    continue
+                if not entry.is_file():
+                    continue
+                if matcher and not matcher.match(os.path.normcase(entry.name)):
+                    continue
+                if rule_sets and _is_ignored(rel_path, False, rule_sets):
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            yield DiscoveredFile(entry.path, stat.st_size, stat.st_mtime)
+
+        # Empilés à l'envers pour être visités dans l'ordre alphabétique
+        for path, rel_path in reversed(subdirs):
+            stack.append((path, rel_path, rule_sets))
@@ -1,4 +1,10 @@
-from mistral_cli.cli import Context
+from mistral_cli.context import Context
+from mistral_cli.http_client import MISTRAL_API_URL
+from mistral_cli.disk_cache import DiskCache
+from .response_cache import cached_chat_completion, open_response_cache, DEFAULT_RESPONSE_TTL
+from .chunking import (split_source, clean_chunk_code, stitch_code, stitch_text, chunk_label,
+                       DEFAULT_CHUNK_TOKENS, DEFAULT_CHUNK_CONCURRENCY)
+from .streaming import ordered_map
 import requests
 import os
 import json
@@ -8,9 +14,14 @@ from typing import Dict, List, Any, Optional
 class FileAnalyzer:
     """Analyseur de fichiers qui utilise l'API Mistral pour l'interprétation."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[DiskCache] = None,
+                 chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+                 chunk_concurrency: int = DEFAULT_CHUNK_CONCURRENCY):
         self.api_key = api_key
-        self.base_url = "https://api.mistral.ai/v1"
+        self.cache = cache  # Cache des réponses (None = désactivé)
+        self.chunk_tokens = chunk_tokens  # Taille max d'un morceau envoyé à l'API
+        self.chunk_concurrency = chunk_concurrency
+        self.base_url = MISTRAL_API_URL
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
@@ -59,16 +70,8 @@ class FileAnalyzer:
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=data,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            return result.get("choices", [{}])[0].get("message", {}).get("content", "Aucune réponse reçue.")
+            content = cached_chat_completion(self.cache, self.base_url, self.headers, data)
+            return content or "Aucune réponse reçue."
         
         except requests.RequestException as e:
             return f"Erreur lors de l'appel à l'API Mistral: {str(e)}"
@@ -101,33 +104,74 @@ class FileAnalyzer:
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=data,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            return result.get("choices", [{}])[0].get("message", {}).get("content", "Aucune suggestion générée.")
+            content = cached_chat_completion(self.cache, self.base_url, self.headers, data)
+            return content or "Aucune suggestion générée."
         
         except requests.RequestException as e:
             return f"Erreur lors de la génération des améliorations: {str(e)}"
     
-    def apply_suggestions(self, file_path: str, original_content: str, suggestions: str) -> bool:
-        """Applique les suggestions d'amélioration au fichier."""
+    def analyze_file(self, file_path: str, content: str, analysis_type: str = "general",
+                     custom_prompt: str = None, apply_improvements: bool = False) -> Dict[str, Any]:
+        """Analyse, suggestions et application éventuelle, morceau par morceau si le fichier est gros.
         
-        # Créer un backup du fichier original
-        backup_path = f"{file_path}.backup"
-        try:
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                f.write(original_content)
-        except Exception as e:
-            print(f"Erreur lors de la création du backup: {str(e)}")
-            return False
+        Un fichier qui tient en un morceau suit exactement le chemin habituel. Sinon,
+        chaque morceau (découpé aux frontières syntaxiques) est traité en parallèle et
+        les réponses sont recollées dans l'ordre du fichier.
+        """
+        chunks = split_source(content, file_path, self.chunk_tokens)
+        if len(chunks) == 1:
+            analysis = self.analyze_with_mistral(content, analysis_type, custom_prompt)
+            suggestions = self.generate_improvements(content, analysis)
+            applied = False
+            if apply_improvements:
+                applied = self.apply_suggestions(file_path, content, suggestions)
+            return {"analysis": analysis, "suggestions": suggestions,
+                    "improvements_applied": applied, "chunks": 1}
+        
+        def handle(chunk):
+            labeled = f"[{chunk_label(chunk, len(chunks))} de {file_path}]\n{chunk.text}"
+            analysis = self.analyze_with_mistral(labeled, analysis_type, custom_prompt)
+            suggestions = self.generate_improvements(chunk.text, analysis)
+            rewritten = None
+            if apply_improvements and not suggestions.startswith("Erreur lors de"):
+                try:
+                    rewritten = self.request_rewrite(chunk.text, suggestions)
+                except Exception as e:
+                    print(f"Erreur lors de l'application des suggestions ({chunk_label(chunk, len(chunks))}): {str(e)}")
+            return analysis, suggestions, rewritten
+        
+        results = list(ordered_map(handle, chunks, self.chunk_concurrency))
+        analyses = [r[0] for r in results]
+        suggestions = [r[1] for r in results]
+        
+        # Une erreur d'API sur un morceau fait échouer l'analyse du fichier (elle sera retentée)
+        failed = next((t for t in analyses + suggestions if t.startswith("Erreur lors de")), None)
+        if failed:
+            return {"analysis": failed, "suggestions": failed, "improvements_applied": False, "chunks": len(chunks)}
         
-        # Demander à Mistral de générer le code modifié
+        applied = False
+        rewritten = [r[2] for r in results]
+        if apply_improvements and all(rewritten):
+            # Le fichier n'est réécrit que si tous les morceaux l'ont été
+            try:
+                with open(f"{file_path}.backup", 'w', encoding='utf-8') as f:
+                    f.write(content)
+                improved_code = stitch_code([clean_chunk_code(code) for code in rewritten], chunks)
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(improved_code)
+                applied = True
+            except Exception as e:
+                print(f"Erreur lors de l'application des suggestions: {str(e)}")
+        
+        return {
+            "analysis": stitch_text(chunks, analyses),
+            "suggestions": stitch_text(chunks, suggestions),
+            "improvements_applied": applied,
+            "chunks": len(chunks)
+        }
+    
+    def request_rewrite(self, original_content: str, suggestions: str) -> str:
+        """Demande à Mistral le code modifié selon les suggestions (réponse brute)."""
         prompt = f"""
         Applique les suggestions suivantes au code original et fournis uniquement le code final complet et fonctionnel:
         
@@ -150,17 +194,23 @@ class FileAnalyzer:
             "temperature": 0.1
         }
         
+        return cached_chat_completion(self.cache, self.base_url, self.headers, data)
+    
+    def apply_suggestions(self, file_path: str, original_content: str, suggestions: str) -> bool:
+        """Applique les suggestions d'amélioration au fichier."""
+        
+        # Créer un backup du fichier original
+        backup_path = f"{file_path}.backup"
         try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=data,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            improved_code = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+            with open(backup_path, 'w', encoding='utf-8') as f:
+                f.write(original_content)
+        except Exception as e:
+            print(f"Erreur lors de la création du backup: {str(e)}")
+            return False
+        
+        try:
+            # Demander à Mistral de générer le code modifié
+            improved_code = self.request_rewrite(original_content, suggestions)
             
             if improved_code:
                 # Nettoyer le code (enlever les balises markdown si présentes)
@@ -200,6 +250,9 @@ def execute(context: Context) -> Context:
     analysis_type = context.data.get("analysis_type", "general")
     custom_prompt = context.data.get("custom_prompt", None)
     apply_improvements = context.data.get("apply_improvements", False)
+    use_cache = context.data.get("use_cache", True)
+    cache_ttl = context.data.get("cache_ttl", DEFAULT_RESPONSE_TTL)
+    chunk_tokens = context.data.get("chunk_tokens", DEFAULT_CHUNK_TOKENS)
     
     if not file_path or not os.path.exists(file_path):
         context.data["output"] = "Erreur: Chemin de fichier invalide ou inexistant."
@@ -212,7 +265,7 @@ def execute(context: Context) -> Context:
         return context
     
     try:
-        analyzer = FileAnalyzer(api_key)
+        analyzer = FileAnalyzer(api_key, cache=open_response_cache(use_cache, cache_ttl), chunk_tokens=chunk_tokens)
         
         # 1. Lire le contenu du fichier
         content = analyzer.read_file_content(file_path)
@@ -220,24 +273,17 @@ def execute(context: Context) -> Context:
             context.data["output"] = content
             return context
         
-        # 2. Analyser avec Mistral
-        analysis = analyzer.analyze_with_mistral(content, analysis_type, custom_prompt)
-        
-        # 3. Générer des suggestions d'amélioration
-        suggestions = analyzer.generate_improvements(content, analysis)
-        
-        # 4. Appliquer les améliorations si demandé
-        applied = False
-        if apply_improvements:
-            applied = analyzer.apply_suggestions(file_path, content, suggestions)
+        # 2. Analyser, suggérer et appliquer si demandé (par morceaux si le fichier est gros)
+        result = analyzer.analyze_file(file_path, content, analysis_type, custom_prompt, apply_improvements)
         
         # Préparer la sortie
         output = {
             "file_path": file_path,
             "analysis_type": analysis_type,
-            "analysis": analysis,
-            "suggestions": suggestions,
-            "improvements_applied": applied
+            "analysis": result["analysis"],
+            "suggestions": result["suggestions"],
+            "improvements_applied": result["improvements_applied"],
+            "chunks": result["chunks"]
         }
         
         context.data["output"] = json.dumps(output, indent=2, ensure_ascii=False)
@@ -0,0 +1,124 @@
+from mistral_cli.disk_cache import DiskCache
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+MANIFEST_DIR = "config/manifests"
+
+def hash_file(file_path: str) -> str:
+    """Hash SHA-256 du contenu brut d'un fichier."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class FileManifest:
+    """Manifeste d'état des fichiers pour les traitements incrémentaux.
+
+    Pour chaque fichier traité, le manifeste conserve (taille, mtime, hash du
+    contenu, pointeur vers le dernier résultat). Un fichier dont la taille et la
+    date de modification n'ont pas bougé est considéré inchangé sans être relu ;
+    si seule la date a changé, le hash du contenu tranche.
+    """
+
+    def __init__(self, run_key: str, directory: str = MANIFEST_DIR):
+        self.path = os.path.join(directory, f"{run_key}.json")
+        self.results_dir = os.path.join(directory, run_key)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._seen = set()
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def make_run_key(*parts: Any) -> str:
+        """Identifie un manifeste par le type de traitement et ses paramètres."""
+        return DiskCache.make_key(*parts)[:16]
+
+    def load(self):
+        """Charge le manifeste existant (vide s'il n'existe pas ou est corrompu)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def lookup(self, file_path: str, size: int, mtime: float) -> Optional[Dict[str, Any]]:
+        """Retourne le dernier résultat si le fichier est inchangé, sinon None."""
+        key = os.path.abspath(file_path)
+        with self._lock:
+            self._seen.add(key)
+            entry = self.entries.get(key)
+        if not entry or entry.get("size") != size:
+            return None
+
+        if entry.get("mtime") != mtime:
+            # Date modifiée : comparer le contenu avant de conclure
+            try:
+                content_hash = hash_file(file_path)
+            except OSError:
+                return None
+            if content_hash != entry.get("content_hash"):
+                return None
+            with self._lock:
+                entry["mtime"] = mtime
+
+        try:
+            with open(os.path.join(self.results_dir, entry["result"]), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def record(self, file_path: str, result: Dict[str, Any]):
+        """Enregistre l'état du fichier en fin de traitement et son résultat.
+
+        Si le traitement a modifié le fichier, c'est la version modifiée qui est
+        retenue : elle ne sera pas retraitée tant qu'elle ne change pas.
+        """
+        key = os.path.abspath(file_path)
+        try:
+            stat = os.stat(file_path)
+            content_hash = hash_file(file_path)
+        except OSError:
+            return
+
+        result_name = f"{DiskCache.make_key(key)[:32]}.json"
+        try:
+            os.makedirs(self.results_dir, exist_ok=True)
+            with open(os.path.join(self.results_dir, result_name), "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+        except OSError:
+            return
+
+        with self._lock:
+            self._seen.add(key)
+            self.entries[key] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "content_hash": content_hash,
+                "result": result_name
+            }
+
+    def save(self, prune: bool = True):
+        """Écrit le manifeste de façon atomique.
+
+        Avec prune=True, les fichiers non rencontrés pendant ce traitement
+        (supprimés ou exclus) sont retirés du manifeste.
+        """
+        with self._lock:
+            if prune:
+                for key in [k for k in self.entries if k not in self._seen]:
+                    entry = self.entries.pop(key)
+                    try:
+                        os.remove(os.path.join(self.results_dir, entry["result"]))
+                    except (OSError, KeyError):
+                        pass
+            data = {"files": self.entries}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
@@ -1,8 +1,14 @@
-from mistral_cli.cli import Context
-import requests
+from mistral_cli.context import Context
+from mistral_cli.http_client import MISTRAL_API_URL
+from mistral_cli.disk_cache import DiskCache
+from .response_cache import cached_chat_completion, open_response_cache, DEFAULT_RESPONSE_TTL
+from .manifest import FileManifest
+from .checkpoint import RunCheckpoint, open_checkpoint
+from .streaming import discover, ordered_map, open_report, ResultSampler, default_report_path
+from .chunking import (split_source, clean_chunk_code, stitch_code, chunk_label,
+                       DEFAULT_CHUNK_TOKENS, DEFAULT_CHUNK_CONCURRENCY, DEFAULT_MAX_FILE_SIZE)
 import os
 import json
-import fnmatch
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
@@ -10,9 +16,14 @@ from datetime import datetime
 class NaturalLanguageExecutor:
     """Exécuteur de commandes en langage naturel sur dossiers et sous-dossiers."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[DiskCache] = None,
+                 chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+                 chunk_concurrency: int = DEFAULT_CHUNK_CONCURRENCY):
         self.api_key = api_key
-        self.base_url = "https://api.mistral.ai/v1"
+        self.cache = cache  # Cache des réponses (None = désactivé)
+        self.chunk_tokens = chunk_tokens  # Taille max d'un morceau envoyé à l'API
+        self.chunk_concurrency = chunk_concurrency
+        self.base_url = MISTRAL_API_URL
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
@@ -51,16 +62,7 @@ Réponds uniquement avec le prompt technique à utiliser pour modifier le code.
                 "temperature": 0.3
             }
             
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=data,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            interpreted_prompt = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+            interpreted_prompt = cached_chat_completion(self.cache, self.base_url, self.headers, data)
             
             if interpreted_prompt:
                 return interpreted_prompt.strip()
@@ -106,54 +108,27 @@ Réponds uniquement avec le prompt technique à utiliser pour modifier le code.
         file_extension = Path(file_path).suffix.lower()
         language_info = self._detect_language(file_extension)
         
-        # Construire le prompt complet
-        full_prompt = f"""
-{interpreted_prompt}
-
-Fichier à modifier: {file_path}
-Langage: {language_info}
-
-Code original:
-{content}
-
-Instructions importantes:
-- Applique exactement ce qui est demandé: "{natural_command}"
-- Respecte la syntaxe et les conventions du {language_info}
-- Préserve toute la fonctionnalité existante
-- Fournis uniquement le code final modifié, sans explication ni formatage markdown
-- Si aucune modification n'est nécessaire, reproduis le code original à l'identique
-"""
-        
         try:
-            # Appeler l'API Mistral
-            data = {
-                "model": "mistral-large-latest",
-                "messages": [
-                    {
-                        "role": "system", 
-                        "content": f"Tu es un développeur expert en {language_info} qui modifie le code selon les instructions précises. Réponds uniquement avec le code final."
-                    },
-                    {"role": "user", "content": full_prompt}
-                ],
-                "max_tokens": 4000,
-                "temperature": 0.1
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=data,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            modified_code = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+            chunks = split_source(content, file_path, self.chunk_tokens)
+            if len(chunks) == 1:
+                modified_code = self._request_modified_code(
+                    natural_command, interpreted_prompt, file_path, language_info, content
+                )
+                if modified_code:
+                    # Nettoyer le code (enlever les balises markdown si présentes)
+                    modified_code = self._clean_code_response(modified_code)
+            else:
+                # Gros fichier : morceaux modifiés en parallèle puis recollés dans l'ordre
+                def rewrite(chunk):
+                    code = self._request_modified_code(
+                        natural_command, interpreted_prompt, file_path, language_info,
+                        chunk.text, chunk_label(chunk, len(chunks))
+                    )
+                    return clean_chunk_code(code) if code else ""
+                parts = list(ordered_map(rewrite, chunks, self.chunk_concurrency))
+                modified_code = stitch_code(parts, chunks) if all(parts) else ""
             
             if modified_code:
-                # Nettoyer le code (enlever les balises markdown si présentes)
-                modified_code = self._clean_code_response(modified_code)
-                
                 return {
                     "success": True,
                     "original_content": content,
@@ -161,6 +136,7 @@ Instructions importantes:
                     "file_path": file_path,
                     "natural_command": natural_command,
                     "interpreted_prompt": interpreted_prompt,
+                    "chunks": len(chunks),
                     "changes_detected": content.strip() != modified_code.strip()
                 }
             else:
@@ -177,12 +153,63 @@ Instructions importantes:
                 "file_path": file_path
             }
     
+    def _request_modified_code(self, natural_command: str, interpreted_prompt: str, file_path: str,
+                               language_info: str, code: str, part: str = None) -> str:
+        """Demande la version modifiée d'un fichier, ou d'un morceau (`part`) d'un gros fichier."""
+        
+        # Construire le prompt complet
+        extract = f"Extrait: {part} - le reste du fichier est traité séparément\n" if part else ""
+        full_prompt = f"""
+{interpreted_prompt}
+
+Fichier à modifier: {file_path}
+Langage: {language_info}
+{extract}
+Code original:
+{code}
+
+Instructions importantes:
+- Applique exactement ce qui est demandé: "{natural_command}"
+- Respecte la syntaxe et les conventions du {language_info}
+- Préserve toute la fonctionnalité existante
+- Fournis uniquement le code final modifié, sans explication ni formatage markdown
+- Si aucune modification n'est nécessaire, reproduis le code original à l'identique
+"""
+        if part:
+            full_prompt += "- Renvoie uniquement cet extrait modifié, en conservant son indentation d'origine\n"
+        
+        # Appeler l'API Mistral
+        data = {
+            "model": "mistral-large-latest",
+            "messages": [
+                {
+                    "role": "system", 
+                    "content": f"Tu es un développeur expert en {language_info} qui modifie le code selon les instructions précises. Réponds uniquement avec le code final."
+                },
+                {"role": "user", "content": full_prompt}
+            ],
+            "max_tokens": 4000,
+            "temperature": 0.1
+        }
+        
+        return cached_chat_completion(self.cache, self.base_url, self.headers, data)
+    
     def execute_natural_command_on_folder(self, folder_path: str, natural_command: str, 
                                         patterns: List[str] = None, 
                                         recursive: bool = True,
                                         apply_changes: bool = False,
-                                        max_file_size: int = 100000) -> Dict[str, Any]:
-        """Exécute un ordre en langage naturel sur tous les fichiers d'un dossier."""
+                                        max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+                                        incremental: bool = False,
+                                        max_concurrency: int = 4,
+                                        report_path: str = None,
+                                        checkpoint: Optional[RunCheckpoint] = None) -> Dict[str, Any]:
+        """Exécute un ordre en langage naturel sur tous les fichiers d'un dossier.
+        
+        Les fichiers sont traités au fil de leur découverte et chaque résultat est
+        écrit immédiatement dans un rapport JSONL ; seul un aperçu est conservé en mémoire.
+        Avec un point de reprise, les fichiers déjà terminés sont repris sans nouvel appel
+        à l'API et une interruption (Ctrl+C) renvoie le résultat partiel.
+        """
         
         if not os.path.exists(folder_path):
             return {"success": False, "error": f"Dossier inexistant: {folder_path}"}
@@ -191,82 +218,96 @@ Instructions importantes:
             patterns = ["*.py", "*.js", "*.ts", "*.java", "*.go", "*.php", "*.rb", "*.rs", "*.cpp", "*.c", "*.cs"]
         
         # Interpréter la commande une seule fois pour tous les fichiers
-        print(f"🧠 Interprétation de l'ordre: '{natural_command}'...")
-        interpreted_prompt = self.interpret_natural_command(natural_command)
+        # (à la reprise d'un traitement, l'interprétation d'origine est conservée)
+        interpreted_prompt = checkpoint.params.get("interpreted_prompt") if checkpoint else None
+        if not interpreted_prompt:
+            print(f"🧠 Interprétation de l'ordre: '{natural_command}'...")
+            interpreted_prompt = self.interpret_natural_command(natural_command)
+            if checkpoint:
+                checkpoint.set_param("interpreted_prompt", interpreted_prompt)
         print(f"💭 Interprétation: {interpreted_prompt[:100]}...")
         
-        results = []
-        errors = []
+        report_path = report_path or default_report_path("natural_language_execution_report")
+        samples = ResultSampler(3)
+        errors = ResultSampler(10)  # Limiter les erreurs conservées
+        total_files_found = 0
         files_processed = 0
         files_changed = 0
-        files_skipped = 0
+        files_reused = 0
+        files_resumed = 0
+        interrupted = False
         
-        # Trouver tous les fichiers
-        files_to_process = []
+        # Manifeste des fichiers déjà traités (mode incrémental)
+        manifest = None
+        if incremental:
+            manifest = FileManifest(FileManifest.make_run_key(
+                "natural_command", os.path.abspath(folder_path), natural_command, sorted(patterns), recursive
+            ))
         
-        if recursive:
-            for root, dirs, files in os.walk(folder_path):
-                # Ignorer les répertoires cachés et de build
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in [
-                    'node_modules', 'build', 'dist', '__pycache__', 'target', 
-                    '.git', '.vscode', '.idea', 'venv', 'env'
-                ]]
-                
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if any(fnmatch.fnmatch(file, pattern) for pattern in patterns):
-                        if os.path.getsize(file_path) <= max_file_size:
-                            files_to_process.append(file_path)
-                        else:
-                            files_skipped += 1
-        else:
-            for file in os.listdir(folder_path):
-                file_path = os.path.join(folder_path, file)
-                if os.path.isfile(file_path) and any(fnmatch.fnmatch(file, pattern) for pattern in patterns):
-                    if os.path.getsize(file_path) <= max_file_size:
-                        files_to_process.append(file_path)
-                    else:
-                        files_skipped += 1
+        # Découverte des fichiers (les fichiers trop volumineux sont ignorés)
+        skipped = []
+        files = discover(folder_path, patterns, recursive, max_file_size, on_skip=skipped.append)
         
-        # Traiter chaque fichier
-        for i, file_path in enumerate(files_to_process, 1):
-            print(f"📄 Traitement de: {file_path} ({i}/{len(files_to_process)})")
-            
-            result = self.execute_natural_command_on_file(file_path, natural_command, interpreted_prompt)
-            
-            if result["success"]:
-                files_processed += 1
-                
-                if result.get("changes_detected", False):
-                    files_changed += 1
+        def handle(found):
+            if checkpoint:
+                previous = checkpoint.lookup(found.path)
+                if previous is not None:
+                    # Fichier déjà terminé lors d'un passage interrompu de ce traitement
+                    return previous, "checkpoint"
+            if manifest:
+                previous = manifest.lookup(found.path, found.size, found.mtime)
+                if previous is not None:
+                    # Fichier inchangé depuis le dernier passage : réutiliser le résultat
+                    return previous, "manifest"
+            print(f"📄 Traitement de: {found.path}")
+            result = self.execute_natural_command_on_file(found.path, natural_command, interpreted_prompt)
+            if result["success"] and apply_changes:
+                self._apply_changes(result)
+            if manifest and result["success"] and "apply_error" not in result:
+                manifest.record(found.path, result)
+            return result, "api"
+        
+        # Traiter les fichiers et émettre chaque résultat dans le rapport
+        # À la reprise, le rapport interrompu est complété (ses résultats ne sont pas réécrits)
+        report, written = open_report(report_path, resume=bool(checkpoint and checkpoint.resumed))
+        with report:
+            try:
+                for result, origin in ordered_map(handle, files, max_concurrency):
+                    total_files_found += 1
+                    if origin != "checkpoint" or os.path.abspath(result["file_path"]) not in written:
+                        report.write(result)
                     
-                    # Appliquer les changements si demandé
-                    if apply_changes:
-                        try:
-                            # Créer un backup
-                            backup_path = f"{file_path}.backup"
-                            with open(backup_path, 'w', encoding='utf-8') as f:
-                                f.write(result["original_content"])
-                            
-                            # Écrire le nouveau contenu
-                            with open(file_path, 'w', encoding='utf-8') as f:
-                                f.write(result["modified_content"])
-                                
-                            result["backup_created"] = backup_path
-                            result["changes_applied"] = True
-                            
-                        except Exception as e:
-                            result["apply_error"] = str(e)
-                            errors.append(f"{file_path}: Erreur d'application - {str(e)}")
-                
-                results.append(result)
-            else:
-                errors.append(f"{file_path}: {result['error']}")
+                    if not result["success"]:
+                        errors.add(f"{result['file_path']}: {result['error']}")
+                        continue
+                    
+                    files_processed += 1
+                    if origin == "manifest":
+                        files_reused += 1
+                    elif origin == "checkpoint":
+                        files_resumed += 1
+                    elif result.get("changes_detected", False):
+                        files_changed += 1
+                    if "apply_error" in result:
+                        errors.add(f"{result['file_path']}: Erreur d'application - {result['apply_error']}")
+                    elif checkpoint and origin != "checkpoint":
+                        checkpoint.record(result)
+                    samples.add(result)
+            except KeyboardInterrupt:
+                # Les fichiers terminés sont déjà dans le rapport et le point de reprise
+                interrupted = True
+        files_skipped = len(skipped)
+        
+        if manifest:
+            manifest.save(prune=not interrupted)
+        if checkpoint:
+            checkpoint.finish("interrupted" if interrupted else "completed")
         
         # Générer un rapport de synthèse
         summary = self._generate_natural_execution_summary(
             natural_command, interpreted_prompt, folder_path, 
-            len(files_to_process), files_processed, files_changed, files_skipped, errors
+            total_files_found, files_processed, files_changed, files_skipped,
+            errors.samples, errors.count
         )
         
         return {
@@ -275,18 +316,42 @@ Instructions importantes:
             "natural_command": natural_command,
             "interpreted_prompt": interpreted_prompt,
             "folder_path": folder_path,
-            "total_files_found": len(files_to_process),
+            "total_files_found": total_files_found,
             "files_processed": files_processed,
             "files_changed": files_changed,
             "files_skipped": files_skipped,
-            "errors_count": len(errors),
-            "errors": errors[:10],  # Limiter les erreurs affichées
-            "detailed_results": results[:3] if len(results) <= 3 else results[:3] + [
-                {"note": f"... et {len(results)-3} autres fichiers traités"}
-            ],
+            "files_reused": files_reused,
+            "files_resumed": files_resumed,
+            "errors_count": errors.count,
+            "errors": errors.samples,
+            "report_file": report_path,
+            "run_id": checkpoint.run_id if checkpoint else None,
+            "interrupted": interrupted,
+            "detailed_results": samples.detailed_results("autres fichiers traités"),
             "apply_changes": apply_changes
         }
     
+    def _apply_changes(self, result: Dict[str, Any]):
+        """Écrit le code modifié sur disque (avec backup) si des changements sont détectés."""
+        if not result.get("changes_detected", False):
+            return
+        file_path = result["file_path"]
+        try:
+            # Créer un backup
+            backup_path = f"{file_path}.backup"
+            with open(backup_path, 'w', encoding='utf-8') as f:
+                f.write(result["original_content"])
+            
+            # Écrire le nouveau contenu
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(result["modified_content"])
+                
+            result["backup_created"] = backup_path
+            result["changes_applied"] = True
+            
+        except Exception as e:
+            result["apply_error"] = str(e)
+    
     def _detect_language(self, file_extension: str) -> str:
         """Détecte le langage basé sur l'extension de fichier."""
         language_map = {
@@ -321,7 +386,7 @@ Instructions importantes:
     
     def _generate_natural_execution_summary(self, natural_command: str, interpreted_prompt: str,
                                           folder_path: str, total_files: int, processed: int, 
-                                          changed: int, skipped: int, errors: List[str]) -> str:
+                                          changed: int, skipped: int, errors: List[str], errors_count: int = None) -> str:
         """Génère un résumé de l'exécution d'ordre en langage naturel."""
         
         summary = f"""
@@ -336,7 +401,7 @@ Instructions importantes:
 • Fichiers traités: {processed}
 • Fichiers modifiés: {changed}
 • Fichiers ignorés: {skipped} (trop volumineux)
-• Erreurs: {len(errors)}
+• Erreurs: {errors_count if errors_count is not None else len(errors)}
 
 📈 Taux de réussite: {(processed/total_files*100):.1f}% si {total_files > 0} else 0.0%
 🔄 Taux de modification: {(changed/processed*100):.1f}% si {processed > 0} else 0.0%
@@ -362,7 +427,15 @@ def execute(context: Context) -> Context:
     patterns = context.data.get("patterns", ["*.py", "*.js", "*.ts"])
     recursive = context.data.get("recursive", True)
     apply_changes = context.data.get("apply_changes", False)
-    max_file_size = context.data.get("max_file_size", 100000)
+    max_file_size = context.data.get("max_file_size", DEFAULT_MAX_FILE_SIZE)
+    chunk_tokens = context.data.get("chunk_tokens", DEFAULT_CHUNK_TOKENS)
+    use_cache = context.data.get("use_cache", True)
+    cache_ttl = context.data.get("cache_ttl", DEFAULT_RESPONSE_TTL)
+    incremental = context.data.get("incremental", False)
+    max_concurrency = context.data.get("max_concurrency", 4)
+    report_path = context.data.get("report_path") or default_report_path("natural_language_execution_report")
+    context.data["report_path"] = report_path  # Conservé pour une éventuelle reprise
+    use_checkpoint = context.data.get("checkpoint", True)
     
     api_key = context.data.get("api_key")
     if not api_key:
@@ -374,7 +447,10 @@ def execute(context: Context) -> Context:
         return context
     
     try:
-        executor = NaturalLanguageExecutor(api_key)
+        executor = NaturalLanguageExecutor(api_key, cache=open_response_cache(use_cache, cache_ttl),
+                                           chunk_tokens=chunk_tokens)
+        # Point de reprise : nouveau traitement, ou reprise si run_id est fourni
+        checkpoint = open_checkpoint("natural_command", context.data) if use_checkpoint else None
         
         result = executor.execute_natural_command_on_folder(
             folder_path=folder_path,
@@ -382,7 +458,11 @@ def execute(context: Context) -> Context:
             patterns=patterns,
             recursive=recursive,
             apply_changes=apply_changes,
-            max_file_size=max_file_size
+            max_file_size=max_file_size,
+            incremental=incremental,
+            max_concurrency=max_concurrency,
+            report_path=report_path,
+            checkpoint=checkpoint
         )
         
         context.data["output"] = json.dumps(result, indent=2, ensure_ascii=False)
@@ -0,0 +1,50 @@
+from mistral_cli.disk_cache import DiskCache, DEFAULT_MAX_BYTES
+from mistral_cli.scheduler import get_scheduler
+from typing import Dict, Any, Optional
+
+RESPONSE_CACHE_DIR = "config/cache/responses"
+DEFAULT_RESPONSE_TTL = 7 * 24 * 3600  # Une semaine
+
+def open_response_cache(enabled: bool = True, ttl: Optional[float] = DEFAULT_RESPONSE_TTL,
+                        max_bytes: int = DEFAULT_MAX_BYTES) -> DiskCache:
+    """Ouvre le cache des réponses de l'API Mistral."""
+    return DiskCache(RESPONSE_CACHE_DIR, max_bytes=max_bytes, ttl=ttl, enabled=enabled)
+
+def completion_cache_key(data: Dict[str, Any]) -> str:
+    """Clé d'une requête de complétion : contenu et prompt (messages), modèle, température, max_tokens."""
+    return DiskCache.make_key(
+        "chat/completions",
+        data.get("model"),
+        data.get("messages"),
+        data.get("temperature"),
+        data.get("max_tokens")
+    )
+
+def cached_chat_completion(cache: Optional[DiskCache], base_url: str, headers: Dict[str, str],
+                           data: Dict[str, Any], timeout: int = 30) -> str:
+    """Appelle /chat/completions en réutilisant la réponse en cache si la requête est identique.
+
+    Retourne le contenu du premier message ("" si la réponse est vide). Les
+    erreurs HTTP sont propagées et ne sont jamais mises en cache.
+    """
+    key = completion_cache_key(data) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    # Limites de débit, Retry-After et backoff gérés par l'ordonnanceur partagé
+    response = get_scheduler().post(
+        f"{base_url}/chat/completions",
+        headers=headers,
+        json=data,
+        timeout=timeout
+    )
+    response.raise_for_status()
+
+    result = response.json()
+    content = result.get("choices", [{}])[0].get("message", {}).get("content", "") or ""
+
+    if key is not None and content:
+        cache.set(key, content)
+    return content
@@ -0,0 +1,144 @@
+# Briques du traitement en flux des commandes sur dossiers :
+# découverte → lecture → requête → application → émission.
+# Chaque résultat est écrit dans un rapport JSONL dès qu'il est disponible.
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from .file_discovery import DiscoveredFile, iter_files
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def discover(root: str, patterns: Iterable[str], recursive: bool, max_file_size: int,
+             on_skip: Optional[Callable[[DiscoveredFile], None]] = None) -> Iterator[DiscoveredFile]:
+    """Étape de découverte : fichiers correspondants, hors fichiers trop volumineux."""
+    for found in iter_files(root, patterns, recursive):
+        if found.size <= max_file_size:
+            yield found
+        elif on_skip:
+            on_skip(found)
+
+def ordered_map(fn: Callable[[T], R], items: Iterable[T], max_concurrency: int = 1) -> Iterator[R]:
+    """Applique `fn` en parallèle en conservant l'ordre des éléments.
+
+    Les éléments sont consommés au fur et à mesure : au plus
+    2 × max_concurrency appels sont en attente à un instant donné.
+    """
+    if max_concurrency <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        try:
+            for item in items:
+                pending.append(pool.submit(fn, item))
+                if len(pending) >= max_concurrency * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Interruption : ne pas lancer les appels pas encore démarrés
+            for future in pending:
+                future.cancel()
+
+def default_report_path(prefix: str) -> str:
+    """Nom de rapport horodaté dans le répertoire courant."""
+    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+class JsonlReportWriter:
+    """Rapport JSONL écrit ligne par ligne, vidé sur disque après chaque résultat.
+
+    Avec append=True le rapport existant est complété ; une dernière ligne
+    tronquée (arrêt brutal) est d'abord supprimée.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if append:
+            _drop_partial_line(path)
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _drop_partial_line(path: str):
+    """Tronque le fichier après sa dernière ligne complète."""
+    try:
+        with open(path, "r+b") as f:
+            end = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline != -1:
+                    f.truncate(start + newline + 1)
+                    return
+                end = start
+            f.truncate(0)
+    except OSError:
+        pass
+
+def open_report(path: str, resume: bool = False) -> Tuple[JsonlReportWriter, Set[str]]:
+    """Rapport d'un traitement et fichiers qu'il contient déjà (chemins absolus).
+
+    À la reprise, le rapport du passage interrompu est complété au lieu d'être
+    écrasé : les résultats déjà écrits (contenus compris) sont conservés et ne
+    doivent pas être réémis depuis le point de reprise.
+    """
+    written = {os.path.abspath(record["file_path"]) for record in read_report(path)
+               if record.get("file_path")} if resume else set()
+    return JsonlReportWriter(path, append=resume), written
+
+def read_report(path: str) -> Iterator[Dict[str, Any]]:
+    """Relit un rapport JSONL (une ligne tronquée en fin de fichier est ignorée)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except OSError:
+        return
+
+class ResultSampler:
+    """Compte les résultats et ne conserve que les premiers, pour l'aperçu final."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.samples: List[Any] = []
+        self.count = 0
+
+    def add(self, result: Any):
+        self.count += 1
+        if len(self.samples) < self.limit:
+            self.samples.append(result)
+
+    def detailed_results(self, note: str = "autres fichiers") -> List[Any]:
+        if self.count <= self.limit:
+            return list(self.samples)
+        return self.samples + [{"note": f"... et {self.count - self.limit} {note}"}]
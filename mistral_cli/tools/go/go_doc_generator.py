@@ -1,14 +1,13 @@
-from mistral_cli.cli import Context
-import subprocess
+from mistral_cli.context import Context
+from mistral_cli.tool_runner import run_tool_command
 import os
 
 def execute(context: Context) -> Context:
     """Génère de la documentation Go avec godoc."""
     try:
-        result = subprocess.run(
+        result = run_tool_command(
             ["godoc", "-http=:6060"],
-            capture_output=True,
-            text=True
+            timeout=context.data.get("timeout")
         )
         context.data["output"] = (
             f"Documentation disponible sur http://localhost:6060\n{result.stdout}\n"
@@ -1,14 +1,17 @@
-from mistral_cli.cli import Context
-import subprocess
+from mistral_cli.context import Context
+from mistral_cli.batch_lint import execute_batch
+from mistral_cli.tool_runner import run_tool_command
 import os
 
 def execute(context: Context) -> Context:
     """Linter Go avec golangci-lint."""
+    if context.data.get("files"):
+        return execute_batch(context, "go")  # Mode lot : un lancement pour tous les fichiers
+
     try:
-        result = subprocess.run(
+        result = run_tool_command(
             ["golangci-lint", "run"],
-            capture_output=True,
-            text=True
+            timeout=context.data.get("timeout")
         )
         context.data["output"] = (
             f"Rapport golangci-lint:\n{result.stdout}\n"
@@ -1,26 +1,23 @@
-from mistral_cli.cli import Context
-import subprocess
-import os
+from mistral_cli.context import Context
+from mistral_cli.batch_lint import execute_batch
+from mistral_cli.linter_workers import lint_javascript
+
+REQUIRED_BINARY = "eslint"
+CACHE_DEPENDENCIES = ("linter_workers.py", "eslint_worker.js")  # Code qui produit le rapport (version de l'outil)
 
 def execute(context: Context) -> Context:
     """Linter JavaScript avec ESLint."""
+    if context.data.get("files"):
+        return execute_batch(context, "javascript")  # Mode lot : un lancement pour tous les fichiers
+
     code = context.data.get("input", "")
     try:
-        with open("temp.js", "w") as f:
-            f.write(code)
-
-        result = subprocess.run(
-            ["eslint", "temp.js"],
-            capture_output=True,
-            text=True
-        )
+        # Worker Node persistant : ESLint et ses règles restent chargés entre deux appels
+        report = lint_javascript(code)
         context.data["output"] = (
-            f"Rapport ESLint:\n{result.stdout}\n"
-            f"Erreurs: {result.stderr}"
+            f"Rapport ESLint:\n{report.stdout}\n"
+            f"Erreurs: {report.stderr}"
         )
     except Exception as e:
         context.data["output"] = f"Erreur: {str(e)}"
-    finally:
-        if os.path.exists("temp.js"):
-            os.remove("temp.js")
     return context
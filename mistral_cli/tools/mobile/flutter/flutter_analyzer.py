@@ -1,13 +1,12 @@
-from mistral_cli.cli import Context
-import subprocess
+from mistral_cli.context import Context
+from mistral_cli.tool_runner import run_tool_command
 
 def execute(context: Context) -> Context:
     """Analyse Flutter avec `flutter analyze`."""
     try:
-        result = subprocess.run(
+        result = run_tool_command(
             ["flutter", "analyze"],
-            capture_output=True,
-            text=True
+            timeout=context.data.get("timeout")
         )
         context.data["output"] = (
             f"Analyse Flutter:\n{result.stdout}\n"
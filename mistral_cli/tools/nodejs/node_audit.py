@@ -1,13 +1,12 @@
-from mistral_cli.cli import Context
-import subprocess
+from mistral_cli.context import Context
+from mistral_cli.tool_runner import run_tool_command
 
 def execute(context: Context) -> Context:
     """Audit des dépendances avec npm audit."""
     try:
-        result = subprocess.run(
+        result = run_tool_command(
             ["npm", "audit", "--json"],
-            capture_output=True,
-            text=True
+            timeout=context.data.get("timeout")
         )
         context.data["output"] = (
             f"Audit npm:\n{result.stdout}\n"
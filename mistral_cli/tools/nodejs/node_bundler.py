@@ -1,5 +1,5 @@
-from mistral_cli.cli import Context
-import subprocess
+from mistral_cli.context import Context
+from mistral_cli.tool_runner import run_tool_command
 
 def execute(context: Context) -> Context:
     """Bundle le code avec esbuild."""
@@ -9,10 +9,9 @@ def execute(context: Context) -> Context:
         return context
 
     try:
-        result = subprocess.run(
+        result = run_tool_command(
             ["esbuild", entry_file, "--bundle", "--outfile=dist/bundle.js"],
-            capture_output=True,
-            text=True
+            timeout=context.data.get("timeout")
         )
         context.data["output"] = (
             f"Bundle généré avec esbuild:\n{result.stdout}\n"
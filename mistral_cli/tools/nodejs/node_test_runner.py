@@ -0,0 +1,8 @@
+from mistral_cli.context import Context
+from mistral_cli.suite_runner import NodeTestRunner, execute_suite
+
+REQUIRED_BINARY = "node"
+
+def execute(context: Context) -> Context:
+    """Exécute des tests Node.js avec node --test."""
+    return execute_suite(context, NodeTestRunner, context.data.get("directory", "."), context.data.get("workers"))
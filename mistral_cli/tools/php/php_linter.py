@@ -1,31 +1,24 @@
-from mistral_cli.cli import Context
-from rich.console import Console
-import subprocess
+from mistral_cli.context import Context
+from mistral_cli.batch_lint import execute_batch
+from mistral_cli.linter_workers import lint_php
 
-console = Console()
+REQUIRED_BINARY = "phpcs"
+CACHE_DEPENDENCIES = ("linter_workers.py",)  # Code qui produit le rapport (version de l'outil)
 
 def execute(context: Context) -> Context:
     """Linter PHP avec PHP_CodeSniffer."""
+    if context.data.get("files"):
+        return execute_batch(context, "php")  # Mode lot : un lancement pour tous les fichiers
+
     code = context.data.get("input", "")
     try:
-        # Sauvegarder le code dans un fichier temporaire
-        with open("temp.php", "w") as f:
-            f.write(code)
-
-        # Exécuter PHP_CodeSniffer
-        result = subprocess.run(
-            ["phpcs", "--standard=PSR12", "temp.php"],
-            capture_output=True,
-            text=True
-        )
+        # Exécuter PHP_CodeSniffer avec le code sur son entrée standard
+        report = lint_php(code, standard="PSR12")
 
         context.data["output"] = (
-            f"Rapport de linting PHP (PSR-12):\n{result.stdout}\n"
-            f"Erreurs: {result.stderr}"
+            f"Rapport de linting PHP (PSR-12):\n{report.stdout}\n"
+            f"Erreurs: {report.stderr}"
         )
     except Exception as e:
         context.data["output"] = f"Erreur: {str(e)}"
-    finally:
-        if os.path.exists("temp.php"):
-            os.remove("temp.php")
     return context
@@ -1,19 +1,18 @@
-from mistral_cli.cli import Context
-import subprocess
-import os
+from mistral_cli.context import Context
+from mistral_cli.tool_runner import run_tool_command, scratch_dir, write_scratch_file
 
 def execute(context: Context) -> Context:
     """Analyse de sécurité avec Psalm."""
     code = context.data.get("input", "")
     try:
-        with open("temp.php", "w") as f:
-            f.write(code)
-
-        result = subprocess.run(
-            ["psalm", "--init", "temp.php"],
-            capture_output=True,
-            text=True
-        )
+        # Psalm s'exécute dans un répertoire propre à l'appel (fichier et psalm.xml compris)
+        with scratch_dir() as scratch:
+            write_scratch_file(scratch, "snippet.php", code)
+            result = run_tool_command(
+                ["psalm", "--init", "snippet.php"],
+                timeout=context.data.get("timeout"),
+                cwd=scratch
+            )
 
         context.data["output"] = (
             f"Rapport de sécurité Psalm:\n{result.stdout}\n"
@@ -21,7 +20,4 @@ def execute(context: Context) -> Context:
         )
     except Exception as e:
         context.data["output"] = f"Erreur: {str(e)}"
-    finally:
-        if os.path.exists("temp.php"):
-            os.remove("temp.php")
     return context
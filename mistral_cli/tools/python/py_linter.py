@@ -1,26 +1,27 @@
-from mistral_cli.cli import Context
-import subprocess
-import os
+from mistral_cli.context import Context
+from mistral_cli.batch_lint import execute_batch
+from mistral_cli.linter_workers import lint_python, python_checks_version
+
+REQUIRED_BINARY = "flake8"  # Seulement si pyflakes/pycodestyle ne sont pas importables
+CACHE_DEPENDENCIES = ("linter_workers.py",)  # Code qui produit le rapport (version de l'outil)
+
+def cache_extra():
+    """Versions de pyflakes et pycodestyle : le rapport en dépend autant que de flake8."""
+    return python_checks_version()
 
 def execute(context: Context) -> Context:
     """Linter Python avec flake8."""
+    if context.data.get("files"):
+        return execute_batch(context, "python")  # Mode lot : un lancement pour tous les fichiers
+
     code = context.data.get("input", "")
     try:
-        with open("temp.py", "w") as f:
-            f.write(code)
-
-        result = subprocess.run(
-            ["flake8", "temp.py"],
-            capture_output=True,
-            text=True
-        )
+        # Vérifications de flake8 dans le processus, sans fichier temporaire ni lancement
+        report = lint_python(code)
         context.data["output"] = (
-            f"Rapport flake8:\n{result.stdout}\n"
-            f"Erreurs: {result.stderr}"
+            f"Rapport flake8:\n{report.stdout}\n"
+            f"Erreurs: {report.stderr}"
         )
     except Exception as e:
         context.data["output"] = f"Erreur: {str(e)}"
-    finally:
-        if os.path.exists("temp.py"):
-            os.remove("temp.py")
     return context
@@ -1,26 +1,21 @@
-from mistral_cli.cli import Context
-import subprocess
-import os
+from mistral_cli.context import Context
+from mistral_cli.tool_runner import run_tool_command, scratch_dir, write_scratch_file
 
 def execute(context: Context) -> Context:
     """Analyse de sécurité avec bandit."""
     code = context.data.get("input", "")
     try:
-        with open("temp.py", "w") as f:
-            f.write(code)
-
-        result = subprocess.run(
-            ["bandit", "temp.py"],
-            capture_output=True,
-            text=True
-        )
+        # Répertoire propre à l'appel : plusieurs étapes peuvent tourner en parallèle
+        with scratch_dir() as scratch:
+            snippet_path = write_scratch_file(scratch, "snippet.py", code)
+            result = run_tool_command(
+                ["bandit", snippet_path],
+                timeout=context.data.get("timeout")
+            )
         context.data["output"] = (
             f"Rapport Bandit:\n{result.stdout}\n"
             f"Erreurs: {result.stderr}"
         )
     except Exception as e:
         context.data["output"] = f"Erreur: {str(e)}"
-    finally:
-        if os.path.exists("temp.py"):
-            os.remove("temp.py")
     return context
@@ -0,0 +1,8 @@
+from mistral_cli.context import Context
+from mistral_cli.suite_runner import PytestRunner, execute_suite
+
+REQUIRED_BINARY = "pytest"
+
+def execute(context: Context) -> Context:
+    """Exécute des tests Python avec pytest."""
+    return execute_suite(context, PytestRunner, context.data.get("directory", "."), context.data.get("workers"))
@@ -1,19 +1,22 @@
-from mistral_cli.cli import Context
-import subprocess
+from mistral_cli.context import Context
+from mistral_cli.batch_lint import execute_batch
+from mistral_cli.tool_runner import run_tool_command
 import os
 
 def execute(context: Context) -> Context:
     """Linter Ruby avec RuboCop."""
+    if context.data.get("files"):
+        return execute_batch(context, "ruby")  # Mode lot : un lancement pour tous les fichiers
+
     file_path = context.data.get("file_path", "")
     if not file_path or not os.path.exists(file_path):
         context.data["output"] = "Fichier Ruby introuvable."
         return context
 
     try:
-        result = subprocess.run(
+        result = run_tool_command(
             ["rubocop", file_path],
-            capture_output=True,
-            text=True
+            timeout=context.data.get("timeout")
         )
         context.data["output"] = (
             f"Rapport RuboCop:\n{result.stdout}\n"
@@ -1,19 +1,8 @@
-from mistral_cli.cli import Context
-import subprocess
-import os
+from mistral_cli.context import Context
+from mistral_cli.suite_runner import CargoTestRunner, execute_suite
+
+REQUIRED_BINARY = "cargo"
 
 def execute(context: Context) -> Context:
     """Exécute des tests Rust."""
-    try:
-        result = subprocess.run(
-            ["cargo", "test"],
-            capture_output=True,
-            text=True
-        )
-        context.data["output"] = (
-            f"Résultats des tests:\n{result.stdout}\n"
-            f"Erreurs: {result.stderr}"
-        )
-    except Exception as e:
-        context.data["output"] = f"Erreur: {str(e)}"
-    return context
+    return execute_suite(context, CargoTestRunner, context.data.get("directory", "."), context.data.get("workers"))
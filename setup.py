@@ -33,6 +33,6 @@ setup(
     },
     include_package_data=True,
     package_data={
-        "mistral_cli": ["config/*.json", "tools/*/*"],
+        "mistral_cli": ["config/*.json", "*.js", "tools/*.json", "tools/*/*"],
     },
 )
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests du registre indexé des agents.
+"""
+
+import json
+from mistral_cli.agent_registry import AgentRegistry
+from mistral_cli.models import MistralAgent
+
+def _agent(agent_id, agent_type="model", model="mistral-small", **kwargs):
+    return MistralAgent(id=agent_id, name=agent_id, model=model, agent_type=agent_type, **kwargs)
+
+def test_indexes():
+    """Recherche par identifiant, type et modèle, dans l'ordre d'ajout."""
+    registry = AgentRegistry([_agent("a"), _agent("b", "agent"), _agent("c", model="mistral-large")])
+    assert registry.get("b").agent_type == "agent"
+    assert registry.get("inconnu") is None and registry.get(None) is None
+    assert [a.id for a in registry.by_type("model")] == ["a", "c"]
+    assert [a.id for a in registry.by_model("mistral-small")] == ["a", "b"]
+    assert len(registry) == 3 and not registry.dirty
+
+def test_upsert_reindexes_and_keeps_order():
+    """Une mise à jour déplace l'agent dans les index sans changer sa position."""
+    registry = AgentRegistry([_agent("a"), _agent("b")])
+    assert not registry.upsert(_agent("a"))  # Identique : aucun changement
+    assert registry.upsert(_agent("a", model="mistral-large"))
+    assert [a.id for a in registry] == ["a", "b"]
+    assert registry.by_model("mistral-large")[0].id == "a"
+    assert [a.id for a in registry.by_model("mistral-small")] == ["b"]
+
+def test_merge_and_save_only_when_dirty(tmp_path):
+    """Les agents connus sont conservés ; le fichier n'est écrit que s'il y a des ajouts."""
+    path = str(tmp_path / "agents.json")
+    registry = AgentRegistry([_agent("a", description="locale")], path)
+    assert not registry.save()
+    assert registry.merge([_agent("a"), _agent("b")]) == 1
+    assert registry.get("a").description == "locale"
+    assert registry.save() and not registry.save()
+    with open(path, encoding="utf-8") as f:
+        assert [a["id"] for a in json.load(f)] == ["a", "b"]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests du lint par lots (conversion des sorties de linters, un lancement par langage).
+"""
+
+import json
+
+import pytest
+from mistral_cli import batch_lint
+from mistral_cli.context import Context
+from mistral_cli.batch_lint import (Diagnostic, language_of, lint_files, parse_eslint, parse_flake8,
+                                    parse_golangci, parse_ktlint, parse_phpcs, parse_rubocop)
+
+def test_flake8_output_is_parsed():
+    diagnostics = parse_flake8("app.py:3:1: F401 'os' imported but unused\napp.py:9:80: E501 line too long\n")
+    assert diagnostics == [
+        Diagnostic("app.py", 3, 1, "F401", "error", "'os' imported but unused", "flake8"),
+        Diagnostic("app.py", 9, 80, "E501", "warning", "line too long", "flake8"),
+    ]
+
+def test_json_reports_share_one_format():
+    eslint = parse_eslint([{"filePath": "a.js", "messages": [
+        {"line": 1, "column": 5, "ruleId": "no-unused-vars", "severity": 2, "message": "unused"}]}])
+    phpcs = parse_phpcs({"files": {"b.php": {"messages": [
+        {"line": 2, "column": 1, "source": "PSR12.Files", "type": "WARNING", "message": "style"}]}}})
+    golangci = parse_golangci({"Issues": [
+        {"FromLinter": "errcheck", "Text": "unchecked", "Pos": {"Filename": "c.go", "Line": 4, "Column": 2}}]})
+    rubocop = parse_rubocop({"files": [{"path": "d.rb", "offenses": [
+        {"cop_name": "Style/Foo", "severity": "convention", "message": "foo", "location": {"line": 5, "column": 3}}]}]})
+    ktlint = parse_ktlint([{"file": "e.kt", "errors": [{"line": 6, "column": 1, "rule": "indent", "message": "bad"}]}])
+
+    assert eslint == [Diagnostic("a.js", 1, 5, "no-unused-vars", "error", "unused", "eslint")]
+    assert phpcs == [Diagnostic("b.php", 2, 1, "PSR12.Files", "warning", "style", "phpcs")]
+    assert golangci == [Diagnostic("c.go", 4, 2, "errcheck", "warning", "unchecked", "golangci-lint")]
+    assert rubocop == [Diagnostic("d.rb", 5, 3, "Style/Foo", "warning", "foo", "rubocop")]
+    assert ktlint == [Diagnostic("e.kt", 6, 1, "indent", "error", "bad", "ktlint")]
+
+def test_one_launch_per_language(monkeypatch):
+    """Trois fichiers Ruby : un seul processus rubocop ; un fichier sans linter est ignoré."""
+    commands = []
+
+    class Completed:
+        returncode = 1
+        stderr = ""
+        stdout = json.dumps({"files": [{"path": "a.rb", "offenses": [
+            {"cop_name": "Lint/Foo", "severity": "error", "message": "x", "location": {"line": 1, "column": 1}}]}]})
+
+    def fake_run(command, timeout=None):
+        commands.append(command)
+        return Completed()
+
+    monkeypatch.setattr(batch_lint, "run_tool_command", fake_run)
+    result = lint_files(["a.rb", "b.rb", "c.rb", "notes.txt"])
+    assert commands == [["rubocop", "--format", "json", "a.rb", "b.rb", "c.rb"]]
+    assert result.launches == 1 and result.files_checked == 3
+    assert [d.rule for d in result.diagnostics] == ["Lint/Foo"]
+
+def test_python_batch_runs_in_process(tmp_path, monkeypatch):
+    pytest.importorskip("pyflakes")
+    pytest.importorskip("pycodestyle")
+    monkeypatch.chdir(tmp_path)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"m{i}.py"
+        path.write_text("import os\n")
+        paths.append(str(path))
+    result = lint_files(paths)
+    assert result.launches == 0 and not result.errors
+    assert [(language_of(d.file), d.rule) for d in result.diagnostics] == [("python", "F401")] * 3
+
+def test_linter_tools_share_the_batch_mode(monkeypatch):
+    calls = []
+    monkeypatch.setattr(batch_lint, "batch_report", lambda files, language, timeout, use_cache:
+                        calls.append((files, language, use_cache)) or "{}")
+    from mistral_cli.tools.go import go_linter
+    from mistral_cli.tools.ruby import ruby_linter
+    assert go_linter.execute(Context(data={"files": ["a.go"]})).data["output"] == "{}"
+    ruby_linter.execute(Context(data={"files": ["a.rb"], "use_cache": False}))
+    assert calls == [(["a.go"], "go", True), (["a.rb"], "ruby", False)]
+
+    monkeypatch.setattr(batch_lint, "batch_report", lambda *args: 1 / 0)
+    assert go_linter.execute(Context(data={"files": ["a.go"]})).data["output"].startswith("Erreur: ")
+
+def test_go_package_diagnostics_are_limited_to_requested_files(tmp_path, monkeypatch):
+    """golangci-lint analyse tout le paquet : un fichier non demandé n'apparaît pas dans le rapport."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pkg").mkdir()
+    for name in ("a.go", "b.go"):
+        (tmp_path / "pkg" / name).write_text("package pkg\n")
+    commands = []
+
+    class Completed:
+        returncode = 1
+        stderr = ""
+        stdout = json.dumps({"Issues": [
+            {"FromLinter": "errcheck", "Text": f"unchecked {name}", "Severity": "",
+             "Pos": {"Filename": f"pkg/{name}", "Line": 3, "Column": 2}} for name in ("a.go", "b.go")]})
+
+    def fake_run(command, timeout=None):
+        commands.append(command)
+        return Completed()
+
+    monkeypatch.setattr(batch_lint, "run_tool_command", fake_run)
+    result = lint_files(["pkg/a.go"])
+    assert commands == [["golangci-lint", "run", "--out-format=json", "pkg"]]
+    assert [(d.file, d.message) for d in result.diagnostics] == [("pkg/a.go", "unchecked a.go")]
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests de l'analyse par lots concurrente (ordre du rapport, agrégation des erreurs).
+"""
+
+import json
+import threading
+import time
+
+from mistral_cli.context import Context
+from mistral_cli.tools.file_analyzer import batch_processor
+from mistral_cli.tools.file_analyzer.streaming import read_report
+
+class _FakeAnalyzer:
+    """Analyse simulée : les premiers fichiers sont les plus lents, "bad" lève une erreur."""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, api_key, cache=None, chunk_tokens=None):
+        pass
+
+    def read_file_content(self, file_path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def analyze_file(self, file_path, content, analysis_type, apply_improvements=False):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            time.sleep(0.05 * (10 - int(content.split()[-1])) / 10)
+            if "bad" in content:
+                raise RuntimeError("réponse invalide")
+            return {"analysis": f"analyse {content.strip()}", "suggestions": "", "improvements_applied": False,
+                    "chunks": 1}
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+def test_concurrent_batch_keeps_order_and_collects_errors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(batch_processor, "FileAnalyzer", _FakeAnalyzer)
+    monkeypatch.setattr(batch_processor, "configure_pool", lambda **sizes: None)
+    project = tmp_path / "project"
+    project.mkdir()
+    for i in range(8):
+        (project / f"m{i}.py").write_text(f"bad {i}\n" if i in (2, 5) else f"ok {i}\n")
+    expected = [str(found.path) for found in batch_processor.discover(str(project), ["*.py"], True, 10 ** 6)]
+
+    report_path = str(tmp_path / "report.jsonl")
+    context = batch_processor.execute(Context(data={
+        "api_key": "test", "directory": str(project), "patterns": ["*.py"], "max_concurrency": 3,
+        "report_path": report_path, "checkpoint": False, "use_cache": False
+    }))
+    output = json.loads(context.data["output"])
+
+    # Rapport dans l'ordre de découverte, malgré des fichiers terminés dans le désordre
+    assert [record["file_path"] for record in read_report(report_path)] == expected
+    assert 1 < _FakeAnalyzer.peak <= 3
+    assert output["total_files_found"] == 8
+    assert output["files_processed"] == 6
+    assert output["files_with_errors"] == 2
+    assert sorted(output["errors"]) == sorted(f"{path}: Erreur - réponse invalide" for path in expected
+                                              if "m2" in path or "m5" in path)
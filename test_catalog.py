@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests du catalogue des modèles et agents en cache.
+"""
+
+import threading
+import mistral_cli.catalog as catalog
+from mistral_cli.catalog import ModelCatalog
+from mistral_cli.disk_cache import DiskCache
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._body
+
+class FakeScheduler:
+    """Répond selon le point d'accès et note les en-têtes reçus."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None):
+        endpoint = url.rsplit("/", 1)[1]
+        with self.lock:
+            self.calls.append((endpoint, headers))
+        return self.responses[endpoint]
+
+def _catalog(tmp_path, monkeypatch, responses, ttl=3600):
+    scheduler = FakeScheduler(responses)
+    monkeypatch.setattr(catalog, "get_scheduler", lambda: scheduler)
+    return ModelCatalog("sk-test", ttl=ttl, cache=DiskCache(str(tmp_path))), scheduler
+
+def test_warm_catalog_makes_no_request(tmp_path, monkeypatch):
+    """Une fois en cache et tant que le TTL court, aucune requête n'est envoyée."""
+    responses = {
+        "models": FakeResponse(200, {"data": [{"id": "mistral-small"}]}),
+        "agents": FakeResponse(200, [{"id": "ag_1"}])
+    }
+    model_catalog, scheduler = _catalog(tmp_path, monkeypatch, responses)
+    assert model_catalog.get() == {"models": [{"id": "mistral-small"}], "agents": [{"id": "ag_1"}]}
+    assert sorted(e for e, _ in scheduler.calls) == ["agents", "models"]
+    scheduler.calls.clear()
+    assert model_catalog.get()["models"] == [{"id": "mistral-small"}]
+    assert scheduler.calls == []
+
+def test_stale_catalog_is_revalidated(tmp_path, monkeypatch):
+    """Un catalogue périmé est revalidé avec son ETag ; une réponse 304 garde la liste."""
+    responses = {
+        "models": FakeResponse(200, {"data": [{"id": "m"}]}, {"ETag": '"v1"'}),
+        "agents": FakeResponse(200, [])
+    }
+    model_catalog, scheduler = _catalog(tmp_path, monkeypatch, responses, ttl=-1)
+    model_catalog.get()
+    responses["models"] = FakeResponse(304)
+    responses["agents"] = FakeResponse(503)
+    scheduler.calls.clear()
+    result = model_catalog.get()
+    assert result == {"models": [{"id": "m"}], "agents": []}
+    assert dict(scheduler.calls)["models"]["If-None-Match"] == '"v1"'
+    assert "agents" in model_catalog.errors
+
+def test_background_refresh(tmp_path, monkeypatch):
+    """Le rafraîchissement en arrière-plan rend la main tout de suite et livre le résultat."""
+    responses = {"models": FakeResponse(200, [{"id": "m"}]), "agents": FakeResponse(200, [])}
+    model_catalog, _ = _catalog(tmp_path, monkeypatch, responses)
+    future = model_catalog.refresh_in_background()
+    assert future.result(timeout=5)["models"] == [{"id": "m"}]
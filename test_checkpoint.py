@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests des points de reprise des traitements sur dossier.
+"""
+
+import json
+import os
+
+import pytest
+from mistral_cli.context import Context
+from mistral_cli.tools.file_analyzer import command_executor
+from mistral_cli.tools.file_analyzer.streaming import read_report
+from mistral_cli.tools.file_analyzer.checkpoint import (RunCheckpoint, open_checkpoint, list_checkpoints,
+                                                        prune_checkpoints)
+
+def test_record_and_resume(tmp_path):
+    """Les résultats enregistrés sont retrouvés après réouverture ; les secrets ne sont pas écrits."""
+    checkpoint = RunCheckpoint.start("analyze_batch", {"directory": "src", "api_key": "secret"}, str(tmp_path))
+    checkpoint.record({"file_path": "src/a.py", "analysis": "ok"})
+    checkpoint.finish("interrupted")
+
+    resumed = RunCheckpoint.open(checkpoint.run_id, str(tmp_path))
+    assert resumed.params == {"directory": "src"}
+    assert resumed.meta["status"] == "interrupted"
+    assert resumed.completed == 1
+    assert resumed.lookup("src/a.py")["analysis"] == "ok"
+    assert resumed.lookup("src/b.py") is None
+
+def test_truncated_line_is_dropped(tmp_path):
+    """Une ligne à moitié écrite (arrêt brutal) est ignorée puis écrasée."""
+    checkpoint = RunCheckpoint.start("analyze_batch", {}, str(tmp_path))
+    checkpoint.record({"file_path": "a.py", "analysis": "ok"})
+    checkpoint.finish("running")
+    with open(checkpoint.results_path, "a", encoding="utf-8") as f:
+        f.write('{"file_path": "b.py", "anal')
+
+    resumed = RunCheckpoint.open(checkpoint.run_id, str(tmp_path))
+    assert resumed.completed == 1
+    resumed.record({"file_path": "b.py", "analysis": "ok"})
+    resumed.finish("interrupted")
+    assert RunCheckpoint.open(checkpoint.run_id, str(tmp_path)).lookup("b.py")["analysis"] == "ok"
+
+def test_open_checkpoint(tmp_path, monkeypatch):
+    """Sans run_id un traitement est créé ; un run_id inconnu ou d'un autre outil est refusé."""
+    monkeypatch.chdir(tmp_path)
+    checkpoint = open_checkpoint("natural_command", {"folder_path": "."})
+    checkpoint.finish("interrupted")
+    assert [m["run_id"] for m in list_checkpoints()] == [checkpoint.run_id]
+    assert open_checkpoint("natural_command", {"run_id": checkpoint.run_id}).completed == 0
+    with pytest.raises(ValueError):
+        open_checkpoint("analyze_batch", {"run_id": checkpoint.run_id})
+    with pytest.raises(ValueError):
+        open_checkpoint("natural_command", {"run_id": "inconnu"})
+
+def test_records_are_slim_and_completed_runs_are_pruned(tmp_path):
+    """Le contenu des fichiers n'est pas écrit ; un traitement terminé ne garde que ses métadonnées."""
+    checkpoint = RunCheckpoint.start("execute_command", {}, str(tmp_path))
+    checkpoint.record({"file_path": "a.py", "success": True,
+                       "original_content": "x" * 1000, "improved_content": "y" * 1000})
+    assert checkpoint.lookup("a.py") == {"file_path": "a.py", "success": True}
+    checkpoint.finish()
+    assert not (tmp_path / f"{checkpoint.run_id}.jsonl").exists()
+    assert RunCheckpoint.open(checkpoint.run_id, str(tmp_path)).meta["status"] == "completed"
+
+    interrupted = RunCheckpoint.start("execute_command", {}, str(tmp_path))
+    interrupted.finish("interrupted")
+    for _ in range(3):
+        RunCheckpoint.start("execute_command", {}, str(tmp_path)).finish()
+    assert prune_checkpoints(str(tmp_path), keep=2) == 2
+    runs = list_checkpoints(str(tmp_path), include_completed=True)
+    assert len(runs) == 3
+    assert interrupted.run_id in [m["run_id"] for m in runs]  # Un traitement à reprendre n'est jamais supprimé
+
+def test_resumed_run_completes_the_interrupted_report(tmp_path, monkeypatch):
+    """La reprise complète le rapport : contenus déjà écrits conservés, aucun fichier en double."""
+    monkeypatch.chdir(tmp_path)
+    project = tmp_path / "project"
+    project.mkdir()
+    for name in ("a.py", "b.py", "c.py"):
+        (project / name).write_text(f"# {name}\n")
+    interrupt = {"c.py"}
+
+    def fake_execute(self, file_path, command, custom_prompt=None):
+        if os.path.basename(file_path) in interrupt:
+            raise KeyboardInterrupt
+        return {"file_path": file_path, "success": True, "changes_detected": False,
+                "original_content": "avant", "improved_content": "après"}
+
+    monkeypatch.setattr(command_executor.FolderCommandExecutor, "execute_command_on_file", fake_execute)
+    data = {"api_key": "test", "folder_path": str(project), "command": "doc", "patterns": ["*.py"],
+            "max_concurrency": 1, "use_cache": False, "report_path": str(tmp_path / "report.jsonl")}
+    first = json.loads(command_executor.execute(Context(data=dict(data))).data["output"])
+    assert first["interrupted"]
+    with open(data["report_path"], "a", encoding="utf-8") as f:
+        f.write('{"file_path": "c.py", "succ')  # Ligne à moitié écrite au moment de l'arrêt
+
+    interrupt.clear()
+    second = json.loads(command_executor.execute(Context(data=dict(data, run_id=first["run_id"]))).data["output"])
+    assert not second["interrupted"] and second["files_resumed"] == 2
+
+    records = list(read_report(data["report_path"]))
+    assert sorted(os.path.basename(r["file_path"]) for r in records) == ["a.py", "b.py", "c.py"]
+    assert all(r["improved_content"] == "après" for r in records)
+    with open(data["report_path"], encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 3
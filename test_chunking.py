@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests du découpage des gros fichiers en morceaux envoyés séparément à l'API.
+"""
+
+from mistral_cli.tools.file_analyzer.chunking import (
+    split_source, estimate_tokens, clean_chunk_code, stitch_code
+)
+
+def _python_module(functions=200):
+    return "import os\n\n" + "".join(
+        f"# Fonction {i}\n@decorateur\ndef fonction_{i}(x):\n    y = x + {i}\n    return y\n\n\n"
+        for i in range(functions)
+    )
+
+def test_small_file_is_single_chunk():
+    """Un fichier qui tient dans la limite n'est pas découpé."""
+    chunks = split_source("x = 1\n", "a.py", max_tokens=100)
+    assert len(chunks) == 1 and chunks[0].text == "x = 1\n"
+
+def test_python_splits_on_definitions():
+    """Les coupures Python tombent avant un commentaire / décorateur de fonction."""
+    content = _python_module()
+    chunks = split_source(content, "module.py", max_tokens=300)
+    assert len(chunks) > 1
+    assert "".join(c.text for c in chunks) == content
+    for chunk in chunks[1:]:
+        assert chunk.text.startswith("# Fonction")
+        assert estimate_tokens(chunk.text) <= 300 + 1
+
+def test_brace_language_splits_between_blocks():
+    """Les accolades dans les chaînes ne faussent pas la profondeur des blocs."""
+    content = "".join(
+        f"function f{i}(a) {{\n  if (a) {{\n    return '}}';\n  }}\n  return a;\n}}\n\n" for i in range(200)
+    )
+    chunks = split_source(content, "app.js", max_tokens=200)
+    assert "".join(c.text for c in chunks) == content
+    assert all(c.text.startswith("function") for c in chunks)
+
+def test_unbreakable_content_is_split_by_lines():
+    """Sans frontière utilisable, le découpage se fait entre deux lignes."""
+    content = "".join(f"ligne {i}\n" for i in range(1000))
+    chunks = split_source(content, "data.txt", max_tokens=100)
+    assert "".join(c.text for c in chunks) == content
+    assert all(len(c.text) <= 400 for c in chunks)
+
+def test_stitch_restores_separators():
+    """Les morceaux réécrits sont recollés avec les lignes vides d'origine."""
+    content = _python_module(100)
+    chunks = split_source(content, "module.py", max_tokens=300)
+    parts = [clean_chunk_code(f"```python\n{c.text}```") for c in chunks]
+    assert stitch_code(parts, chunks) == content
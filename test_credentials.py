@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests du fournisseur de clés API (cache en mémoire, clé externe).
+"""
+
+import pytest
+from cryptography.fernet import InvalidToken
+
+import mistral_cli.credentials as credentials
+from mistral_cli.credentials import CredentialProvider
+from mistral_cli.models import MistralAgent
+
+def test_key_file_read_once(tmp_path, monkeypatch):
+    """La clé de chiffrement est lue une fois ; les déchiffrements suivants viennent du cache."""
+    reads = []
+    original = credentials.generate_or_load_key
+    monkeypatch.setattr(credentials, "generate_or_load_key", lambda f: reads.append(f) or original(f))
+    provider = CredentialProvider(str(tmp_path / "secret.key"))
+    token = provider.encrypt("sk-test")
+
+    fresh = CredentialProvider(str(tmp_path / "secret.key"))
+    assert fresh.decrypt(token) == "sk-test"
+    assert fresh.decrypt(token) == "sk-test"
+    assert len(reads) == 2  # Une lecture par fournisseur
+
+def test_invalidate_reloads_key(tmp_path):
+    """Après invalidation, un jeton chiffré avec l'ancienne clé n'est plus servi du cache."""
+    key_file = tmp_path / "secret.key"
+    provider = CredentialProvider(str(key_file))
+    token = provider.encrypt("sk-test")
+    key_file.unlink()
+    provider.invalidate()
+    with pytest.raises(InvalidToken):
+        provider.decrypt(token)
+
+def test_agent_falls_back_to_environment(monkeypatch):
+    """Un agent sans clé stockée utilise MISTRAL_API_KEY."""
+    monkeypatch.setenv("MISTRAL_API_KEY", "sk-env")
+    agent = MistralAgent(id="m", name="m", model="m")
+    assert agent.api_key == "sk-env"
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests du cache disque utilisé pour les réponses de l'API Mistral.
+"""
+
+import os
+import time
+from mistral_cli.disk_cache import DiskCache
+from mistral_cli.tools.file_analyzer.response_cache import completion_cache_key
+
+def test_get_set(tmp_path):
+    """Une valeur enregistrée est relue à l'identique."""
+    cache = DiskCache(str(tmp_path))
+    key = DiskCache.make_key("contenu", "general", "mistral-large-latest", 0.3, 2000)
+    assert cache.get(key) is None
+    cache.set(key, "analyse")
+    assert cache.get(key) == "analyse"
+
+def test_disabled_cache(tmp_path):
+    """Un cache désactivé n'écrit ni ne relit rien."""
+    cache = DiskCache(str(tmp_path), enabled=False)
+    cache.set("abc", "valeur")
+    assert cache.get("abc") is None
+    assert not os.listdir(tmp_path)
+
+def test_ttl_expiration(tmp_path):
+    """Les entrées plus vieilles que le TTL sont ignorées."""
+    cache = DiskCache(str(tmp_path), ttl=0.05)
+    cache.set("abc", "valeur")
+    time.sleep(0.1)
+    assert cache.get("abc") is None
+
+def test_lru_eviction(tmp_path):
+    """Les entrées les moins récemment lues sont évincées en premier."""
+    cache = DiskCache(str(tmp_path), max_bytes=700)
+    cache.set("aa1", "x" * 150)
+    cache.set("bb2", "y" * 150)
+    os.utime(cache._path("aa1"), (time.time() - 100, time.time() - 100))
+    os.utime(cache._path("bb2"), (time.time() - 50, time.time() - 50))
+    assert cache.get("aa1") is not None  # aa1 redevient la plus récente
+    cache.set("cc3", "z" * 150)
+    cache.set("dd4", "w" * 150)
+    assert cache.get("bb2") is None
+    assert cache.get("aa1") is not None
+
+def test_completion_key_depends_on_parameters():
+    """La clé change avec le contenu, le modèle, la température ou max_tokens."""
+    data = {
+        "model": "mistral-large-latest",
+        "messages": [{"role": "user", "content": "print(1)"}],
+        "max_tokens": 2000,
+        "temperature": 0.3
+    }
+    base = completion_cache_key(data)
+    assert base == completion_cache_key(dict(data))
+    for field, value in [("model", "mistral-small"), ("max_tokens", 4000), ("temperature", 0.1),
+                         ("messages", [{"role": "user", "content": "print(2)"}])]:
+        assert completion_cache_key(dict(data, **{field: value})) != base
@@ -6,7 +6,7 @@ Script de test pour les outils d'analyse de fichiers.
 import os
 import sys
 import json
-from mistral_cli.cli import Context
+from mistral_cli.context import Context
 from mistral_cli.tools.file_analyzer.file_reader import FileAnalyzer
 
 def test_file_analyzer():
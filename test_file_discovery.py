@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests du parcours de fichiers partagé par les commandes sur dossiers.
+"""
+
+import os
+from mistral_cli.tools.file_analyzer.file_discovery import iter_files
+
+def _write(root, rel_path, content="x"):
+    path = os.path.join(root, *rel_path.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+def _found(root, patterns=None, recursive=True):
+    return [os.path.relpath(f.path, root).replace(os.sep, "/")
+            for f in iter_files(str(root), patterns, recursive)]
+
+def test_patterns_and_default_ignored_dirs(tmp_path):
+    """Les patterns filtrent les fichiers ; dossiers cachés et de build sont ignorés."""
+    for rel_path in ["a.py", "b.js", "c.txt", "src/d.py", "node_modules/e.js",
+                     ".git/f.py", "venv/g.py", "src/__pycache__/h.py"]:
+        _write(tmp_path, rel_path)
+    assert _found(tmp_path, ["*.py", "*.js"]) == ["a.py", "b.js", "src/d.py"]
+
+def test_non_recursive(tmp_path):
+    """Sans récursion, seuls les fichiers du dossier racine sont listés."""
+    _write(tmp_path, "a.py")
+    _write(tmp_path, "src/b.py")
+    assert _found(tmp_path, ["*.py"], recursive=False) == ["a.py"]
+
+def test_stat_information(tmp_path):
+    """Taille et date de modification proviennent du parcours."""
+    _write(tmp_path, "a.py", "12345")
+    found = list(iter_files(str(tmp_path), ["*.py"]))
+    assert found[0].size == 5
+    assert found[0].mtime == os.path.getmtime(found[0].path)
+
+def test_gitignore_rules(tmp_path):
+    """Règles .gitignore : globs, dossiers, ancrage et négation."""
+    _write(tmp_path, ".gitignore", "*.gen.py\n/generated/\nlogs/\n!keep.gen.py\n# commentaire\n")
+    for rel_path in ["a.py", "b.gen.py", "keep.gen.py", "generated/c.py",
+                     "src/generated/d.py", "src/logs/e.py", "src/f.gen.py"]:
+        _write(tmp_path, rel_path)
+    assert _found(tmp_path, ["*.py"]) == ["a.py", "keep.gen.py", "src/generated/d.py"]
+
+def test_nested_mistralignore(tmp_path):
+    """Un .mistralignore de sous-dossier ne s'applique qu'à ce sous-dossier."""
+    _write(tmp_path, "src/.mistralignore", "legacy_*.py\n")
+    for rel_path in ["legacy_a.py", "src/legacy_b.py", "src/c.py"]:
+        _write(tmp_path, rel_path)
+    assert _found(tmp_path, ["*.py"]) == ["legacy_a.py", "src/c.py"]
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests de la session HTTP partagée (dimensionnement des pools de connexions).
+"""
+
+from mistral_cli import http_client
+
+def _adapter_sizes(session):
+    adapter = session.get_adapter("https://api.mistral.ai")
+    return adapter._pool_connections, adapter._pool_maxsize
+
+def test_configure_pool_only_grows(monkeypatch):
+    """Un traitement qui demande moins de connexions ne réduit pas le pool des autres."""
+    monkeypatch.setattr(http_client, "_session", None)
+    monkeypatch.setattr(http_client, "_pool_connections", 4)
+    monkeypatch.setattr(http_client, "_pool_maxsize", 16)
+    session = http_client.get_session()
+    try:
+        assert _adapter_sizes(session) == (4, 16)
+
+        http_client.configure_pool(pool_maxsize=32)
+        assert _adapter_sizes(session) == (4, 32)  # Adaptateur remplacé sur la session existante
+
+        adapter = session.get_adapter("https://api.mistral.ai")
+        http_client.configure_pool(pool_connections=2, pool_maxsize=8)
+        assert session.get_adapter("https://api.mistral.ai") is adapter  # Rien à agrandir
+        assert (http_client._pool_connections, http_client._pool_maxsize) == (4, 32)
+
+        http_client.configure_pool(pool_connections=10)
+        assert _adapter_sizes(session) == (10, 32)
+        assert http_client.get_session() is session
+    finally:
+        session.close()
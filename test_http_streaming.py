@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests de la lecture des réponses en streaming (Server-Sent Events).
+"""
+
+import json
+from mistral_cli.http_client import iter_sse_data, iter_chat_deltas
+
+class FakeResponse:
+    """Réponse minimale : en-têtes et lignes brutes comme requests avec stream=True."""
+
+    def __init__(self, lines, content_type="text/event-stream", body=None):
+        self.headers = {"Content-Type": content_type}
+        self._lines = lines
+        self._body = body
+
+    def iter_lines(self, chunk_size=512):
+        return iter(self._lines)
+
+    def json(self):
+        return self._body
+
+def _event(content):
+    return f"data: {json.dumps({'choices': [{'delta': {'content': content}}]})}".encode()
+
+def test_sse_events():
+    """Commentaires ignorés, lignes data multiples jointes, événement final sans ligne vide."""
+    lines = [b": keep-alive", b"data: a", b"data: b", b"", b"event: x", b"data:c"]
+    assert list(iter_sse_data(FakeResponse(lines))) == ["a\nb", "c"]
+
+def test_chat_deltas_until_done():
+    """Les fragments sont produits dans l'ordre et le flux s'arrête à [DONE]."""
+    lines = [_event("Bon"), b"", _event("jour"), b"", _event(None), b"", b"data: [DONE]", b"", _event("x"), b""]
+    assert list(iter_chat_deltas(FakeResponse(lines))) == ["Bon", "jour"]
+
+def test_non_streaming_fallback():
+    """Une réponse JSON classique donne le contenu complet en une fois."""
+    body = {"choices": [{"message": {"content": [{"type": "text", "text": "réponse"}]}}]}
+    assert list(iter_chat_deltas(FakeResponse([], "application/json", body))) == ["réponse"]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests des linters « à chaud » (workers persistants, flake8 dans le processus).
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+from mistral_cli.linter_workers import (
+    ESLINT_WORKER_SCRIPT, WorkerError, WorkerPool, WorkerProcess, eslint_config_fingerprint, has_flake8_config,
+    lint_python_in_process
+)
+
+# Worker de test : met le code en majuscules, dort si demandé, refuse "fatal"
+ECHO_WORKER = (
+    "import json, sys, time\n"
+    "for line in sys.stdin:\n"
+    "    request = json.loads(line)\n"
+    "    time.sleep(request.get('sleep', 0))\n"
+    "    if request['code'] == 'fatal':\n"
+    "        reply = {'id': request['id'], 'error': 'linter introuvable', 'fatal': True}\n"
+    "    else:\n"
+    "        reply = {'id': request['id'], 'output': request['code'].upper()}\n"
+    "    print(json.dumps(reply), flush=True)\n"
+)
+
+def _echo_worker(timeout=10.0):
+    return WorkerProcess([sys.executable, "-c", ECHO_WORKER], timeout=timeout)
+
+def test_worker_stays_warm():
+    """Les requêtes successives sont servies par le même processus."""
+    worker = _echo_worker()
+    try:
+        assert worker.request({"code": "a"})["output"] == "A"
+        pid = worker.pid
+        assert worker.request({"code": "b"})["output"] == "B"
+        assert worker.pid == pid
+    finally:
+        worker.close()
+
+def test_stuck_worker_is_restarted():
+    worker = _echo_worker(timeout=0.3)
+    try:
+        with pytest.raises(WorkerError):
+            worker.request({"code": "a", "sleep": 2})
+        assert worker.pid is None
+        assert worker.request({"code": "b"})["output"] == "B"  # Nouveau processus
+    finally:
+        worker.close()
+
+def test_fatal_error_disables_pool():
+    pool = WorkerPool(_echo_worker, size=1)
+    try:
+        with pytest.raises(WorkerError):
+            pool.request({"code": "fatal"})
+        assert pool.error == "linter introuvable"
+        with pytest.raises(WorkerError):
+            pool.request({"code": "a"})  # Pas de nouvel essai
+    finally:
+        pool.close()
+
+def test_python_lint_in_process():
+    """Même format que flake8 (fichier:ligne:colonne: code message), sans lancer de processus."""
+    pytest.importorskip("pyflakes")
+    pytest.importorskip("pycodestyle")
+    report = lint_python_in_process("import os\nx = 1;\n", "snippet.py")
+    assert report.stdout.splitlines()[0].startswith("snippet.py:1:1: F")
+    assert "snippet.py:2:6: E703 statement ends with a semicolon" in report.stdout
+
+def test_flake8_config_is_detected(tmp_path):
+    (tmp_path / "setup.cfg").write_text("[metadata]\nname = x\n")
+    assert not has_flake8_config(str(tmp_path))
+    (tmp_path / "tox.ini").write_text("[flake8]\nmax-line-length = 120\n")
+    assert has_flake8_config(str(tmp_path))
+
+# Faux module ESLint : compte les moteurs créés
+FAKE_ESLINT = (
+    "let created = 0;\n"
+    "class ESLint {\n"
+    "  constructor() { this.engine = ++created; }\n"
+    "  async loadFormatter() { return { format: () => `moteur ${this.engine}` }; }\n"
+    "  async lintText() { return []; }\n"
+    "}\n"
+    "module.exports = { ESLint };\n"
+)
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node absent")
+def test_eslint_worker_reloads_changed_config(tmp_path):
+    package = tmp_path / "node_modules" / "eslint"
+    package.mkdir(parents=True)
+    (package / "index.js").write_text(FAKE_ESLINT)
+    project = tmp_path / "project"
+    project.mkdir()
+    worker = WorkerProcess(["node", ESLINT_WORKER_SCRIPT],
+                           env=dict(os.environ, MISTRAL_ESLINT_PATH=str(tmp_path / "node_modules")))
+
+    def lint():
+        return worker.request({"code": "x", "cwd": str(project),
+                               "config": eslint_config_fingerprint(str(project))})["output"]
+
+    try:
+        assert lint() == lint() == "moteur 1"
+        (project / ".eslintrc.json").write_text('{"rules": {"semi": "error"}}')
+        assert lint() == "moteur 2"
+        assert lint() == "moteur 2"
+    finally:
+        worker.close()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests du manifeste des traitements incrémentaux (fichiers inchangés, modifiés, supprimés).
+"""
+
+import os
+
+from mistral_cli.tools.file_analyzer.batch_processor import process_file
+from mistral_cli.tools.file_analyzer.manifest import FileManifest
+
+def _lookup(manifest, path):
+    stat = os.stat(path)
+    return manifest.lookup(str(path), stat.st_size, stat.st_mtime)
+
+def test_unchanged_touched_and_modified_files(tmp_path):
+    """Taille et date identiques : résultat repris ; date seule modifiée : le hash tranche."""
+    source = tmp_path / "a.py"
+    source.write_text("x = 1\n")
+    manifest = FileManifest("run", str(tmp_path / "manifests"))
+    manifest.record(str(source), {"file_path": str(source), "analysis": "ok"})
+    manifest.save()
+
+    manifest = FileManifest("run", str(tmp_path / "manifests"))
+    assert _lookup(manifest, source) == {"file_path": str(source), "analysis": "ok"}
+
+    stat = os.stat(source)
+    os.utime(source, (stat.st_atime, stat.st_mtime + 10))  # Fichier touché, contenu identique
+    assert _lookup(manifest, source)["analysis"] == "ok"
+
+    source.write_text("x = 2\n")  # Même taille, contenu différent
+    os.utime(source, (stat.st_atime, stat.st_mtime + 20))
+    assert _lookup(manifest, source) is None
+
+def test_save_prunes_files_not_seen(tmp_path):
+    kept, removed = tmp_path / "kept.py", tmp_path / "removed.py"
+    for path in (kept, removed):
+        path.write_text("pass\n")
+    manifest = FileManifest("run", str(tmp_path / "manifests"))
+    manifest.record(str(kept), {"analysis": "kept"})
+    manifest.record(str(removed), {"analysis": "removed"})
+    manifest.save()
+    removed_result = manifest.entries[os.path.abspath(removed)]["result"]
+
+    # Passage suivant : removed.py a disparu du dossier et n'est pas rencontré
+    manifest = FileManifest("run", str(tmp_path / "manifests"))
+    assert _lookup(manifest, kept)["analysis"] == "kept"
+    manifest.save(prune=False)  # Traitement interrompu : rien n'est retiré
+    assert os.path.abspath(removed) in FileManifest("run", str(tmp_path / "manifests")).entries
+    manifest.save()
+    assert list(FileManifest("run", str(tmp_path / "manifests")).entries) == [os.path.abspath(kept)]
+    assert not os.path.exists(os.path.join(manifest.results_dir, removed_result))
+
+class _Analyzer:
+    def __init__(self, analysis):
+        self.analysis = analysis
+
+    def read_file_content(self, file_path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def analyze_file(self, file_path, content, analysis_type, apply_improvements=False):
+        return {"analysis": self.analysis, "suggestions": "", "improvements_applied": False, "chunks": 1}
+
+def test_failed_analysis_is_not_recorded(tmp_path):
+    """Une erreur de l'API n'est pas mémorisée : le fichier sera retenté au prochain passage."""
+    source = tmp_path / "a.py"
+    source.write_text("x = 1\n")
+    manifest = FileManifest("run", str(tmp_path / "manifests"))
+
+    result, error = process_file(_Analyzer("Erreur lors de l'analyse: 503"), str(source), "general", False, manifest)
+    assert error is None and result["analysis"].startswith("Erreur")
+    assert manifest.entries == {}
+
+    process_file(_Analyzer("RAS"), str(source), "general", False, manifest)
+    assert _lookup(manifest, source)["analysis"] == "RAS"
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests du moteur de pipelines (graphe d'étapes, parallélisme, cache des modules).
+"""
+
+import json
+import time
+import pytest
+from mistral_cli.disk_cache import DiskCache
+from mistral_cli.models import Pipeline, PipelineStep
+from mistral_cli.pipeline_engine import PipelineEngine, load_tool, resolve_dependencies
+
+def _step(server, step_type="fake", **kwargs):
+    return PipelineStep(step_type=step_type, server=server, action="run", **kwargs)
+
+def _fake_runner(step, input_text):
+    """Étape de test : attend `delay` secondes puis préfixe son entrée."""
+    time.sleep(step.params.get("delay", 0))
+    if step.params.get("fail"):
+        raise RuntimeError("échec")
+    return f"{step.server}({input_text})"
+
+def test_sequential_by_default():
+    """Sans depends_on, chaque étape reçoit la sortie de la précédente."""
+    pipeline = Pipeline(name="p", steps=[_step("a"), _step("b")])
+    run = PipelineEngine({"fake": _fake_runner}).run(pipeline, "x")
+    assert run["output"] == "b(a(x))"
+    assert "⏱️ Durée totale" in run["reasoning"][-1]
+
+def test_independent_steps_run_in_parallel():
+    """Deux branches de 0,3 s suivies d'une fusion prennent ~0,3 s, pas 0,6 s."""
+    pipeline = Pipeline(name="p", steps=[
+        _step("lint", id="lint", depends_on=[], params={"delay": 0.3}),
+        _step("scan", id="scan", depends_on=[], params={"delay": 0.3}),
+        _step("merge", depends_on=["lint", "scan"])
+    ])
+    run = PipelineEngine({"fake": _fake_runner}).run(pipeline, "x")
+    assert run["elapsed"] < 0.55
+    assert run["output"] == "merge(### lint\nlint(x)\n\n### scan\nscan(x))"
+
+def test_failed_step_passes_input_through():
+    pipeline = Pipeline(name="p", steps=[_step("a", params={"fail": True}), _step("b")])
+    run = PipelineEngine({"fake": _fake_runner}).run(pipeline, "x")
+    assert run["output"] == "b(x)"
+    assert any("❌ Erreur avec a: échec" in line for line in run["reasoning"])
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError):
+        resolve_dependencies(Pipeline(name="p", steps=[_step("a", depends_on=["inconnue"])]))
+    with pytest.raises(ValueError):
+        resolve_dependencies(Pipeline(name="p", steps=[
+            _step("a", id="a", depends_on=["b"]), _step("b", id="b", depends_on=["a"])
+        ]))
+
+def test_tool_modules_are_cached():
+    """Les outils sont résolus sous mistral_cli.tools et importés une seule fois."""
+    module = load_tool("python/py_linter")
+    assert module.__name__ == "mistral_cli.tools.python.py_linter"
+    assert load_tool("python/py_linter") is module
+
+def test_step_results_are_memoized(tmp_path):
+    """Une étape déjà exécutée sur la même entrée n'est pas relancée, sauf si elle s'exclut du cache."""
+    calls = []
+
+    def counting_runner(step, input_text):
+        calls.append(step.server)
+        return "Erreur: outil absent" if step.server == "broken" else f"{step.server}({input_text})"
+
+    pipeline = Pipeline(name="p", steps=[
+        _step("slow"), _step("random", cache=False), _step("broken", depends_on=[])
+    ])
+    engine = PipelineEngine({"fake": counting_runner}, cache=DiskCache(str(tmp_path)))
+    engine.run(pipeline, "x")
+    run = engine.run(pipeline, "x")
+    assert calls.count("slow") == 1
+    assert calls.count("random") == 2 and calls.count("broken") == 2  # Opt-out et erreurs non mémorisés
+    assert any("slow (run) — " in line and "(en cache)" in line for line in run["reasoning"])
+    engine.run(pipeline, "y")
+    assert calls.count("slow") == 2  # Entrée différente : nouvelle exécution
+
+def test_map_runs_pipeline_on_each_file(tmp_path):
+    """Chaque fichier du dossier passe dans le pipeline ; une ligne par fichier dans le rapport."""
+    (tmp_path / "src").mkdir()
+    for name in ("a.py", "b.py", "src/c.py"):
+        (tmp_path / name).write_text(name)
+    (tmp_path / "notes.txt").write_text("ignoré")
+    pipeline = Pipeline(name="audit", steps=[_step("lint", params={"delay": 0.2}), _step("report")])
+    report = tmp_path / "report.jsonl"
+
+    summary = PipelineEngine({"fake": _fake_runner}).map(
+        pipeline, str(tmp_path), ["*.py"], max_concurrency=3, report_path=str(report)
+    )
+    assert summary["processed_files"] == 3 and summary["errors_count"] == 0
+    assert summary["elapsed"] < 1.0  # 3 fichiers × 0,2 s en parallèle
+    records = [json.loads(line) for line in report.read_text().splitlines()]
+    assert sorted(r["output"] for r in records) == ["report(lint(a.py))", "report(lint(b.py))",
+                                                    "report(lint(src/c.py))"]
+    assert all(r["steps"]["step1"]["ok"] for r in records)
+
+def test_step_key_follows_project_files(tmp_path):
+    """Un outil qui lit un dossier est relancé quand ses fichiers changent ; tests non mémorisés par défaut."""
+    (tmp_path / "test_a.py").write_text("def test_a():\n    pass\n")
+    engine = PipelineEngine(cache=DiskCache(str(tmp_path / "cache")))
+    step = _step("python/py_test_runner", step_type="python", params={"directory": str(tmp_path)})
+    key = engine.step_cache_key(step, "")
+    (tmp_path / "test_a.py").write_text("def test_a():\n    assert 0\n")
+    assert engine.step_cache_key(step, "") != key
+
+    assert not engine.step_cacheable(step)
+    assert engine.step_cacheable(_step("python/py_test_runner", step_type="python", cache=True))
+    assert engine.step_cacheable(_step("python/py_linter", step_type="python"))
+    # Contenu analysé impossible à calculer (projet Flutter non pris en charge) : jamais mémorisé
+    assert engine.step_cache_key(_step("mobile/flutter/flutter_analyzer", step_type="python"), "") is None
+
+def test_map_runs_process_steps_in_worker_processes(tmp_path):
+    """Une étape Python "executor": "process" reçoit le fichier et son contenu dans un autre processus."""
+    (tmp_path / "a.py").write_text("x = 1\n")
+    pipeline = Pipeline(name="lint", steps=[
+        _step("python/py_linter", step_type="python", executor="process")
+    ])
+    summary = PipelineEngine(base_data={"use_cache": False}).map(
+        pipeline, str(tmp_path), ["*.py"], report_path=str(tmp_path / "report.jsonl"), process_workers=1)
+    [record] = summary["detailed_results"]
+    assert record["file_path"].endswith("a.py")
+    assert record["steps"]["step1"]["ok"]
+    assert record["output"].startswith(("Rapport flake8", "Erreur"))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests du cache des résultats de linters et d'analyseurs de sécurité.
+"""
+
+import types
+
+import pytest
+from mistral_cli import result_cache
+from mistral_cli.batch_lint import lint_files
+from mistral_cli.context import Context
+from mistral_cli.disk_cache import DiskCache
+from mistral_cli.result_cache import execute_cached, result_key
+from mistral_cli.tool_registry import ToolRegistry, ToolSpec
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = DiskCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(result_cache, "_result_cache", cache)
+    return cache
+
+def test_key_changes_with_binary_version_and_config(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "binary_version", lambda binary: "rubocop 1.60")
+    key = result_key("ruby/ruby_linter", "rubocop", "abc")
+    assert result_key("ruby/ruby_linter", "rubocop", "abc") == key
+
+    (tmp_path / ".rubocop.yml").write_text("Style/StringLiterals:\n  Enabled: false\n")
+    with_config = result_key("ruby/ruby_linter", "rubocop", "abc")
+    assert with_config != key
+
+    monkeypatch.setattr(result_cache, "binary_version", lambda binary: "rubocop 1.61")
+    assert result_key("ruby/ruby_linter", "rubocop", "abc") != with_config
+
+def test_identical_input_is_served_from_cache(cache):
+    calls = []
+
+    def execute(context):
+        calls.append(context.data["input"])
+        context.data["output"] = "Rapport Bandit:\nRAS" if context.data["input"] else "Erreur: entrée vide"
+        return context
+
+    module = types.SimpleNamespace(execute=execute)
+    spec = ToolSpec("python/py_security_scanner", "m", "python", "security", binary="bandit",
+                    input_mode="input", params=["input"])
+
+    for _ in range(2):
+        context = execute_cached(spec, module, Context(data={"input": "x = 1\n"}))
+        assert context.data["output"] == "Rapport Bandit:\nRAS"
+    execute_cached(spec, module, Context(data={"input": "x = 2\n"}))
+    assert calls == ["x = 1\n", "x = 2\n"]
+
+    # Les erreurs ne sont pas mémorisées, et use_cache=False appelle toujours l'outil
+    execute_cached(spec, module, Context(data={"input": ""}))
+    execute_cached(spec, module, Context(data={"input": ""}))
+    execute_cached(spec, module, Context(data={"input": "x = 1\n", "use_cache": False}))
+    assert calls == ["x = 1\n", "x = 2\n", "", "", "x = 1\n"]
+
+def test_batch_lint_only_relints_changed_files(cache, tmp_path):
+    pytest.importorskip("pyflakes")
+    pytest.importorskip("pycodestyle")
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"m{i}.py"
+        path.write_text("import os\n")
+        paths.append(str(path))
+
+    first = lint_files(paths, cache=cache)
+    second = lint_files(paths, cache=cache)
+    assert first.cached_files == 0 and second.cached_files == 3
+    assert second.diagnostics == first.diagnostics
+
+    (tmp_path / "m1.py").write_text("import os\nimport sys\n")
+    third = lint_files(paths, cache=cache)
+    assert third.cached_files == 2
+    assert len(third.diagnostics) == 4
+
+def test_key_follows_tool_extra_and_dependencies(cache, tmp_path):
+    calls, versions = [], ["pyflakes 3.1"]
+
+    def execute(context):
+        calls.append(versions[0])
+        context.data["output"] = "Rapport flake8:\n"
+        return context
+
+    module = types.SimpleNamespace(execute=execute, cache_extra=lambda: versions[0])
+    spec = ToolSpec("python/py_linter", "m", "python", "linter", input_mode="input", params=["input"])
+    execute_cached(spec, module, Context(data={"input": "x = 1\n"}), "v1")
+    execute_cached(spec, module, Context(data={"input": "x = 1\n"}), "v1")
+    versions[0] = "pyflakes 3.2"
+    execute_cached(spec, module, Context(data={"input": "x = 1\n"}), "v1")
+    assert calls == ["pyflakes 3.1", "pyflakes 3.2"]
+
+    # Le code listé dans CACHE_DEPENDENCIES entre dans la version de l'outil
+    (tmp_path / "tool.py").write_text("def execute(context):\n    return context\n")
+    (tmp_path / "workers.py").write_text("A = 1\n")
+    tool = types.SimpleNamespace(__file__=str(tmp_path / "tool.py"), CACHE_DEPENDENCIES=(str(tmp_path / "workers.py"),))
+
+    def version():
+        registry = ToolRegistry(str(tmp_path / "absent.json"), entry_points=False)
+        registry._modules["x/tool"] = tool
+        return registry.version("x/tool")
+
+    before = version()
+    (tmp_path / "workers.py").write_text("A = 2\n")
+    assert version() != before
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests de l'ordonnanceur des requêtes vers l'API Mistral.
+"""
+
+import mistral_cli.scheduler as scheduler
+from mistral_cli.scheduler import RequestScheduler, TokenBucket, parse_retry_after
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+    def json(self):
+        return {"usage": {"total_tokens": 10}}
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        return self.responses.pop(0)
+
+def _scheduler(monkeypatch, responses, **kwargs):
+    session = FakeSession(responses)
+    sleeps = []
+    monkeypatch.setattr(scheduler, "get_session", lambda: session)
+    monkeypatch.setattr(scheduler.time, "sleep", sleeps.append)
+    return RequestScheduler(requests_per_second=1000, **kwargs), session, sleeps
+
+def test_token_bucket_waits_when_empty():
+    """Au-delà de la capacité, chaque réservation attend le temps de recharge."""
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0 and bucket.reserve() == 0
+    assert 0.09 <= bucket.reserve() <= 0.1
+
+def test_retry_after_is_respected(monkeypatch):
+    """Une réponse 429 avec Retry-After est retentée après le délai indiqué."""
+    sched, session, sleeps = _scheduler(monkeypatch, [FakeResponse(429, {"Retry-After": "3"}), FakeResponse(200)])
+    response = sched.post("https://api/x", json={"messages": [], "max_tokens": 5})
+    assert response.status_code == 200 and session.calls == 2
+    assert 3 in sleeps
+
+def test_backoff_gives_up_after_max_retries(monkeypatch):
+    """Après max_retries, la dernière réponse en erreur est renvoyée."""
+    sched, session, sleeps = _scheduler(monkeypatch, [FakeResponse(503)] * 3, max_retries=2, base_delay=1)
+    assert sched.get("https://api/x").status_code == 503
+    assert session.calls == 3
+    assert all(0 <= s <= 2 for s in sleeps)
+
+def test_no_server_error_retry_for_creations(monkeypatch):
+    """Une création n'est pas rejouée sur une erreur 5xx."""
+    sched, session, _ = _scheduler(monkeypatch, [FakeResponse(500), FakeResponse(200)])
+    assert sched.post("https://api/agents", json={"name": "a"}, retry_server_errors=False).status_code == 500
+    assert session.calls == 1
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after(None) is None
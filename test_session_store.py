@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests de l'index et des journaux de sessions.
+"""
+
+import json
+import os
+from mistral_cli.session_store import SessionStore
+from mistral_cli.models import ChatSession
+from mistral_cli.context import Context
+
+def _session(session_id, messages=0, agent="model-mistral-small"):
+    return ChatSession(session_id=session_id, context=Context(current_agent=agent),
+                       history=[{"input": "q", "output": "r"}] * messages)
+
+def test_list_from_index_without_reading_sessions(tmp_path, monkeypatch):
+    """Une fois l'index écrit, la liste ne relit aucun fichier de session."""
+    store = SessionStore(str(tmp_path))
+    store.save(_session("20250101_100000", 3))
+    store.save(_session("20250102_100000"))
+
+    fresh = SessionStore(str(tmp_path))
+    monkeypatch.setattr(fresh, "_read", lambda session_id: (_ for _ in ()).throw(AssertionError(session_id)))
+    assert [s["session_id"] for s in fresh.list()] == ["20250102_100000", "20250101_100000"]
+    assert fresh.list(1)[0]["messages"] == 0
+    assert fresh.list()[1] == {"session_id": "20250101_100000", "agent": "model-mistral-small",
+                               "pipeline": None, "messages": 3}
+
+def test_reconcile_with_directory(tmp_path):
+    """Les sessions écrites sans l'index (ancien format compris) sont ajoutées ; les fichiers supprimés en sortent."""
+    store = SessionStore(str(tmp_path))
+    store.save(_session("20250101_100000"))
+    with open(tmp_path / "20250103_100000.json", "w", encoding="utf-8") as f:
+        json.dump([_session("20250103_100000", 2).model_dump()], f)
+    os.remove(tmp_path / "20250101_100000.jsonl")
+
+    fresh = SessionStore(str(tmp_path))
+    assert [s["session_id"] for s in fresh.list()] == ["20250103_100000"]
+    assert len(fresh.load("20250103_100000").history) == 2
+
+def test_record_appends_one_line_per_message(tmp_path):
+    """Chaque message ajoute une ligne ; un changement d'agent ajoute un enregistrement de contexte."""
+    store = SessionStore(str(tmp_path))
+    session = _session("20250101_100000")
+    store.record(session)
+    session.history.append({"input": "q1", "output": "r1"})
+    store.record(session)
+    session.context.current_agent = "ag_1"
+    session.history.append({"input": "q2", "output": "r2"})
+    store.record(session)
+    store.record(session)  # Rien de nouveau : aucune écriture
+
+    with open(tmp_path / "20250101_100000.jsonl", encoding="utf-8") as f:
+        assert [json.loads(line)["type"] for line in f] == ["session", "message", "context", "message"]
+    loaded = SessionStore(str(tmp_path)).load("20250101_100000")
+    assert loaded.context.current_agent == "ag_1"
+    assert [m["input"] for m in loaded.history] == ["q1", "q2"]
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    """Après un arrêt en pleine écriture, la session se recharge et le journal reste utilisable."""
+    store = SessionStore(str(tmp_path))
+    session = _session("20250101_100000", 1)
+    store.save(session)
+    with open(tmp_path / "20250101_100000.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"type": "message", "mess')
+
+    fresh = SessionStore(str(tmp_path))
+    loaded = fresh.load("20250101_100000")
+    assert len(loaded.history) == 1
+    loaded.history.append({"input": "q", "output": "r"})
+    fresh.record(loaded)
+    assert len(SessionStore(str(tmp_path)).load("20250101_100000").history) == 2
+
+def test_compaction(tmp_path, monkeypatch):
+    """Les contextes périmés déclenchent la réécriture compacte du journal."""
+    monkeypatch.setattr("mistral_cli.session_store.COMPACT_AFTER", 3)
+    store = SessionStore(str(tmp_path))
+    session = _session("20250101_100000")
+    store.record(session)
+    for i in range(5):
+        session.context.current_agent = f"ag_{i}"
+        store.record(session)
+    with open(tmp_path / "20250101_100000.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) < 5
+    assert SessionStore(str(tmp_path)).load("20250101_100000").context.current_agent == "ag_4"
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests du temps de démarrage : les outils et `--version` ne chargent pas l'interface.
+"""
+
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["rich", "pydantic", "requests", "cryptography", "readline", "mistral_cli.cli"]
+IMPORT_BUDGET = 0.15  # secondes, large marge par rapport aux ~20 ms mesurées
+
+def _import_in_fresh_interpreter(module: str) -> dict:
+    """Importe `module` dans un nouvel interpréteur ; retourne la durée et les modules lourds chargés."""
+    code = (
+        "import json, sys, time\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - t\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+def test_tool_import_is_light():
+    """Un outil de lint ne tire ni l'interface ni ses dépendances."""
+    for module in ["mistral_cli.tools.python.py_linter", "mistral_cli.context"]:
+        measure = _import_in_fresh_interpreter(module)
+        assert measure["heavy"] == [], module
+        assert measure["elapsed"] < IMPORT_BUDGET, module
+
+def test_version_does_not_load_cli():
+    """`mistral-cli --version` répond sans importer l'interface."""
+    code = (
+        "import sys\n"
+        "sys.argv = ['mistral-cli', '--version']\n"
+        "from mistral_cli.__main__ import main\n"
+        "main()\n"
+        "assert 'mistral_cli.cli' not in sys.modules and 'rich' not in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith("mistral-cli ")
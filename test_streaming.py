@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests du traitement en flux (ordre des résultats, anticipation bornée, interruption, rapports JSONL).
+"""
+
+import random
+import threading
+import time
+
+import pytest
+from mistral_cli.tools.file_analyzer.streaming import JsonlReportWriter, ordered_map, read_report
+
+def test_ordered_map_keeps_order_with_bounded_lookahead():
+    consumed = []
+
+    def items():
+        for i in range(40):
+            consumed.append(i)
+            yield i
+
+    def slow_square(i):
+        time.sleep(random.uniform(0, 0.01))
+        return i * i
+
+    results = []
+    for result in ordered_map(slow_square, items(), max_concurrency=3):
+        results.append(result)
+        # Au plus 2 × max_concurrency éléments lus d'avance
+        assert len(consumed) - len(results) <= 6
+    assert results == [i * i for i in range(40)]
+
+def test_ordered_map_cancels_pending_calls_on_interrupt():
+    """Ctrl+C pendant la lecture : les appels pas encore démarrés ne sont jamais lancés."""
+    release = threading.Event()
+    started = []
+
+    def items():
+        yield from range(3)
+        raise KeyboardInterrupt
+
+    def wait(i):
+        started.append(i)
+        release.wait(5)
+        return i
+
+    timer = threading.Timer(0.3, release.set)  # Laisse les deux appels en cours se terminer
+    timer.start()
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            list(ordered_map(wait, items(), max_concurrency=2))
+    finally:
+        timer.cancel()
+        release.set()
+    assert sorted(started) == [0, 1]
+
+def test_read_report_skips_truncated_last_line(tmp_path):
+    path = str(tmp_path / "report.jsonl")
+    with JsonlReportWriter(path) as report:
+        report.write({"file_path": "a.py", "analysis": "ok"})
+        report.write({"file_path": "b.py", "analysis": "ok"})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"file_path": "c.py", "anal')  # Arrêt brutal en pleine écriture
+    assert [record["file_path"] for record in read_report(path)] == ["a.py", "b.py"]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests de l'exécution parallèle des suites de tests (shards, rapports, historique des durées).
+"""
+
+import json
+
+import pytest
+
+from mistral_cli import suite_runner
+from mistral_cli.context import Context
+from mistral_cli.suite_runner import (GoTestRunner, JestRunner, NodeTestRunner, PytestRunner, SuiteRunner,
+                                      TestHistory, TestResult, execute_suite, order_units, parse_junit, plan_shards, run_suite, suite_report)
+
+def test_slowest_units_are_scheduled_first_and_balanced():
+    durations = {"a.py": 1.0, "b.py": 8.0, "c.py": 3.0, "d.py": 4.0}
+    units = order_units(["a.py", "b.py", "c.py", "d.py", "new.py"], durations)
+    assert units == ["new.py", "b.py", "d.py", "c.py", "a.py"]
+    # L'unité inconnue compte comme la plus lente (8 s)
+    assert plan_shards(units, durations, 2) == [["new.py", "d.py"], ["b.py", "c.py", "a.py"]]
+
+def test_history_smooths_durations_per_unit(tmp_path):
+    path = str(tmp_path / "history.json")
+    TestHistory(path).record("s", [TestResult("t1", "passed", 2.0, "a.py"), TestResult("t2", "passed", 1.0, "a.py"),
+                                   TestResult("t3", "skipped", 9.0, "b.py")])
+    history = TestHistory(path)
+    history.record("s", [TestResult("t1", "passed", 4.0, "a.py")])
+    assert TestHistory(path).unit_durations("s") == {"a.py": 4.0}
+
+def test_junit_and_go_json_are_parsed(tmp_path):
+    report = tmp_path / "report.xml"
+    report.write_text(
+        '<testsuites><testsuite name="s">'
+        '<testcase classname="pkg.test_a" name="test_ok" time="0.5"/>'
+        '<testcase classname="pkg.test_a" name="test_ko" time="0.1"><failure message="assert 0">trace</failure></testcase>'
+        '<testcase classname="pkg.test_a" name="test_later"><skipped message="plus tard"/></testcase>'
+        '</testsuite></testsuites>'
+    )
+    assert [(r.name, r.status, r.duration, r.message) for r in parse_junit(str(report))] == [
+        ("pkg.test_a::test_ok", "passed", 0.5, ""),
+        ("pkg.test_a::test_ko", "failed", 0.1, "assert 0"),
+        ("pkg.test_a::test_later", "skipped", 0.0, "plus tard"),
+    ]
+
+    runner = GoTestRunner()
+    runner.suite_units = [".", "./pkg/store"]
+    events = [
+        {"Action": "output", "Package": "example.com/app/pkg/store", "Test": "TestGet", "Output": "boom\n"},
+        {"Action": "fail", "Package": "example.com/app/pkg/store", "Test": "TestGet", "Elapsed": 0.25},
+        {"Action": "pass", "Package": "example.com/app/pkg/store", "Elapsed": 0.3},
+    ]
+    results = [runner.parse_line(json.dumps(event)) for event in events]
+    assert results == [None, TestResult("example.com/app/pkg/store.TestGet", "failed", 0.25, "./pkg/store", "boom"),
+                       None]
+
+def test_pytest_suite_runs_in_shards_and_records_history(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "test_slow.py").write_text("import time\n\ndef test_slow():\n    time.sleep(0.3)\n")
+    (project / "test_fast.py").write_text("def test_fast():\n    pass\n\ndef test_broken():\n    assert 1 == 2\n")
+    history = TestHistory(str(tmp_path / "history.json"))
+    streamed = []
+
+    result = run_suite(PytestRunner(), str(project), workers=2, history=history, on_result=streamed.append)
+    assert sorted((r.name, r.status) for r in result.results) == [
+        ("test_fast::test_broken", "failed"), ("test_fast::test_fast", "passed"), ("test_slow::test_slow", "passed")
+    ]
+    assert {r.status for r in streamed} == {"passed", "failed"}
+    assert result.returncode != 0 and not result.timed_out
+
+    durations = history.unit_durations(f"pytest:{project}")
+    assert order_units(["test_fast.py", "test_slow.py"], durations) == ["test_slow.py", "test_fast.py"]
+
+def test_suite_is_stopped_after_its_timeout(tmp_path):
+    (tmp_path / "test_hang.py").write_text("import time\n\ndef test_hang():\n    time.sleep(30)\n")
+    result = run_suite(PytestRunner(), str(tmp_path), workers=1, timeout=2,
+                       history=TestHistory(str(tmp_path / "history.json")))
+    assert result.timed_out
+    assert result.elapsed < 20
+
+def test_runners_find_conventional_test_directories(tmp_path):
+    (tmp_path / "test" / "unit").mkdir(parents=True)
+    (tmp_path / "test" / "unit" / "sum.js").write_text("")
+    (tmp_path / "lib.js").write_text("")
+    (tmp_path / "lib.test.mjs").write_text("")
+    assert sorted(NodeTestRunner().units(str(tmp_path))) == ["lib.test.mjs", "test/unit/sum.js"]
+
+def test_jest_runs_without_pre_discovery(tmp_path, monkeypatch):
+    """Jest trouve lui-même ses tests (__tests__/...) ; une suite sans test n'est pas un succès."""
+    (tmp_path / "__tests__").mkdir()
+    (tmp_path / "__tests__" / "sum.js").write_text("")
+    commands = []
+
+    def fake_stream(command, on_line, timeout=None, cwd=None):
+        commands.append(command)
+        report_path = next(arg.split("=", 1)[1] for arg in command if arg.startswith("--outputFile="))
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"testResults": [{"name": str(tmp_path / "__tests__" / "sum.js"), "assertionResults": [
+                {"fullName": "sum adds", "status": "failed", "duration": 3, "failureMessages": ["expected 3"]}]}]}, f)
+        on_line("FAIL __tests__/sum.js")
+        return 1
+
+    monkeypatch.setattr(suite_runner, "stream_tool_command", fake_stream)
+    result = run_suite(JestRunner(), str(tmp_path), workers=2, history=TestHistory(str(tmp_path / "h.json")))
+    assert commands and commands[0][0] == "jest"
+    assert [(r.name, r.status, r.unit) for r in result.results] == [
+        ("__tests__/sum.js::sum adds", "failed", "__tests__/sum.js")]
+
+    empty = run_suite(PytestRunner(), str(tmp_path), history=TestHistory(str(tmp_path / "h.json")))
+    report = json.loads(suite_report(empty))
+    assert report["no_tests"] and not report["success"]
+
+def test_test_tools_share_execute_suite(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Historique des durées écrit sous tmp_path/config
+    (tmp_path / "test_ok.py").write_text("def test_ok():\n    pass\n")
+    context = execute_suite(Context(data={}), PytestRunner, str(tmp_path), workers=1)
+    assert json.loads(context.data["output"])["success"]
+
+    with pytest.raises(TypeError):
+        SuiteRunner()  # command() est abstraite
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests du registre des outils (manifeste précalculé, points d'entrée, import à la demande).
+"""
+
+import json
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+
+from mistral_cli import tool_registry
+from mistral_cli.tool_registry import ToolRegistry, build_manifest, write_manifest
+
+def test_manifest_is_up_to_date():
+    """Le manifeste livré correspond au code des outils (sinon : python -m mistral_cli.tool_registry)."""
+    registry = ToolRegistry(entry_points=False)
+    shipped = {spec.name: spec.__dict__ for spec in registry.specs()}
+    assert shipped == {spec["name"]: spec for spec in build_manifest()}
+
+def test_manifest_describes_tools():
+    registry = ToolRegistry(entry_points=False)
+    linter = registry.get("python/py_linter")
+    assert (linter.language, linter.kind, linter.binary, linter.input_mode) == ("python", "linter", "flake8", "input")
+    assert registry.get("devops/docker_linter").kind == "linter"
+    assert registry.get("php/php_unit_test").input_mode == "file"
+    assert {s.name for s in registry.specs(kind="security")} >= {"python/py_security_scanner", "nodejs/node_audit"}
+
+def test_listing_imports_no_tool():
+    """Lister les outils ne lit que le manifeste : aucun module d'outil n'est importé."""
+    code = (
+        "import sys\n"
+        "from mistral_cli.tool_registry import get_tool_registry\n"
+        "assert len(get_tool_registry().specs()) > 40\n"
+        "loaded = [m for m in sys.modules if m.startswith('mistral_cli.tools.')]\n"
+        "assert not loaded, loaded\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+def test_entry_point_tools(tmp_path, monkeypatch):
+    """Un outil tiers déclaré par point d'entrée est listé puis chargé à la première utilisation."""
+    manifest = tmp_path / "manifest.json"
+    write_manifest(str(manifest), str(tmp_path))  # Aucun outil intégré
+    entry_point = EntryPoint(name="yaml/yaml_linter", value="json", group=tool_registry.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(tool_registry, "_entry_points", lambda: [entry_point])
+
+    registry = ToolRegistry(str(manifest))
+    [spec] = registry.specs()
+    assert (spec.language, spec.kind, spec.source) == ("yaml", "linter", "entry_point")
+    assert registry.load("yaml/yaml_linter") is json
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests de l'exécution des outils (espaces de travail isolés, délais, concurrence, pool de processus).
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+from mistral_cli import tool_runner
+from mistral_cli.context import Context
+from mistral_cli.tool_runner import ToolRunner, ToolTimeoutError, run_tool_command, scratch_dir
+
+def test_scratch_dirs_are_private_and_removed():
+    with scratch_dir() as first, scratch_dir() as second:
+        assert first != second
+        assert os.path.isdir(first) and os.path.isdir(second)
+    assert not os.path.exists(first) and not os.path.exists(second)
+
+def test_command_timeout_kills_the_tool():
+    started = time.perf_counter()
+    with pytest.raises(ToolTimeoutError):
+        run_tool_command([sys.executable, "-c", "import time; time.sleep(10)"], timeout=0.3)
+    assert time.perf_counter() - started < 5
+
+def test_concurrency_is_limited_per_binary(monkeypatch):
+    """Avec max_concurrency = 1, trois lancements de 0,2 s s'exécutent l'un après l'autre."""
+    monkeypatch.setattr(tool_runner, "_semaphores", {})
+    monkeypatch.setitem(tool_runner.TOOL_LIMITS, sys.executable, {"max_concurrency": 1})
+    command = [sys.executable, "-c", "import time; time.sleep(0.2)"]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda _: run_tool_command(command), range(3)))
+    assert time.perf_counter() - started >= 0.6
+
+def test_runner_executes_tools_in_worker_processes():
+    contexts = [Context(data={"input": f"x = {i}\n", "use_cache": False}) for i in range(3)]
+    with ToolRunner(max_workers=2) as runner:
+        outputs = list(runner.map("python/py_linter", contexts))
+    assert len(outputs) == 3
+    assert all(output.startswith(("Rapport flake8", "Erreur")) for output in outputs)
+
+def test_runner_applies_the_binary_limit_in_the_parent(monkeypatch):
+    """cargo (max_concurrency = 1) : deux outils qui le lancent ne s'exécutent pas en même temps."""
+    monkeypatch.setattr(tool_runner, "_semaphores", {})
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def submit(function, server, context, input_text):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+        future = Future()
+        future.set_result("ok")
+        return future
+
+    runner = ToolRunner(max_workers=2)
+    monkeypatch.setattr(runner, "_executor", lambda: type("Pool", (), {"submit": staticmethod(submit)}))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        outputs = list(executor.map(lambda server: runner.run(server, Context(data={})),
+                                    ["rust/rust_linter", "rust/rust_test_runner"]))
+    assert outputs == ["ok", "ok"]
+    assert peak[0] == 1